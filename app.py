@@ -3,16 +3,31 @@
 #  6 hetes periodizáció + dátumos ACWR + finalize gomb + period táblázat (UI+PDF)
 ############################################################
 
-import os
-import json
-import random
-from typing import Dict, Any, List, Set
+from typing import List, Set
 from datetime import date
 
 import streamlit as st
-import matplotlib.pyplot as plt
-import pandas as pd
-from fpdf import FPDF
+
+from tbp import acwr as acwr_core
+from tbp.acwr import week_key_for
+from tbp.workload_store import WorkloadStore, open_workload_store
+from tbp.acwr_dashboard import ZONES, club_acwr_table
+from tbp.acwr_chart import render_acwr_chart
+from tbp.catalog import JSON_PATH, DrillOverlay
+from tbp.compiled_catalog import exercise_image
+from tbp.live_catalog import LiveCatalog
+from tbp.search import TrainingSearch
+from tbp.periodization import (
+    TECHNIKAI_SIMPLE, KONDIC_SIMPLE, TACTICAL_OPTIONS, AGE_GROUPS,
+    get_period_targets, get_period_row, get_period_table_rows,
+)
+from tbp.workload import STAGES, compute_workload
+from tbp import selection
+from tbp.selection import stage_label
+from tbp.pdf_export import MATCH_IMAGE, create_pdf
+from tbp.pdf_cache import PdfCache, pdf_cache_key
+from tbp.image_cache import DerivedImageStore
+from tbp.image_store import ImageStore
 
 
 ############################################################
@@ -26,204 +41,87 @@ st.set_page_config(page_title="Training Blueprint", layout="wide")
 # 1. KONSTANSOK, FÁJLOK
 ############################################################
 
-JSON_PATH = "drill_metadata_with_u7u9.json"
-ACWR_HISTORY_PATH = "acwr_history.json"        # tartós ACWR tárolás
-LOGO_PATH = "TBP_pdfsafe.png"
-MATCH_IMAGE = "match_game.png"
-BACKGROUND = "pitch_background.png"
-
-DEJAVU_REG = "DejaVuSans.ttf"
-DEJAVU_BOLD = "DejaVuSans-Bold.ttf"
+# A drill JSON, az ACWR history, a PDF-erőforrások és a fontok útvonala:
+# tbp.catalog, tbp.acwr, tbp.pdf_export
 
 
 ############################################################
-# 2. SEGÉD
+# 2. SEGÉD → tbp.pdf_export.pdf_safe
 ############################################################
 
-def pdf_safe(text):
-    if not text:
-        return ""
-    return str(text).replace("…", "...").replace("’", "'")
-
 
 ############################################################
-# 3. ACWR HISTORY BETÖLTÉS / MENTÉS
+# 3. ACWR HISTORY TÁROLÓ (tbp.workload_store)
 ############################################################
 
-def load_acwr_history() -> Dict[str, Any]:
-    if not os.path.exists(ACWR_HISTORY_PATH):
-        return {}
-    try:
-        with open(ACWR_HISTORY_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-def save_acwr_history(data: Dict[str, Any]):
-    with open(ACWR_HISTORY_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+@st.cache_resource
+def get_workload_store() -> WorkloadStore:
+    # SQLite (WAL) alapértelmezésben; az acwr_history.json automatikusan importálódik
+    return open_workload_store()
 
-ACWR_DB = load_acwr_history()
+try:
+    WORKLOAD_STORE = get_workload_store()
+except ValueError as e:
+    st.error(f"Az ACWR history nem tölthető be: {e}")
+    st.stop()
 
 
 ############################################################
-# 4. TAKTIKAI NORMALIZÁLÁS (ékezetes, 6 hetes új címkékkel)
+# 4. GYAKORLAT-ADATBÁZIS (normalizálás: tbp.catalog)
 ############################################################
 
-TACTICAL_CANONICAL = {
-    # játékszervezés
-    "játék_szervezés": "játékszervezés",
-    "jatek_szervezes": "játékszervezés",
-    "jatekszervezes": "játékszervezés",
-    "jatekszervezés": "játékszervezés",
-    "játékszervezés": "játékszervezés",
+@st.cache_resource
+def get_image_blobs() -> ImageStore:
+    # file_name -> tartalom-hash manifest, egyedi blobok
+    return ImageStore()
 
-    # labdakihozatal
-    "labdakihozatal": "labdakihozatal",
-    "labdakihozatal_": "labdakihozatal",
-    "labda kihozatal": "labdakihozatal",
-
-    # befejezés
-    "befejezes": "befejezés",
-    "befejezés": "befejezés",
-
-    # átmenet védekezésbe
-    "atmenet vedekezesbe": "átmenet védekezésbe",
-    "átmenet védekezésbe": "átmenet védekezésbe",
-    "atmenet_vedekezesbe": "átmenet védekezésbe",
-    "átmenet_ védekezésbe": "átmenet védekezésbe",
-
-    # védekezés
-    "vedekezes": "védekezés",
-    "védekezés": "védekezés",
-
-    # átmenet támadásba
-    "atmenet tamadasba": "átmenet támadásba",
-    "átmenet támadásba": "átmenet támadásba",
-    "atmenet_tamadasba": "átmenet támadásba",
-}
-
-@st.cache_data
-def load_db() -> List[Dict[str, Any]]:
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
-
-    for ex in db:
-        raw_main = ex.get("fo_taktikai_cel", "")
-        main_norm = TACTICAL_CANONICAL.get(str(raw_main).lower(), str(raw_main).lower())
-        ex["fo_taktikai_cel"] = main_norm
-
-        fixed_tags = []
-        for t in ex.get("taktikai_cel_cimkek", []):
-            t_norm = TACTICAL_CANONICAL.get(str(t).lower(), str(t).lower())
-            fixed_tags.append(t_norm)
-        ex["taktikai_cel_cimkek"] = fixed_tags
-
-    return db
-
-EX_DB = load_db()
-
-
-############################################################
-# 5. TECHNIKAI + KONDI LISTÁK
-############################################################
+@st.cache_resource
+def get_image_store() -> DerivedImageStore:
+    # thumbnail + PDF-variánsok, a dekódolt képinfók session-ök között megosztva
+    return DerivedImageStore(images=get_image_blobs())
 
-TECHNIKAI_SIMPLE = [
-    "passz",
-    "átvétel",
-    "labdavezetés",
-    "lövések",
-    "fejelés",
-    "cselezés"
-]
+@st.cache_resource
+def get_live_catalog() -> LiveCatalog:
+    # a lefordított, mmap-elt katalógusból indul (tbp.compiled_catalog), processzenként
+    # egy példány; a JSON / képek változását menet közben, inkrementálisan veszi át.
+    # A tervbeli szerkesztés a DrillOverlay-ben.
+    return LiveCatalog(JSON_PATH, images=get_image_blobs())
 
-KONDIC_SIMPLE = [
-    "gyorsaság",
-    "állóképesség",
-    "erő",
-    "agilitás"
-]
+IMAGE_BLOBS = get_image_blobs()
+IMAGE_STORE = get_image_store()
+LIVE_CATALOG = get_live_catalog()
 
+# legfeljebb 2 mp-enként ránéz a fájlokra; az új verzió a következő kérésektől él,
+# a futó session-ök tervei a régi rekordokra mutatnak tovább
+catalog_diff = LIVE_CATALOG.refresh()
+if catalog_diff:
+    if catalog_diff.error:
+        st.warning(f"Gyakorlat-adatbázis: {catalog_diff.summary()}")
+    else:
+        st.toast(f"Gyakorlat-adatbázis frissítve: {catalog_diff.summary()}")
 
-############################################################
-# 6. 6 HETES PERIODIZÁCIÓ (taktikai + technikai + kondi + szorzó)
-############################################################
-
-# Taktikai opciók – fix, duplikációmentes lista
-TACTICAL_OPTIONS = [
-    "labdakihozatal",
-    "játékszervezés",
-    "befejezés",
-    "átmenet védekezésbe",
-    "védekezés",
-    "átmenet támadásba",
-]
+CATALOG = LIVE_CATALOG.current()
+EX_DB, EX_INDEX, EX_ENGINE = CATALOG.db, CATALOG.index, CATALOG.engine
 
-PERIOD_TABLE_6W = {
-    1: {"taktikai": "labdakihozatal",        "technikai": "passz",        "kondi": "állóképesség", "szorzo": 1.00},
-    2: {"taktikai": "játékszervezés",        "technikai": "labdavezetés", "kondi": "agilitás",      "szorzo": 1.05},
-    3: {"taktikai": "befejezés",             "technikai": "lövések",      "kondi": "erő",           "szorzo": 1.10},
-    4: {"taktikai": "átmenet védekezésbe",   "technikai": "átvétel",      "kondi": "gyorsaság",     "szorzo": 1.15},
-    5: {"taktikai": "védekezés",             "technikai": "fejelés",      "kondi": "állóképesség",  "szorzo": 1.20},
-    6: {"taktikai": "átmenet támadásba",     "technikai": "cselezés",     "kondi": "gyorsaság",     "szorzo": 1.25},
-}
 
-def get_period_targets(period_week: int) -> Dict[str, Any]:
-    return PERIOD_TABLE_6W.get(period_week, PERIOD_TABLE_6W[1])
+@st.cache_resource
+def get_training_search() -> TrainingSearch:
+    # BM25 index a training_database.json leírásaira; lemezre mentve,
+    # a forrás változásakor inkrementálisan frissül
+    return TrainingSearch()
 
-def get_period_table_df() -> pd.DataFrame:
-    rows = []
-    for w in range(1, 7):
-        r = PERIOD_TABLE_6W[w].copy()
-        r["Hét"] = w
-        rows.append(r)
-    df = pd.DataFrame(rows)[["Hét", "taktikai", "technikai", "kondi", "szorzo"]]
-    df.columns = ["Hét", "Taktikai cél", "Technikai cél", "Kondicionális cél", "Intenzitás szorzó"]
-    return df
+try:
+    TRAINING_SEARCH = get_training_search()
+except (OSError, ValueError) as e:
+    TRAINING_SEARCH = None
+    st.sidebar.warning(f"A gyakorlatkereső nem érhető el: {e}")
 
 
 ############################################################
-# 7. WORKLOAD (Model 1, periodizációs szorzóval)
+# 5–7. LISTÁK, 6 HETES PERIODIZÁCIÓ, WORKLOAD
+#      → tbp.periodization, tbp.workload
 ############################################################
 
-BASE_LOAD = {
-    "bemelegites": 100,
-    "cel1": 250,
-    "cel2": 250,
-    "cel3": 300
-}
-
-TECH_BONUS = {
-    "passz": 20,
-    "átvétel": 20,
-    "labdavezetés": 25,
-    "lövések": 30,
-    "fejelés": 20,
-    "cselezés": 40
-}
-
-KONDI_BONUS = {
-    "gyorsaság": 30,
-    "állóképesség": 50,
-    "erő": 40,
-    "agilitás": 35
-}
-
-STAGES = ["bemelegites", "cel1", "cel2", "cel3"]
-
-def compute_workload(period_week: int,
-                     stages: List[str],
-                     tech: List[str],
-                     kondi: List[str]) -> float:
-    period = get_period_targets(period_week)
-    mult = float(period["szorzo"])
-
-    base = sum(BASE_LOAD.get(s, 0) for s in stages)
-    tech_bonus = sum(TECH_BONUS.get(t, 0) for t in tech)
-    kond_bonus = sum(KONDI_BONUS.get(k, 0) for k in kondi)
-
-    return (base + tech_bonus + kond_bonus) * mult
-
 
 ############################################################
 # 8. EDZŐ / CSAPAT / DÁTUM (dátum felülírható)
@@ -238,8 +136,7 @@ today = date.today()
 training_date = st.sidebar.date_input("Edzés dátuma", value=today)
 st.sidebar.caption("A dátum szabadon módosítható (előre vagy visszamenőleg is).")
 
-iso_year, iso_week, _ = training_date.isocalendar()
-week_key = f"{iso_year}-W{iso_week:02d}"  # ACWR kulcs
+week_key = week_key_for(training_date)  # ACWR kulcs
 
 coach_id = f"coach_{abs(hash(coach_name)) % 10**8}"
 team_id = f"team_{abs(hash(team_name)) % 10**8}"
@@ -248,123 +145,61 @@ st.sidebar.write(f"Edző ID: {coach_id}")
 st.sidebar.write(f"Csapat ID: {team_id}")
 st.sidebar.write(f"Naptári hét (ACWR): {week_key}")
 
-# ACWR struktúra biztosítása
-if coach_id not in ACWR_DB:
-    ACWR_DB[coach_id] = {}
-if team_id not in ACWR_DB[coach_id]:
-    ACWR_DB[coach_id][team_id] = {}
-
 
 ############################################################
 # 9. ACWR (dátumos week_key)
 ############################################################
 
 def save_weekly_workload(coach_id: str, team_id: str, week_key: str, workload: float):
-    prev = ACWR_DB[coach_id][team_id].get(week_key, 0.0)
-    ACWR_DB[coach_id][team_id][week_key] = prev + float(workload)
-    save_acwr_history(ACWR_DB)
+    WORKLOAD_STORE.add_workload(coach_id, team_id, week_key, workload)
 
 def compute_acwr(coach_id: str, team_id: str, current_week_key: str):
-    team_weeks = ACWR_DB.get(coach_id, {}).get(team_id, {})
-    if not team_weeks:
-        return None, None, None
-
-    acute = team_weeks.get(current_week_key)
-    if acute is None:
-        return None, None, None
+    team_weeks = WORKLOAD_STORE.team_weeks(coach_id, team_id)
+    return acwr_core.compute_acwr(team_weeks, current_week_key)
 
-    keys = sorted(team_weeks.keys())  # YYYY-Www lexikografikusan jó
-    idx = keys.index(current_week_key) if current_week_key in keys else None
-    if idx is None:
-        return acute, None, None
+ACWR_MODELS = {
+    "4 hetes gördülő átlag": {"model": "rolling", "gap_aware": False},
+    "4 hetes gördülő átlag (naptári hetek, üres hét = 0)": {"model": "rolling", "gap_aware": True},
+    "EWMA (exponenciálisan súlyozott)": {"model": "ewma", "gap_aware": True},
+}
 
-    prev_keys = keys[max(0, idx - 4):idx]
-    chronic_vals = [team_weeks[k] for k in prev_keys]
+def team_acwr_series(coach_id: str, team_id: str, model_label: str):
+    team_weeks = WORKLOAD_STORE.team_weeks(coach_id, team_id)
+    if not team_weeks:
+        return None
+    return acwr_core.acwr_series(team_weeks, **ACWR_MODELS[model_label])
 
-    if not chronic_vals:
-        return acute, None, None
+@st.cache_data(max_entries=16, show_spinner=False)
+def club_acwr_dashboard(store_version: int, week_key=None):
+    # store_version a cache-kulcs: a következő finalize után újraszámolódik
+    return club_acwr_table(WORKLOAD_STORE, week_key)
 
-    chronic = sum(chronic_vals) / len(chronic_vals)
-    acwr = acute / chronic if chronic > 0 else None
-    return acute, chronic, acwr
+@st.cache_data(max_entries=256, show_spinner=False)
+def acwr_chart_png(coach_id: str, team_id: str, model_label: str, history_version: int) -> bytes:
+    # history_version: a csapat következő finalize-a után új kép készül
+    return render_acwr_chart(team_acwr_series(coach_id, team_id, model_label))
 
-def plot_acwr_history(coach_id: str, team_id: str):
-    team_weeks = ACWR_DB.get(coach_id, {}).get(team_id, {})
-    if not team_weeks:
+def plot_acwr_history(coach_id: str, team_id: str, model_label: str, series):
+    if series is None:
         st.info("Nincs ACWR adat még ehhez a csapathoz.")
         return
-
-    keys = sorted(team_weeks.keys())
-    loads = [team_weeks[k] for k in keys]
-    acwr_vals = []
-    for k in keys:
-        _, _, a = compute_acwr(coach_id, team_id, k)
-        acwr_vals.append(a)
-
-    x = list(range(len(keys)))
-    fig, ax1 = plt.subplots(figsize=(8, 4))
-    ax1.plot(x, loads, marker="o")
-    ax1.set_xlabel("Hét (YYYY-Www)")
-    ax1.set_ylabel("Workload")
-
-    ax2 = ax1.twinx()
-    ax2.plot(x, acwr_vals, marker="s")
-    ax2.set_ylabel("ACWR")
-    ax2.axhspan(0.8, 1.3, alpha=0.2)
-
-    ax1.set_xticks(x)
-    ax1.set_xticklabels(keys, rotation=45, ha="right")
-    ax1.grid(True, alpha=0.3)
-    st.pyplot(fig)
+    version = WORKLOAD_STORE.team_version(coach_id, team_id)
+    st.image(acwr_chart_png(coach_id, team_id, model_label, version))
 
 
 ############################################################
 # 10. GYAKORLAT VÁLASZTÁS
 ############################################################
 
-def stage_label(s: str) -> str:
-    return {
-        "bemelegites": "Bemelegítés",
-        "cel1": "Cél 1",
-        "cel2": "Cél 2",
-        "cel3": "Cél 3"
-    }.get(s, s)
-
-def score_exercise(ex, stage: str, desired_fo: str, tact: List[str], age_group: str) -> int:
-    score = 0
-    if ex.get("fo_taktikai_cel") == desired_fo:
-        score += 5
-    for t in tact:
-        if t in ex.get("taktikai_cel_cimkek", []):
-            score += 2
-    if age_group in ex.get("ajanlott_korosztalyok", []):
-        score += 1
-    return score
-
 def pick_exercise(stage: str,
                   desired_fo: str,
                   tact: List[str],
                   used_ids: Set[str],
-                  age_group: str):
-    candidates = []
-    for ex in EX_DB:
-        if ex.get("edzes_resze") != stage:
-            continue
-        if age_group not in ex.get("ajanlott_korosztalyok", []):
-            continue
-        if ex.get("file_name") in used_ids:
-            continue
-
-        s = score_exercise(ex, stage, desired_fo, tact, age_group)
-        candidates.append((s, ex))
-
-    if not candidates:
-        return None
-
-    candidates.sort(key=lambda x: x[0], reverse=True)
-    best_score = candidates[0][0]
-    best = [ex for s, ex in candidates if s == best_score]
-    return random.choice(best)
+                  age_group: str,
+                  tech: List[str] = (),
+                  kondi: List[str] = ()):
+    return selection.pick_exercise(EX_DB, EX_INDEX, stage, desired_fo, tact, used_ids, age_group,
+                                   tech=tech, kondi=kondi)
 
 
 ############################################################
@@ -379,19 +214,10 @@ if "match_override" not in st.session_state:
     st.session_state.match_override = False
 
 
-def generate_plan(fo_taktikai: str, tact_list: List[str], age_group: str):
-    plan = []
-    used = set()
-
-    for stg in STAGES:
-        ex = pick_exercise(stg, fo_taktikai, tact_list, used, age_group)
-        if ex:
-            used.add(ex["file_name"])
-            ex.setdefault("description", "")
-            ex.setdefault("organisation", "")
-            ex.setdefault("coaching_points", "")
-            plan.append({"stage": stg, "exercise": ex})
-
+def generate_plan(fo_taktikai: str, tact_list: List[str], age_group: str,
+                  tech: List[str] = (), kondi: List[str] = ()):
+    plan, used = selection.generate_plan(EX_DB, EX_INDEX, EX_ENGINE, fo_taktikai, tact_list, age_group,
+                                         tech=tech, kondi=kondi)
     st.session_state.plan = plan
     st.session_state.used_ids = used
 
@@ -408,20 +234,43 @@ period_week = st.sidebar.number_input("Periodizációs hét (1–6)", 1, 6, 1)
 period_targets = get_period_targets(period_week)
 
 # 1) Adott hét céljai – “felső tábla”
-one_row = pd.DataFrame([{
-    "Hét": period_week,
-    "Taktikai cél": period_targets["taktikai"],
-    "Technikai cél": period_targets["technikai"],
-    "Kondicionális cél": period_targets["kondi"],
-    "Intenzitás szorzó": period_targets["szorzo"],
-}])
+one_row = [get_period_row(period_week)]
 
 st.subheader("Az aktuális hét céljai")
 st.table(one_row)
 
 # 2) Teljes 6 hetes ciklus – lenyitható
 with st.expander("Teljes 6 hetes periodizáció megtekintése"):
-    st.dataframe(get_period_table_df(), use_container_width=True)
+    st.dataframe(get_period_table_rows(), use_container_width=True)
+
+
+############################################################
+# 12/B. GYAKORLATKERESŐ (training adatbázis, tbp.search)
+############################################################
+
+@st.fragment
+def training_search_box():
+    # fragment: gépelés közben csak ez a rész fut újra
+    query = st.text_input("Keresés a gyakorlatleírásokban", key="training_query", type="search",
+                          live=True, placeholder="pl. labdakihozatal 5v3, presszing, befejezés")
+    if not query.strip():
+        return
+    TRAINING_SEARCH.refresh()
+    hits = TRAINING_SEARCH.search(query, k=10)
+    if not hits:
+        st.caption("Nincs találat.")
+        return
+    for hit in hits:
+        rec = hit.record
+        with st.expander(f"{rec.get('title_hu', hit.id)} · {rec.get('duration_minutes', '?')} perc"):
+            st.caption(f"{rec.get('tactical_label', '')} · {rec.get('technical_label', '')} · "
+                       f"{rec.get('format', '')} · {rec.get('pitch_size', '')}")
+            st.markdown(rec.get("description_hu", ""))
+            st.markdown(f"**Szervezés:** {rec.get('organisation_hu', '')}")
+
+if TRAINING_SEARCH is not None:
+    with st.expander("🔎 Gyakorlatkereső (training adatbázis)"):
+        training_search_box()
 
 
 ############################################################
@@ -432,7 +281,7 @@ st.sidebar.header("Edzés paraméterei")
 
 age_group = st.sidebar.selectbox(
     "Korosztály",
-    ["U7-U9", "U10-U12", "U13-U15", "U16-U19", "felnott"]
+    AGE_GROUPS
 )
 
 fo_taktikai = st.sidebar.selectbox(
@@ -467,7 +316,7 @@ coach_notes = st.text_area("🧠 Edzői össz-megjegyzés az edzéshez")
 ############################################################
 
 if st.button("🚀 Edzés generálása"):
-    generate_plan(fo_taktikai, taktikai_valasztott, age_group)
+    generate_plan(fo_taktikai, taktikai_valasztott, age_group, technikai_valasztott, kond_valasztott)
     st.success("Edzés generálva! Ha kész vagy vele, használd az 'Edzés véglegesítése' gombot a terhelés mentéséhez.")
 
 
@@ -498,9 +347,9 @@ for i, block in enumerate(st.session_state.plan):
         if stage == "cel3" and st.session_state.match_override:
             st.image(MATCH_IMAGE, width=300)
         else:
-            img = ex.get("file_name")
-            if img and os.path.exists(img):
-                st.image(img, width=300)
+            img = exercise_image(ex, IMAGE_BLOBS)
+            if img:
+                st.image(IMAGE_STORE.thumbnail(img) or img, width=300)
             else:
                 st.warning("Nincs kép ehhez a gyakorlathoz.")
 
@@ -513,15 +362,13 @@ for i, block in enumerate(st.session_state.plan):
             if stage == "cel3" and st.session_state.match_override:
                 st.warning("Mérkőzésjáték módban nem cserélhető a gyakorlat.")
             else:
-                new_ex = pick_exercise(stage, fo_taktikai, taktikai_valasztott, st.session_state.used_ids, age_group)
+                new_ex = pick_exercise(stage, fo_taktikai, taktikai_valasztott, st.session_state.used_ids, age_group,
+                                       technikai_valasztott, kond_valasztott)
                 if new_ex:
                     fid = new_ex.get("file_name")
                     if fid:
                         st.session_state.used_ids.add(fid)
-                    new_ex.setdefault("description", "")
-                    new_ex.setdefault("organisation", "")
-                    new_ex.setdefault("coaching_points", "")
-                    st.session_state.plan[i]["exercise"] = new_ex
+                    st.session_state.plan[i]["exercise"] = DrillOverlay(new_ex)
                 else:
                     st.error("Ehhez az edzésrészhez nincs több releváns gyakorlat.")
 
@@ -532,11 +379,17 @@ for i, block in enumerate(st.session_state.plan):
 
 st.header("📈 ACWR trend (naptári hetek alapján)")
 
-acute, chronic, acwr = compute_acwr(coach_id, team_id, week_key)
+acwr_model = st.selectbox("ACWR modell", list(ACWR_MODELS.keys()))
+acwr_hist = team_acwr_series(coach_id, team_id, acwr_model)
+
+# a teljes idősor egy menetben számolódik; az aktuális hét ebből jön
+acute, chronic, acwr = acwr_hist.at(week_key) if acwr_hist is not None else (None, None, None)
+
+chronic_label = "Krónikus terhelés (EWMA)" if ACWR_MODELS[acwr_model]["model"] == "ewma" else "Krónikus terhelés (4 hét átlaga)"
 
 c1, c2, c3 = st.columns(3)
 c1.metric("Akut terhelés", f"{acute:.1f}" if acute is not None else "N/A")
-c2.metric("Krónikus terhelés (4 hét átlaga)", f"{chronic:.1f}" if chronic is not None else "N/A")
+c2.metric(chronic_label, f"{chronic:.1f}" if chronic is not None else "N/A")
 c3.metric("ACWR", f"{acwr:.2f}" if acwr is not None else "N/A")
 
 if acwr is not None:
@@ -549,7 +402,7 @@ if acwr is not None:
     else:
         st.error("ACWR > 1.5 – magas terhelési spike, sérüléskockázat! 🔴")
 
-plot_acwr_history(coach_id, team_id)
+plot_acwr_history(coach_id, team_id, acwr_model, acwr_hist)
 
 
 ############################################################
@@ -576,146 +429,75 @@ if st.button("✅ Edzés véglegesítése és terhelés mentése"):
 
 st.header("📄 PDF Export")
 
-class TBPDF(FPDF):
-    def header(self):
-        try:
-            self.image(BACKGROUND, x=0, y=0, w=210, h=297)
-        except:
-            pass
-        try:
-            self.image(LOGO_PATH, x=165, y=10, w=30)
-        except:
-            pass
-        self.set_y(25)
-
-def pdf_add_period_table(pdf: FPDF, base_font: str, period_week: int):
-    """PDF-be: 1 soros (aktuális hét) + opcionálisan 6 soros mini-tábla."""
-    df = get_period_table_df()
-    current = df[df["Hét"] == period_week]
-
-    pdf.set_font(base_font, "B", 12)
-    pdf.cell(0, 8, pdf_safe("Periodizáció (aktuális hét):"), ln=1)
-
-    # 1 soros tábla (aktuális hét)
-    row = current.iloc[0].to_dict()
-    pdf.set_font(base_font, "", 11)
-    pdf.multi_cell(0, 6, pdf_safe(
-        f"Hét {row['Hét']} | "
-        f"Taktika: {row['Taktikai cél']} | "
-        f"Technika: {row['Technikai cél']} | "
-        f"Kondi: {row['Kondicionális cél']} | "
-        f"Szorzo: {row['Intenzitás szorzó']}"
-    ))
-
-    pdf.ln(2)
-    pdf.set_font(base_font, "B", 12)
-    pdf.cell(0, 8, pdf_safe("Teljes 6 hetes ciklus:"), ln=1)
-
-    # Egyszerű táblázat (6 sor)
-    col_widths = [12, 55, 45, 45, 25]  # Hét, takt, tech, kondi, szorzo
-    headers = ["Hét", "Taktikai", "Technikai", "Kondi", "Szorzó"]
-
-    pdf.set_font(base_font, "B", 10)
-    for w, h in zip(col_widths, headers):
-        pdf.cell(w, 7, pdf_safe(h), border=1)
-    pdf.ln()
-
-    pdf.set_font(base_font, "", 10)
-    for _, r in df.iterrows():
-        pdf.cell(col_widths[0], 7, pdf_safe(str(r["Hét"])), border=1)
-        pdf.cell(col_widths[1], 7, pdf_safe(str(r["Taktikai cél"])), border=1)
-        pdf.cell(col_widths[2], 7, pdf_safe(str(r["Technikai cél"])), border=1)
-        pdf.cell(col_widths[3], 7, pdf_safe(str(r["Kondicionális cél"])), border=1)
-        pdf.cell(col_widths[4], 7, pdf_safe(str(r["Intenzitás szorzó"])), border=1)
-        pdf.ln()
-
-    pdf.ln(2)
-
-def create_pdf():
-    pdf = TBPDF()
-    pdf.set_auto_page_break(auto=True, margin=15)
-
-    base = "Arial"
-    try:
-        pdf.add_font("DejaVu", "", DEJAVU_REG, uni=True)
-        pdf.add_font("DejaVu", "B", DEJAVU_BOLD, uni=True)
-        base = "DejaVu"
-    except:
-        pass
-
-    # Címlap
-    pdf.add_page()
-    pdf.set_font(base, "B", 16)
-    pdf.cell(0, 10, pdf_safe("Training Blueprint – Edzésterv"), ln=1)
-
-    pdf.set_font(base, "", 12)
-    pdf.multi_cell(0, 6, pdf_safe(f"Edző: {coach_name}"))
-    pdf.multi_cell(0, 6, pdf_safe(f"Csapat: {team_name}"))
-    pdf.multi_cell(0, 6, pdf_safe(f"Korosztály: {age_group}"))
-    pdf.multi_cell(0, 6, pdf_safe(f"Edzés dátuma: {training_date.isoformat()}"))
-    pdf.multi_cell(0, 6, pdf_safe(f"Naptári hét (ACWR): {week_key}"))
-    pdf.multi_cell(0, 6, pdf_safe(f"Periodizációs hét: {period_week}"))
-
-    pdf.ln(2)
-    pdf_add_period_table(pdf, base, period_week)
-
-    pdf.set_font(base, "B", 12)
-    pdf.cell(0, 8, pdf_safe("Edzői megjegyzés:"), ln=1)
-    pdf.set_font(base, "", 12)
-    pdf.multi_cell(0, 6, pdf_safe(coach_notes))
-
-    # Gyakorlatok
-    for block in st.session_state.plan:
-        if "stage" not in block or "exercise" not in block:
-            continue
-
-        pdf.add_page()
-        stage = block["stage"]
-        ex = block["exercise"]
-
-        pdf.set_font(base, "B", 14)
-        pdf.cell(0, 10, pdf_safe(stage_label(stage)), ln=1)
-        pdf.ln(3)
-
-        img = ex.get("file_name")
-        if stage == "cel3" and st.session_state.match_override:
-            img = MATCH_IMAGE
+@st.cache_resource
+def get_pdf_cache() -> PdfCache:
+    # processzenként egy, session-ök között megosztva
+    return PdfCache()
 
-        if img and os.path.exists(img):
-            try:
-                pdf.image(img, w=150)
-            except:
-                pdf.multi_cell(0, 6, pdf_safe("Kép nem tölthető be."))
+PDF_CACHE = get_pdf_cache()
 
-        pdf.ln(5)
-
-        pdf.set_font(base, "B", 12)
-        pdf.cell(0, 6, pdf_safe("Leírás:"), ln=1)
-        pdf.set_font(base, "", 12)
-        pdf.multi_cell(0, 6, pdf_safe(ex.get("description", "")))
-        pdf.ln(2)
+if st.session_state.plan:
+    pdf_args = (
+        st.session_state.plan,
+        coach_name, team_name, age_group,
+        training_date, week_key, period_week,
+        coach_notes, st.session_state.match_override,
+    )
+    # a képek tartalma és a katalógus verziója is a kulcs része (futás közben cserélt kép)
+    pdf_key = pdf_cache_key(*pdf_args, image_store=IMAGE_STORE, images=IMAGE_BLOBS,
+                            catalog_version=CATALOG.version)
+
+    # Csak kérésre (vagy ha ugyanez a tartalom már a cache-ben van) készül PDF
+    if pdf_key not in PDF_CACHE:
+        if st.button("📄 PDF előkészítése"):
+            with st.spinner("PDF készítése..."):
+                PDF_CACHE.get_or_build(
+                    pdf_key, lambda: create_pdf(*pdf_args, image_store=IMAGE_STORE, images=IMAGE_BLOBS))
+
+    pdf_bytes = PDF_CACHE.get(pdf_key)
+    if pdf_bytes is not None:
+        st.download_button(
+            "📄 PDF letöltése",
+            data=pdf_bytes,
+            file_name="edzesterv.pdf",
+            mime="application/pdf"
+        )
+    else:
+        st.caption("A PDF a fenti gombbal készül el; az azonos tartalmú PDF a cache-ből jön.")
+else:
+    st.info("Előbb generálj edzést!")
 
-        pdf.set_font(base, "B", 12)
-        pdf.cell(0, 6, pdf_safe("Szervezés:"), ln=1)
-        pdf.set_font(base, "", 12)
-        pdf.multi_cell(0, 6, pdf_safe(ex.get("organisation", "")))
-        pdf.ln(2)
 
-        pdf.set_font(base, "B", 12)
-        pdf.cell(0, 6, pdf_safe("Coaching pontok:"), ln=1)
-        pdf.set_font(base, "", 12)
-        pdf.multi_cell(0, 6, pdf_safe(ex.get("coaching_points", "")))
+############################################################
+# 19. KLUB ACWR ÁTTEKINTÉS (összes edző / csapat)
+############################################################
 
-    raw = pdf.output(dest="S")
-    return raw if isinstance(raw, bytes) else raw.encode("latin-1", "ignore")
+st.header("🏟️ Klub ACWR áttekintés")
 
-if st.session_state.plan:
-    pdf_bytes = create_pdf()
-    st.download_button(
-        "📄 PDF letöltése",
-        data=pdf_bytes,
-        file_name="edzesterv.pdf",
-        mime="application/pdf"
+if st.checkbox("Összes csapat megjelenítése"):
+    club_week = st.radio(
+        "Hét",
+        ["Csapatonként az utolsó rögzített hét", f"Kiválasztott naptári hét ({week_key})"],
+        horizontal=True,
     )
-else:
-    st.info("Előbb generálj edzést!")
+    club_df = club_acwr_dashboard(
+        WORKLOAD_STORE.version(),
+        None if club_week.startswith("Csapatonként") else week_key,
+    )
+    if club_df.empty:
+        st.info("Nincs még rögzített terhelés.")
+    else:
+        zone_counts = club_df["Zóna"].value_counts()
+        cols = st.columns(len(ZONES))
+        for col, (_, label) in zip(cols, ZONES):
+            col.metric(label, int(zone_counts.get(label, 0)))
+        st.dataframe(
+            club_df.sort_values("ACWR", ascending=False, na_position="last"),
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Akut": st.column_config.NumberColumn(format="%.1f"),
+                "Krónikus": st.column_config.NumberColumn(format="%.1f"),
+                "ACWR": st.column_config.NumberColumn(format="%.2f"),
+            },
+        )
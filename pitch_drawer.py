@@ -1,187 +1,187 @@
 # pitch_drawer.py
-from typing import Dict, Any, List, Optional
+import itertools
+import os
+import threading
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import Circle, Rectangle, FancyArrowPatch
+from matplotlib.text import Text
+
+from tbp.diagram import (PITCH_FIGSIZE, PITCH_SHAPES, PITCH_XLIM, PITCH_YLIM, TEAM_COLORS,
+                         CompiledDiagram, PitchShape, compile_cached)
 
 
 # ============================
 # 1. PÁLYA RAJZOLÁSA
 # ============================
 
-def draw_pitch(ax=None):
+def draw_pitch(ax=None, fast: bool = False):
     """
     Full-size pálya 0–100 x 0–100 koordináta-rendszerben.
     Csíkos füves háttérrel, vonalakkal, kapukkal.
+    fast=True: ugyanez néhány collection-ként (_draw_pitch_fast).
     """
     if ax is None:
-        fig, ax = plt.subplots(figsize=(8, 5))
+        fig, ax = plt.subplots(figsize=PITCH_FIGSIZE)
     else:
         fig = ax.figure
 
-    # Csíkos zöld háttér
-    for i in range(7):
-        stripe_color = "#63a15f" if i % 2 == 0 else "#5a9657"
-        ax.add_patch(
-            Rectangle((0, i * (100 / 7)), 100, 100 / 7,
-                      facecolor=stripe_color, edgecolor="none", zorder=0)
-        )
+    if fast:
+        _draw_pitch_fast(ax)
+        return fig, ax
+
+    # csíkos háttér, vonalak, pontok, kapuk: tbp.diagram.PITCH_SHAPES
+    for sh in PITCH_SHAPES:
+        if sh.kind == "line":
+            x0, y0, x1, y1 = sh.geom
+            ax.plot([x0, x1], [y0, y1], color=sh.edge, linewidth=sh.lw, zorder=sh.zorder)
+        elif sh.kind == "spot":
+            x, y, size = sh.geom
+            ax.scatter([x], [y], color=sh.face, s=size, zorder=sh.zorder)
+        else:
+            ax.add_patch(_pitch_patch(sh, facecolor=sh.face or "none", edgecolor=sh.edge or "none",
+                                      linewidth=sh.lw, zorder=sh.zorder))
+
+    _pitch_limits(ax)
+    return fig, ax
+
+
+def _pitch_patch(sh: PitchShape, **kw):
+    if sh.kind == "circle":
+        cx, cy, r = sh.geom
+        return Circle((cx, cy), r, **kw)
+    x, y, w, h = sh.geom
+    return Rectangle((x, y), w, h, **kw)
+
 
-    # Külső vonal
-    outline = Rectangle((0, 0), 100, 100,
-                        linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(outline)
-
-    # Középvonal
-    ax.plot([50, 50], [0, 100], color="white", linewidth=2, zorder=1)
-
-    # Középkör
-    center_circle = Circle((50, 50), 10,
-                           linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(center_circle)
-
-    # Középpont
-    ax.scatter([50], [50], color="white", s=20, zorder=2)
-
-    # 16-osok
-    left_box = Rectangle((0, 20), 18, 60,
-                         linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(left_box)
-    right_box = Rectangle((82, 20), 18, 60,
-                          linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(right_box)
-
-    # 5-ösök
-    left_small = Rectangle((0, 36), 6, 28,
-                           linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(left_small)
-    right_small = Rectangle((94, 36), 6, 28,
-                            linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    ax.add_patch(right_small)
-
-    # Tizenegyes pont
-    ax.scatter([12], [50], color="white", s=18, zorder=2)
-    ax.scatter([88], [50], color="white", s=18, zorder=2)
-
-    # 16-os előtti félkörök
-    left_arc = Circle((18, 50), 8,
-                      linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    right_arc = Circle((82, 50), 8,
-                       linewidth=2, edgecolor="white", facecolor="none", zorder=1)
-    # Csak a belső fele látszik, de ez így is ad egy jó érzetet
-    ax.add_patch(left_arc)
-    ax.add_patch(right_arc)
-
-    # Kapuk (egyszerű L-alak, „3D” hatás)
-    goal_width = 14
-    goal_depth = 3
-
-    # Bal kapu
-    ax.add_patch(
-        Rectangle((-goal_depth, 50 - goal_width / 2),
-                  goal_depth, goal_width,
-                  linewidth=2, edgecolor="white",
-                  facecolor="#111827", zorder=2)
-    )
-    # Jobb kapu
-    ax.add_patch(
-        Rectangle((100, 50 - goal_width / 2),
-                  goal_depth, goal_width,
-                  linewidth=2, edgecolor="white",
-                  facecolor="#111827", zorder=2)
-    )
-
-    # Beállítások
-    ax.set_xlim(-5, 105)
-    ax.set_ylim(0, 100)
+def _pitch_limits(ax):
+    ax.set_xlim(*PITCH_XLIM)
+    ax.set_ylim(*PITCH_YLIM)
     ax.set_aspect("equal")
     ax.axis("off")
 
-    return fig, ax
+
+def _draw_pitch_fast(ax) -> List[Any]:
+    """
+    A draw_pitch elemei néhány artistként: a PITCH_SHAPES alakzatai
+    (zorder, körvonal) csoportonként egy PatchCollection-ben, a pontok egy
+    scatter-ben. Visszaadja a zorder >= 2 elemeket (pontok, kapuk).
+    """
+    groups: Dict[Tuple[Any, ...], List[PitchShape]] = {}
+    for sh in PITCH_SHAPES:
+        if sh.kind == "line":
+            key = ("line", id(sh))                            # vonalanként egy Line2D
+        elif sh.kind == "spot":
+            key = ("spot", sh.zorder, sh.face)
+        else:
+            key = ("patch", sh.zorder, sh.edge, sh.lw)
+        groups.setdefault(key, []).append(sh)
+
+    top = []
+    for (kind, *_), shapes in groups.items():
+        sh0 = shapes[0]
+        if kind == "line":
+            x0, y0, x1, y1 = sh0.geom
+            artist = ax.plot([x0, x1], [y0, y1], color=sh0.edge, linewidth=sh0.lw, zorder=sh0.zorder)[0]
+        elif kind == "spot":
+            artist = ax.scatter([sh.geom[0] for sh in shapes], [sh.geom[1] for sh in shapes],
+                                color=sh0.face, s=[sh.geom[2] for sh in shapes], zorder=sh0.zorder)
+        else:
+            artist = ax.add_collection(PatchCollection(
+                [_pitch_patch(sh) for sh in shapes],
+                facecolor=[sh.face or "none" for sh in shapes],
+                edgecolor=sh0.edge or "none", linewidth=sh0.lw, zorder=sh0.zorder,
+            ), autolim=False)
+        if sh0.zorder >= 2:
+            top.append(artist)
+
+    _pitch_limits(ax)
+    return top
 
 
 # ============================
 # 2. SEGÉDFÜGGVÉNYEK
 # ============================
 
-TEAM_COLORS = {
-    "home": "#e11d48",     # piros
-    "away": "#2563eb",     # kék
-    "neutral": "#facc15",  # sárga
-    "keeper": "#22c55e",   # zöld
-}
+# csapatszínek: tbp.diagram.TEAM_COLORS (a PDF-vektoros rajzoló is ezt használja)
 
 
-def _get_player_by_id(players: List[Dict[str, Any]], pid: str) -> Optional[Dict[str, Any]]:
-    for p in players:
-        if p.get("id") == pid:
-            return p
-    return None
+def _compiled(diagram) -> CompiledDiagram:
+    """dict → CompiledDiagram (hibás hivatkozásra ValueError); a lefordítottat változatlanul adja."""
+    return diagram if isinstance(diagram, CompiledDiagram) else compile_cached(diagram)
 
 
-def _get_point(players: List[Dict[str, Any]], spec: Dict[str, Any], key: str):
-    """
-    Visszaad egy (x, y) pontot játékos ID-ból vagy explicit koordinátából.
-    """
-    id_key = f"{key}_id"
-    if id_key in spec:
-        pl = _get_player_by_id(players, spec[id_key])
-        if pl:
-            return {"x": pl["x"], "y": pl["y"]}
+# ============================
+# 3. FŐ RAJZOLÓ FÜGGVÉNY
+# ============================
 
-    if key in spec and isinstance(spec[key], dict):
-        pt = spec[key]
-        if "x" in pt and "y" in pt:
-            return {"x": pt["x"], "y": pt["y"]}
+ARROW_SHRINK_PT = 2.0     # FancyArrowPatch shrinkA / shrinkB alapértéke
 
-    return None
 
+def _data_per_point(ax) -> float:
+    """Adategység / pont a végleges (aspect utáni) tengelyméretnél."""
+    ax.apply_aspect()
+    width_pt = ax.get_position().width * ax.figure.get_figwidth() * 72
+    x0, x1 = ax.get_xlim()
+    return (x1 - x0) / width_pt
 
-# ============================
-# 3. FŐ RAJZOLÓ FÜGGVÉNY
-# ============================
 
-def draw_drill(diagram: Dict[str, Any],
-               figsize=(8, 5),
-               show: bool = False,
-               save_path: Optional[str] = None):
+def _shrunk(segments, shrink: float):
+    """A nyilak végpontjai shrink adategységgel beljebb (mint a FancyArrowPatch shrinkA/B)."""
+    import numpy as np
+
+    p0, p1 = segments[:, :2], segments[:, 2:]
+    d = p1 - p0
+    length = np.hypot(d[:, 0], d[:, 1])[:, None]
+    step = np.where(length > 2 * shrink, d / np.where(length > 0, length, 1.0) * shrink, 0.0)
+    return np.hstack([p0 + step, p1 - step])
+
+
+def _add_drill_artists(ax, cd: CompiledDiagram, batched: bool = False) -> List[Any]:
     """
-    Megrajzolja a pályát + játékosokat + passzokat + futásokat + extra elemeket.
+    A lefordított gyakorlat elemei (zóna, mini-kapuk, bóják, játékosok, nyilak,
+    labda, feliratok) az ax-re. batched=True esetén a bóják, a játékos-körök
+    és a labda néhány PatchCollection-ként kerülnek fel, a nyilak végpontjai
+    pedig előre rövidülnek (a FancyArrowPatch iteratív vágása helyett), ezért
+    ilyenkor a tengely elrendezésének már véglegesnek kell lennie.
+    Visszaadja a hozzáadott artist-okat.
     """
-    fig, ax = plt.subplots(figsize=figsize)
-    draw_pitch(ax)
+    artists: List[Any] = []
+    # a tengelyhatárok fixek (draw_pitch): kötegelt módban nincs autoscale-frissítés
+    add_patch = ax.add_artist if batched else ax.add_patch
+
+    def add(artist):
+        artists.append(artist)
+        return artist
 
-    players = diagram.get("players", [])
-    cones = diagram.get("cones", [])
-    passes = diagram.get("passes", [])
-    runs = diagram.get("runs", [])
-    ball_spec = diagram.get("ball", {})
-    texts = diagram.get("text_labels", [])
-    area = diagram.get("area")
-    mini_goals = diagram.get("mini_goals", [])
+    def add_circles(centers, radius, **kw):
+        if len(centers):
+            add(ax.add_collection(
+                PatchCollection([Circle(c, radius) for c in centers], **kw),
+                autolim=False,
+            ))
 
     # ---- Kiemelt játéktér (zóna) ----
-    if area:
-        ax.add_patch(
+    if cd.area:
+        x, y, w, h = cd.area
+        add(add_patch(
             Rectangle(
-                (area["x"], area["y"]),
-                area["w"],
-                area["h"],
+                (x, y),
+                w,
+                h,
                 linewidth=1.8,
                 edgecolor="white",
                 linestyle="--",
                 facecolor="none",
                 zorder=1.5,
             )
-        )
+        ))
 
     # ---- Mini-kapuk ----
-    for g in mini_goals:
-        gx = g["x"]
-        gy = g["y"]
-        gw = g.get("w", 4)
-        gh = g.get("h", 8)
-        ax.add_patch(
+    for gx, gy, gw, gh in cd.mini_goals:
+        add(add_patch(
             Rectangle(
                 (gx - gw / 2, gy - gh / 2),
                 gw,
@@ -191,109 +191,125 @@ def draw_drill(diagram: Dict[str, Any],
                 facecolor="#111827",
                 zorder=4,
             )
-        )
+        ))
 
     # ---- Bóják ----
-    for c in cones:
-        x, y = c["x"], c["y"]
-        cone = Circle((x, y), 1.2,
-                      facecolor="#f97316", edgecolor="black",
-                      linewidth=1, zorder=4)
-        ax.add_patch(cone)
+    if batched:
+        add_circles(cd.cones, 1.2,
+                    facecolor="#f97316", edgecolor="black", linewidth=1, zorder=4)
+    else:
+        for x, y in cd.cones:
+            cone = Circle((x, y), 1.2,
+                          facecolor="#f97316", edgecolor="black",
+                          linewidth=1, zorder=4)
+            add(add_patch(cone))
 
     # ---- Játékosok (kétgyűrűs marker) ----
-    for p in players:
-        x, y = p["x"], p["y"]
-        label = p.get("label", "")
-        team = p.get("team", "home")
-        inner_color = TEAM_COLORS.get(team, "#e11d48")
-
-        # külső kontúr
-        outer = Circle((x, y), 3.4,
-                       facecolor="black",
-                       edgecolor="black",
-                       linewidth=0.5,
-                       zorder=5)
-        ax.add_patch(outer)
-
-        # belső színes kör
-        inner = Circle((x, y), 2.8,
-                       facecolor=inner_color,
-                       edgecolor="white",
-                       linewidth=1.4,
-                       zorder=6)
-        ax.add_patch(inner)
-
-        ax.text(x, y, label,
-                ha="center", va="center",
-                fontsize=7, color="black",
-                zorder=7)
-
-    # ---- Passzok (folyamatos fehér nyíl) ----
-    for ps in passes:
-        start = _get_point(players, ps, "from")
-        end = _get_point(players, ps, "to")
-        if not start or not end:
-            continue
-
-        arrow = FancyArrowPatch(
-            (start["x"], start["y"]),
-            (end["x"], end["y"]),
-            arrowstyle="->",
-            mutation_scale=10,
-            linewidth=2,
-            linestyle="-",
-            color="white",
-            zorder=3,
-        )
-        ax.add_patch(arrow)
-
-    # ---- Futásvonalak (szaggatott fehér nyíl) ----
-    for rn in runs:
-        start = _get_point(players, rn, "from")
-        end = _get_point(players, rn, "to")
-        if not start or not end:
-            continue
-
-        arrow = FancyArrowPatch(
-            (start["x"], start["y"]),
-            (end["x"], end["y"]),
-            arrowstyle="->",
-            mutation_scale=10,
-            linewidth=2,
-            linestyle="--",
-            color="white",
-            zorder=2,
-        )
-        ax.add_patch(arrow)
+    colors = [TEAM_COLORS.get(team, "#e11d48") for team in cd.player_team]
+    if batched:
+        add_circles(cd.player_xy, 3.4,
+                    facecolor="black", edgecolor="black", linewidth=0.5, zorder=5)
+        add_circles(cd.player_xy, 2.8,
+                    facecolor=colors, edgecolor="white", linewidth=1.4, zorder=6)
+        for (x, y), label in zip(cd.player_xy, cd.player_label):
+            add(ax.text(x, y, label,
+                        ha="center", va="center",
+                        fontsize=7, color="black",
+                        zorder=7))
+    else:
+        for (x, y), label, inner_color in zip(cd.player_xy, cd.player_label, colors):
+            # külső kontúr
+            outer = Circle((x, y), 3.4,
+                           facecolor="black",
+                           edgecolor="black",
+                           linewidth=0.5,
+                           zorder=5)
+            add(add_patch(outer))
+
+            # belső színes kör
+            inner = Circle((x, y), 2.8,
+                           facecolor=inner_color,
+                           edgecolor="white",
+                           linewidth=1.4,
+                           zorder=6)
+            add(add_patch(inner))
+
+            add(ax.text(x, y, label,
+                        ha="center", va="center",
+                        fontsize=7, color="black",
+                        zorder=7))
+
+    # ---- Passzok (folyamatos fehér nyíl), futásvonalak (szaggatott fehér nyíl) ----
+    shrink = {}
+    if batched and (len(cd.passes) or len(cd.runs)):
+        pt = _data_per_point(ax) * ARROW_SHRINK_PT
+        shrink = {"shrinkA": 0, "shrinkB": 0}
+    for segments, linestyle, zorder in ((cd.passes, "-", 3), (cd.runs, "--", 2)):
+        if shrink and len(segments):
+            segments = _shrunk(segments, pt)
+        for x0, y0, x1, y1 in segments:
+            arrow = FancyArrowPatch(
+                (x0, y0),
+                (x1, y1),
+                arrowstyle="->",
+                mutation_scale=10,
+                linewidth=2,
+                linestyle=linestyle,
+                color="white",
+                zorder=zorder,
+                **shrink,
+            )
+            add(add_patch(arrow))
 
     # ---- Labda (fehér-fekete „foci labda”) ----
-    ball_x = ball_spec.get("x")
-    ball_y = ball_spec.get("y")
-    if ball_spec.get("owner_id"):
-        owner = _get_player_by_id(players, ball_spec["owner_id"])
-        if owner:
-            ball_x, ball_y = owner["x"], owner["y"]
-
-    if ball_x is not None and ball_y is not None:
-        outer = Circle((ball_x, ball_y), 1.3,
-                       facecolor="white",
-                       edgecolor="black",
-                       linewidth=1.1,
-                       zorder=8)
-        ax.add_patch(outer)
-        inner = Circle((ball_x, ball_y), 0.6,
-                       facecolor="black",
-                       edgecolor="black",
-                       linewidth=0.8,
-                       zorder=9)
-        ax.add_patch(inner)
+    if cd.ball is not None:
+        ball_x, ball_y = cd.ball
+        if batched:
+            add_circles([(ball_x, ball_y)], 1.3,
+                        facecolor="white", edgecolor="black", linewidth=1.1, zorder=8)
+            add_circles([(ball_x, ball_y)], 0.6,
+                        facecolor="black", edgecolor="black", linewidth=0.8, zorder=9)
+        else:
+            outer = Circle((ball_x, ball_y), 1.3,
+                           facecolor="white",
+                           edgecolor="black",
+                           linewidth=1.1,
+                           zorder=8)
+            add(add_patch(outer))
+            inner = Circle((ball_x, ball_y), 0.6,
+                           facecolor="black",
+                           edgecolor="black",
+                           linewidth=0.8,
+                           zorder=9)
+            add(add_patch(inner))
 
     # ---- Szövegcímkék ----
-    for t in texts:
-        ax.text(t["x"], t["y"], t["text"],
-                fontsize=8, color="white",
-                ha="left", va="center", zorder=10)
+    for x, y, text in cd.texts:
+        add(ax.text(x, y, text,
+                    fontsize=8, color="white",
+                    ha="left", va="center", zorder=10))
+
+    return artists
+
+
+def draw_drill(diagram: Union[Dict[str, Any], CompiledDiagram],
+               figsize=PITCH_FIGSIZE,
+               show: bool = False,
+               save_path: Optional[str] = None,
+               fast: bool = False):
+    """
+    Megrajzolja a pályát + játékosokat + passzokat + futásokat + extra elemeket.
+    fast=True: a pálya és a játékosok/bóják/labda kötegelt collection-ökkel
+    (ugyanaz a kép, töredéknyi artist). Könyvtárnyi ábrához lásd render_drill.
+    A diagram lehet dict vagy tbp.diagram.CompiledDiagram; hibás játékos-
+    hivatkozásnál ValueError, még a rajzolás előtt.
+    """
+    cd = _compiled(diagram)
+    fig, ax = plt.subplots(figsize=figsize)
+    draw_pitch(ax, fast=fast)
+    if fast:
+        plt.tight_layout()    # a kötegelt nyilakhoz kell a végleges tengelyméret
+    _add_drill_artists(ax, cd, batched=fast)
 
     plt.tight_layout()
 
@@ -306,3 +322,368 @@ def draw_drill(diagram: Dict[str, Any],
         plt.close(fig)
 
     return fig
+
+
+def drill_vector(diagram: Union[Dict[str, Any], CompiledDiagram],
+                 fmt: str = "svg",
+                 figsize=PITCH_FIGSIZE) -> bytes:
+    """
+    A draw_drill ábrája vektorosan (fmt="svg" vagy "pdf") memóriába, pyplot
+    figure és ideiglenes fájl nélkül. (A create_pdf a tbp.pdf_vector-ral
+    közvetlenül az oldalra rajzol, mert az fpdf 1.7 SVG/PDF-et nem ágyaz be.)
+    """
+    import io
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    cd = _compiled(diagram)
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    draw_pitch(ax)
+    _add_drill_artists(ax, cd)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, bbox_inches="tight")
+    return buf.getvalue()
+
+
+# ============================
+# 4. GYORS RENDERELÉS (újrahasznált pálya-háttér)
+# ============================
+
+SAVE_DPI = 150
+PAD_INCHES = 0.1      # mint a savefig(bbox_inches="tight") alapértelmezése
+
+
+def _crop_to_bbox(rgba, bbox, dpi: float):
+    """
+    A canvas pufferének kivágása a bbox-ra (hüvelyk), ugyanakkora pixelmérettel,
+    mint a savefig(bbox_inches="tight") képe; a figure-ön kívüli rész fehér.
+    """
+    import numpy as np
+
+    height = rgba.shape[0]
+    w, h = int(bbox.width * dpi), int(bbox.height * dpi)
+    x0 = int(round(bbox.x0 * dpi))
+    y1 = height - int(round(bbox.y0 * dpi))
+    x1, y0 = x0 + w, y1 - h
+    out = np.full((y1 - y0, x1 - x0, 4), 255, dtype=np.uint8)
+    sx0, sy0 = max(x0, 0), max(y0, 0)
+    sx1, sy1 = min(x1, rgba.shape[1]), min(y1, height)
+    out[sy0 - y0:sy1 - y0, sx0 - x0:sx1 - x0] = rgba[sy0:sy1, sx0:sx1]
+    return out
+
+
+class _PitchCanvas:
+    """
+    Egy (figsize, dpi) párhoz tartozó, pyplot nélküli figure, amelyen a pálya
+    egyszer rajzolódik ki és raszterként (copy_from_bbox) tárolódik. Ábránként
+    csak a háttér visszaállítása és a dinamikus elemek kirajzolása történik.
+    """
+
+    def __init__(self, figsize, dpi: int):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.lock = threading.Lock()
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        # a zorder >= 2 pályaelemek (pontok, kapuk) a dinamikus elemekkel
+        # együtt, zorder szerint rajzolódnak, hogy a takarás az eredeti legyen
+        self.top = _draw_pitch_fast(self.ax)
+        self.fig.tight_layout()
+
+        renderer = self.canvas.get_renderer()
+        self.base_bbox = self.fig.get_tightbbox(renderer)
+        for a in self.top:
+            a.set_visible(False)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for a in self.top:
+            a.set_visible(True)
+
+    def render(self, cd: CompiledDiagram, fmt: str = "png") -> bytes:
+        import io
+
+        import numpy as np
+        from matplotlib.transforms import Bbox
+        from PIL import Image
+
+        with self.lock:
+            self.canvas.restore_region(self.background)
+            before = set(map(id, self.ax.get_children()))
+            try:
+                artists = _add_drill_artists(self.ax, cd, batched=True)
+                renderer = self.canvas.get_renderer()
+                for a in sorted(self.top + artists, key=lambda a: a.get_zorder()):
+                    self.ax.draw_artist(a)
+
+                # tight bbox: a pálya + a nem vágott szövegek kiterjedése
+                to_inches = self.fig.dpi_scale_trans.inverted()
+                boxes = [self.base_bbox] + [
+                    a.get_window_extent(renderer).transformed(to_inches)
+                    for a in artists
+                    if isinstance(a, Text) and a.get_text()
+                ]
+                bbox = Bbox.union(boxes).padded(PAD_INCHES)
+                rgba = np.asarray(self.canvas.buffer_rgba())
+            finally:
+                # hibás diagramnál is csak a háttér maradjon a közös ax-en
+                for a in self.ax.get_children():
+                    if id(a) not in before:
+                        a.remove()
+
+            dpi = self.fig.dpi
+            out = _crop_to_bbox(rgba, bbox, dpi)
+
+        im = Image.fromarray(out, "RGBA")
+        buf = io.BytesIO()
+        if fmt.lower() in ("jpg", "jpeg"):
+            im.convert("RGB").save(buf, "JPEG", quality=90, dpi=(dpi, dpi))
+        else:
+            im.save(buf, "PNG", dpi=(dpi, dpi))
+        return buf.getvalue()
+
+
+_CANVASES: Dict[Tuple[Tuple[float, float], int], _PitchCanvas] = {}
+_CANVASES_LOCK = threading.Lock()
+
+
+def render_drill(diagram: Union[Dict[str, Any], CompiledDiagram],
+                 figsize=PITCH_FIGSIZE,
+                 dpi: int = SAVE_DPI,
+                 fmt: str = "png") -> bytes:
+    """
+    Gyors mód sok ábrához: a draw_drill(save_path=...) képét adja vissza
+    bájtként, de a pálya-hátteret (figsize, dpi)-nként egyszer rajzolja meg,
+    és nem hoz létre pyplot figure-t.
+    """
+    cd = _compiled(diagram)
+    key = (tuple(figsize), int(dpi))
+    canvas = _CANVASES.get(key)
+    if canvas is None:
+        with _CANVASES_LOCK:
+            canvas = _CANVASES.get(key)
+            if canvas is None:
+                canvas = _CANVASES[key] = _PitchCanvas(figsize, dpi)
+    return canvas.render(cd, fmt)
+
+
+# ============================
+# 5. ANIMÁCIÓ (kulcskockák, blitting)
+# ============================
+
+ANIM_FPS = 25
+ANIM_DPI = 100
+
+
+class _DrillAnimator:
+    """
+    Egy animáció saját canvas-e: a pálya és a statikus elemek (zóna, bóják,
+    kapuk, nyilak) egyszer rajzolódnak ki a háttérbe; kockánként csak a
+    játékosok és a labda collection-jeinek offsetje, valamint a feliratok
+    pozíciója változik, és csak ezek (meg a föléjük kerülő statikus elemek)
+    rajzolódnak újra. A kocka ideje és memóriája a klip hosszától független.
+    """
+
+    def __init__(self, anim, figsize, dpi: int):
+        import numpy as np
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from matplotlib.transforms import Affine2D
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.fig)
+        ax = self.ax = self.fig.add_subplot(111)
+        top = _draw_pitch_fast(ax)
+        self.fig.tight_layout()
+
+        base = anim.base
+        static_cd = base._replace(player_xy=np.empty((0, 2)), player_team=(),
+                                  player_label=(), ball=None)
+        static = _add_drill_artists(ax, static_cd, batched=True)
+
+        # data-egységű körök, offsetként mozgatva (a transData lineáris része)
+        ax.apply_aspect()
+        m = ax.transData.get_affine().get_matrix().copy()
+        m[:2, 2] = 0
+        scale = Affine2D(m)
+
+        def circles(radius, xy, **kw):
+            return ax.add_collection(PatchCollection(
+                [Circle((0, 0), radius) for _ in range(len(xy))],
+                transform=scale, offsets=xy, offset_transform=ax.transData, **kw,
+            ), autolim=False)
+
+        xy = base.player_xy
+        colors = [TEAM_COLORS.get(team, "#e11d48") for team in base.player_team]
+        self.players = [
+            circles(3.4, xy, facecolor="black", edgecolor="black", linewidth=0.5, zorder=5),
+            circles(2.8, xy, facecolor=colors, edgecolor="white", linewidth=1.4, zorder=6),
+        ]
+        self.labels = [
+            ax.text(x, y, label, ha="center", va="center", fontsize=7, color="black", zorder=7)
+            for (x, y), label in zip(xy, base.player_label)
+        ]
+        ball0 = np.zeros((1, 2))
+        self.ball = [
+            circles(1.3, ball0, facecolor="white", edgecolor="black", linewidth=1.1, zorder=8),
+            circles(0.6, ball0, facecolor="black", edgecolor="black", linewidth=0.8, zorder=9),
+        ]
+        moving = self.players + self.labels + self.ball
+        over = [a for a in top + static if a.get_zorder() >= 5]
+        self.draw_order = sorted(moving + over, key=lambda a: a.get_zorder())
+
+        # fix kivágás: a pálya + statikus feliratok (a mozgó elemek a pályán belül vannak)
+        renderer = self.canvas.get_renderer()
+        self.bbox = self.fig.get_tightbbox(renderer).padded(PAD_INCHES)
+
+        for a in self.draw_order:
+            a.set_visible(False)
+        self.canvas.draw()
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        for a in self.draw_order:
+            a.set_visible(True)
+
+    def frame(self, player_xy, ball_xy):
+        """Egy kocka RGBA tömbje (a kivágott méretben)."""
+        import numpy as np
+
+        self.canvas.restore_region(self.background)
+        for coll in self.players:
+            coll.set_offsets(player_xy)
+        for text, (x, y) in zip(self.labels, player_xy):
+            text.set_position((x, y))
+        has_ball = not np.isnan(ball_xy).any()
+        for coll in self.ball:
+            coll.set_visible(has_ball)
+            if has_ball:
+                coll.set_offsets(ball_xy.reshape(1, 2))
+        for a in self.draw_order:
+            self.ax.draw_artist(a)
+        return _crop_to_bbox(np.asarray(self.canvas.buffer_rgba()), self.bbox, self.fig.dpi)
+
+
+def iter_animation_frames(diagram, fps: float = ANIM_FPS, figsize=PITCH_FIGSIZE,
+                          dpi: int = ANIM_DPI, duration: Optional[float] = None):
+    """
+    A kulcskockás diagram (lásd tbp.diagram.compile_animation) kockái RGBA
+    tömbökként, egyenként (generátor). A diagram lehet dict vagy CompiledAnimation.
+    """
+    from tbp.diagram import CompiledAnimation, compile_animation
+
+    anim = diagram if isinstance(diagram, CompiledAnimation) else compile_animation(diagram, duration)
+    times = anim.frame_times(fps)
+    players = anim.players_at(times)
+    balls = anim.ball_at(times)
+    animator = _DrillAnimator(anim, figsize, dpi)
+    for i in range(len(times)):
+        yield animator.frame(players[i], balls[i])
+
+
+def _ffmpeg_path() -> Optional[str]:
+    import shutil
+
+    import matplotlib
+    path = matplotlib.rcParams.get("animation.ffmpeg_path") or "ffmpeg"
+    return shutil.which(path)
+
+
+def _save_gif(frames, out_path: str, fps: float) -> int:
+    """
+    GIF kockánként kiírva (a Pillow save_all minden kockát memóriában gyűjt):
+    egyszerre csak az előző és az aktuális kocka él. Közös paletta az első
+    kockából; a változatlan kocka az előző időtartamát növeli, a többiből csak
+    a változott téglalap íródik – ugyanaz, amit a save_all(optimize=False) ír.
+    """
+    from PIL import GifImagePlugin, Image, ImageChops
+
+    delay = int(round(1000 / fps))
+    palette = None
+    prev = None
+    pending = None          # [kép, offset, időtartam] – a következő eltérő kockáig vár
+    n = 0
+    with open(out_path, "wb") as fp:
+        for frame in frames:
+            rgb = Image.fromarray(frame, "RGBA").convert("RGB")
+            n += 1
+            if palette is None:
+                palette = rgb.quantize(colors=255, method=Image.Quantize.MEDIANCUT)
+                q = rgb.quantize(palette=palette, dither=Image.Dither.NONE)
+                header, _ = GifImagePlugin.getheader(q.copy(), info={"loop": 0, "duration": delay})
+                fp.writelines(header)
+                bbox = (0, 0) + rgb.size
+            else:
+                bbox = ImageChops.difference(prev, rgb).getbbox()
+                if bbox is None:
+                    pending[2] += delay
+                    continue
+                q = rgb.crop(bbox).quantize(palette=palette, dither=Image.Dither.NONE)
+                fp.writelines(GifImagePlugin.getdata(pending[0], offset=pending[1], duration=pending[2]))
+            pending = [q, bbox[:2], delay]
+            prev = rgb
+        if pending is not None:
+            fp.writelines(GifImagePlugin.getdata(pending[0], offset=pending[1], duration=pending[2]))
+        fp.write(b";")
+    return n
+
+
+def animate_drill(diagram,
+                  out_path: str,
+                  fps: float = ANIM_FPS,
+                  figsize=PITCH_FIGSIZE,
+                  dpi: int = ANIM_DPI,
+                  duration: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Animáció mentése a kiterjesztés szerint:
+      .gif – Pillow, kockánként kiírva (közös paletta, csak a változott téglalap)
+      .mp4 – ffmpeg-nek csövön átadott nyers kockák (állandó memória)
+      egyéb (mappa) – frame_0000.png, frame_0001.png, ...
+    Visszaadja: {"frames": n, "seconds": idő, "path": out_path}.
+    """
+    import subprocess
+    import time
+
+    from PIL import Image
+
+    t0 = time.perf_counter()
+    frames = iter_animation_frames(diagram, fps, figsize, dpi, duration)
+    ext = os.path.splitext(out_path)[1].lower()
+    n = 0
+
+    if ext == ".mp4":
+        ffmpeg = _ffmpeg_path()
+        if ffmpeg is None:
+            raise RuntimeError("MP4 exporthoz ffmpeg szükséges (PATH vagy animation.ffmpeg_path)")
+        first = next(frames)
+        h, w = first.shape[:2]
+        proc = subprocess.Popen(
+            [ffmpeg, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{w}x{h}", "-r", str(fps), "-i", "-",
+             "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2:color=white",
+             "-vcodec", "libx264", "-pix_fmt", "yuv420p", out_path],
+            stdin=subprocess.PIPE,
+        )
+        try:
+            for frame in itertools.chain([first], frames):
+                proc.stdin.write(frame.tobytes())
+                n += 1
+        finally:
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg hiba (kód: {proc.returncode})")
+
+    elif ext == ".gif":
+        n = _save_gif(frames, out_path, fps)
+
+    else:
+        os.makedirs(out_path, exist_ok=True)
+        for frame in frames:
+            Image.fromarray(frame, "RGBA").save(os.path.join(out_path, f"frame_{n:04d}.png"))
+            n += 1
+
+    return {"frames": n, "seconds": time.perf_counter() - t0, "path": out_path}
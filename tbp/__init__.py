@@ -0,0 +1,7 @@
+"""
+Training Blueprint – újrahasznosítható mag (Streamlit nélkül importálható).
+
+A modulok importja mellékhatás-mentes: nem olvasnak fájlt, és a nehéz
+könyvtárak (pandas, fpdf, matplotlib, numpy) csak tényleges használatkor
+töltődnek be. Mérés: python -m tbp.coldstart
+"""
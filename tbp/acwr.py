@@ -0,0 +1,174 @@
+# tbp/acwr.py
+"""
+ACWR (akut : krónikus terhelés arány) naptári hetek alapján.
+
+A history szerkezete: {coach_id: {team_id: {"YYYY-Www": workload}}}.
+"""
+
+import json
+import os
+from datetime import date
+from typing import Dict, Any, Optional, Tuple
+
+ACWR_HISTORY_PATH = "acwr_history.json"        # tartós ACWR tárolás
+
+
+def week_key_for(d: date) -> str:
+    iso_year, iso_week, _ = d.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"  # ACWR kulcs
+
+
+def load_acwr_history(path: str = ACWR_HISTORY_PATH) -> Dict[str, Any]:
+    """
+    A régi JSON history beolvasása (tbp.workload_store: import / JSON tároló).
+    Hiányzó fájlnál üres history; sérült fájlnál ValueError (nem néma nullázás).
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Hibás ACWR history JSON ({path}): {e}") from e
+
+
+def compute_acwr(team_weeks: Dict[str, float],
+                 current_week_key: str) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    """(akut, krónikus, acwr) – a krónikus az előző (max.) 4 rögzített hét átlaga."""
+    if not team_weeks:
+        return None, None, None
+
+    acute = team_weeks.get(current_week_key)
+    if acute is None:
+        return None, None, None
+
+    keys = sorted(team_weeks.keys())  # YYYY-Www lexikografikusan jó
+    idx = keys.index(current_week_key) if current_week_key in keys else None
+    if idx is None:
+        return acute, None, None
+
+    prev_keys = keys[max(0, idx - 4):idx]
+    chronic_vals = [team_weeks[k] for k in prev_keys]
+
+    if not chronic_vals:
+        return acute, None, None
+
+    chronic = sum(chronic_vals) / len(chronic_vals)
+    acwr = acute / chronic if chronic > 0 else None
+    return acute, chronic, acwr
+
+
+############################################################
+# TELJES IDŐSOR EGY MENETBEN (gördülő átlag + EWMA)
+############################################################
+
+class AcwrSeries:
+    """
+    Egy csapat teljes ACWR idősora rendezett hét-tömbön.
+    A hiányzó érték NaN a tömbökben, None az at() eredményében.
+    """
+
+    def __init__(self, weeks, load, acute, chronic, ratio, recorded):
+        self.weeks = weeks          # List[str] – "YYYY-Www", növekvő
+        self.load = load            # np.ndarray
+        self.acute = acute
+        self.chronic = chronic
+        self.ratio = ratio
+        self.recorded = recorded    # np.ndarray[bool] – volt-e rögzített terhelés a héten
+        self._pos = {w: i for i, w in enumerate(weeks)}
+
+    def __len__(self):
+        return len(self.weeks)
+
+    def at(self, week_key: str) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+        """(akut, krónikus, acwr) – ugyanaz a szerződés, mint a compute_acwr-é."""
+        i = self._pos.get(week_key)
+        if i is None or not self.recorded[i]:
+            return None, None, None
+
+        def val(a):
+            v = float(a[i])
+            return None if v != v else v
+
+        return val(self.acute), val(self.chronic), val(self.ratio)
+
+
+def _week_monday(week_key: str) -> date:
+    y, w = week_key.split("-W")
+    return date.fromisocalendar(int(y), int(w), 1)
+
+
+def calendar_weeks(first: str, last: str):
+    """Az összes ISO hét first..last között (a rés-hetek is)."""
+    from datetime import timedelta
+
+    d, end = _week_monday(first), _week_monday(last)
+    out = []
+    while d <= end:
+        out.append(week_key_for(d))
+        d += timedelta(days=7)
+    return out
+
+
+def acwr_series(team_weeks: Dict[str, float],
+                model: str = "rolling",
+                window: int = 4,
+                gap_aware: Optional[bool] = None,
+                acute_span: float = 1.0,
+                chronic_span: float = 4.0) -> AcwrSeries:
+    """
+    model="rolling": krónikus = az előző `window` hét átlaga. gap_aware=False
+        (alapértelmezés) esetén a rögzített hetek sorrendje számít, és az
+        eredmény bitre azonos a compute_acwr-rel.
+    model="ewma": exponenciálisan súlyozott akut / krónikus terhelés
+        (λ = 2 / (span + 1)); a krónikus az előző hétig tart, mint a
+        gördülő modellnél. Alapértelmezésben naptár-alapú.
+
+    gap_aware=True: a hiányzó ISO hetek 0 terheléssel számítanak.
+    """
+    import numpy as np
+
+    if model not in ("rolling", "ewma"):
+        raise ValueError(f"Ismeretlen ACWR modell: {model}")
+    if gap_aware is None:
+        gap_aware = model == "ewma"
+
+    keys = sorted(team_weeks.keys())  # YYYY-Www lexikografikusan jó
+    if keys and gap_aware:
+        weeks = calendar_weeks(keys[0], keys[-1])
+    else:
+        weeks = keys
+    n = len(weeks)
+
+    load = np.array([team_weeks.get(k, 0.0) for k in weeks], dtype=float)
+    recorded = np.array([k in team_weeks for k in weeks], dtype=bool)
+    idx = np.arange(n)
+
+    if model == "rolling":
+        acute = load.copy()
+        # összegzés ugyanabban a sorrendben, mint a sum(prev) – bitre azonos eredmény
+        total = np.zeros(n)
+        for k in range(window, 0, -1):
+            src = idx - k
+            total += np.where(src >= 0, load[np.clip(src, 0, None)], 0.0)
+        count = np.minimum(idx, window).astype(float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            chronic = np.where(count > 0, total / np.where(count > 0, count, 1.0), np.nan)
+    else:
+        la = 2.0 / (acute_span + 1.0)
+        lc = 2.0 / (chronic_span + 1.0)
+        acute = np.empty(n)
+        chronic = np.full(n, np.nan)
+        a = c = None
+        for i in range(n):
+            x = load[i]
+            a = x if a is None else la * x + (1.0 - la) * a
+            acute[i] = a
+            if c is not None:
+                chronic[i] = c
+            c = x if c is None else lc * x + (1.0 - lc) * c
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = np.where(chronic > 0, acute / np.where(chronic > 0, chronic, 1.0), np.nan)
+
+    return AcwrSeries(weeks, load, acute, chronic, ratio, recorded)
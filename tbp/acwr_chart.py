@@ -0,0 +1,110 @@
+# tbp/acwr_chart.py
+"""
+ACWR trend grafikon PNG-be renderelve.
+
+- pyplot nélkül (matplotlib.figure.Figure + Agg canvas): a figure nem kerül
+  a pyplot globális registry-jébe, a renderelés után felszabadul.
+- Hosszú history esetén a heteket fix pontszámra (MAX_POINTS) aggregálja:
+  vödrönként átlagos terhelés és ACWR, az ACWR min–max sávjával, így a
+  kiugrások sem vesznek el. A tengelyfeliratok száma legfeljebb MAX_TICKS.
+
+A cache a hívó dolga (app: csapat history-verzióval kulcsolva).
+"""
+
+import io
+from typing import List, NamedTuple
+
+MAX_POINTS = 104        # ~2 év hetente; efölött aggregálás
+MAX_TICKS = 12
+FIGSIZE = (8, 4)
+DPI = 100
+
+
+class ChartData(NamedTuple):
+    labels: List[str]   # vödör első hete (aggregálásnál "első–utolsó")
+    load: "object"      # np.ndarray
+    ratio: "object"
+    ratio_min: "object"
+    ratio_max: "object"
+    bucket: int         # hány hét egy pont
+
+
+def _bucket_stat(a, size: int, fn):
+    """NaN-t kihagyó vödrönkénti statisztika (üres vödörre NaN, figyelmeztetés nélkül)."""
+    import numpy as np
+
+    n = len(a)
+    pad = (-n) % size
+    m = np.r_[a, np.full(pad, np.nan)].reshape(-1, size)
+    valid = ~np.isnan(m)
+    cnt = valid.sum(axis=1)
+    if fn == "mean":
+        s = np.where(valid, m, 0.0).sum(axis=1)
+        return np.where(cnt > 0, s / np.maximum(cnt, 1), np.nan)
+    fill = np.inf if fn == "min" else -np.inf
+    r = getattr(np.where(valid, m, fill), fn)(axis=1)
+    return np.where(cnt > 0, r, np.nan)
+
+
+def downsample(series, max_points: int = MAX_POINTS) -> ChartData:
+    import numpy as np
+
+    n = len(series)
+    load = np.asarray(series.load, dtype=float)
+    ratio = np.asarray(series.ratio, dtype=float)
+    if n <= max_points:
+        return ChartData(list(series.weeks), load, ratio, ratio, ratio, 1)
+
+    size = -(-n // max_points)
+    weeks = series.weeks
+    labels = [
+        f"{weeks[i]}–{weeks[min(i + size, n) - 1]}" if min(i + size, n) - 1 > i else weeks[i]
+        for i in range(0, n, size)
+    ]
+    return ChartData(
+        labels,
+        _bucket_stat(load, size, "mean"),
+        _bucket_stat(ratio, size, "mean"),
+        _bucket_stat(ratio, size, "min"),
+        _bucket_stat(ratio, size, "max"),
+        size,
+    )
+
+
+def render_acwr_chart(series, max_points: int = MAX_POINTS, max_ticks: int = MAX_TICKS,
+                      figsize=FIGSIZE, dpi: int = DPI) -> bytes:
+    """Az ACWR idősor grafikonja PNG bájtként."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    data = downsample(series, max_points)
+    x = list(range(len(data.labels)))
+    marker = "o" if data.bucket == 1 else None
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    try:
+        ax1 = fig.add_subplot(111)
+        ax1.plot(x, data.load, marker=marker)
+        ax1.set_xlabel("Hét (YYYY-Www)" if data.bucket == 1 else f"Hét ({data.bucket} hetes átlag)")
+        ax1.set_ylabel("Workload")
+
+        ax2 = ax1.twinx()
+        if data.bucket > 1:
+            ax2.fill_between(x, data.ratio_min, data.ratio_max, alpha=0.15, linewidth=0)
+        ax2.plot(x, data.ratio, marker="s" if marker else None)
+        ax2.set_ylabel("ACWR")
+        ax2.axhspan(0.8, 1.3, alpha=0.2)
+
+        step = max(1, -(-len(x) // max_ticks))
+        ticks = x[::step]
+        ax1.set_xticks(ticks)
+        ax1.set_xticklabels([data.labels[i].split("–")[0] for i in ticks], rotation=45, ha="right")
+        ax1.grid(True, alpha=0.3)
+        fig.tight_layout()
+
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png")
+        return buf.getvalue()
+    finally:
+        fig.clear()
@@ -0,0 +1,97 @@
+# tbp/acwr_dashboard.py
+"""
+Klubszintű ACWR áttekintés: minden edző / csapat akut és krónikus terhelése,
+ACWR zónája és trendje egyetlen oszlopos táblából, csoportosított
+tömbműveletekkel (nincs csapatonkénti compute_acwr hívás).
+
+A gördülő krónikus átlag ugyanúgy számolódik, mint a compute_acwr-ben
+(az előző max. 4 rögzített hét), így az értékek egyeznek az egycsapatos nézettel.
+"""
+
+from typing import List, Optional
+
+from tbp.workload_store import Row, WorkloadStore
+
+ZONES = [
+    # (felső határ, címke) – ugyanazok a határok, mint az app figyelmeztetéseinél
+    (0.8, "alulterhelés (<0.8)"),
+    (1.3, "optimális (0.8–1.3)"),
+    (1.5, "emelkedett (1.3–1.5)"),
+    (float("inf"), "magas (>1.5)"),
+]
+
+COLUMNS = ["Edző", "Csapat", "Hét", "Akut", "Krónikus", "ACWR", "Zóna", "Trend"]
+
+
+def acwr_zone(acwr: Optional[float]) -> str:
+    if acwr is None or acwr != acwr:
+        return "nincs adat"
+    if acwr < 0.8:
+        return ZONES[0][1]
+    if acwr <= 1.3:
+        return ZONES[1][1]
+    if acwr <= 1.5:
+        return ZONES[2][1]
+    return ZONES[3][1]
+
+
+def club_acwr_frame(rows: List[Row], week_key: Optional[str] = None, window: int = 4):
+    """
+    rows: (coach_id, team_id, week_key, load), (coach, team, week) szerint rendezve.
+    week_key=None: csapatonként az utolsó rögzített hét; egyébként az adott
+    naptári hét (a hiányzó csapatok kimaradnak, mint a compute_acwr-nél).
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame.from_records(rows, columns=["coach", "team", "week", "load"])
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    load = df["load"].to_numpy(dtype=float)
+    team_key = (df["coach"] + "\x00" + df["team"]).to_numpy()
+    new_team = np.r_[True, team_key[1:] != team_key[:-1]]
+    start = np.maximum.accumulate(np.where(new_team, np.arange(len(df)), 0))
+    pos = np.arange(len(df)) - start                     # hét sorszáma a csapaton belül
+
+    # előző `window` hét összege, a sum(prev) sorrendjében
+    total = np.zeros(len(df))
+    for k in range(window, 0, -1):
+        shifted = np.r_[np.zeros(k), load[:-k]] if k < len(df) else np.zeros(len(df))
+        total += np.where(pos >= k, shifted, 0.0)
+    count = np.minimum(pos, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        chronic = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        ratio = np.where(chronic > 0, load / np.where(chronic > 0, chronic, 1.0), np.nan)
+    prev_ratio = np.where(pos > 0, np.r_[np.nan, ratio[:-1]], np.nan)
+
+    df["chronic"] = chronic
+    df["ratio"] = ratio
+    df["trend"] = ratio - prev_ratio
+
+    if week_key is None:
+        last = np.r_[team_key[1:] != team_key[:-1], True]
+        cur = df[last]
+    else:
+        cur = df[df["week"] == week_key]
+
+    trend = np.select(
+        [cur["trend"] > 0.05, cur["trend"] < -0.05, cur["trend"].notna()],
+        ["↑", "↓", "→"], default="–",
+    )
+    out = pd.DataFrame({
+        "Edző": cur["coach"].to_numpy(),
+        "Csapat": cur["team"].to_numpy(),
+        "Hét": cur["week"].to_numpy(),
+        "Akut": cur["load"].to_numpy(),
+        "Krónikus": cur["chronic"].to_numpy(),
+        "ACWR": cur["ratio"].to_numpy(),
+        "Zóna": [acwr_zone(a) for a in cur["ratio"].to_numpy()],
+        "Trend": trend,
+    })
+    return out.reset_index(drop=True)
+
+
+def club_acwr_table(store: WorkloadStore, week_key: Optional[str] = None):
+    """Egyetlen olvasás a tárolóból, majd a teljes klub tömbösítve."""
+    return club_acwr_frame(store.all_rows(), week_key)
@@ -0,0 +1,249 @@
+# tbp/batch.py
+"""
+Kötegelt, Streamlit nélküli edzésterv-generálás.
+
+    python -m tbp.batch keresek.jsonl -o kimenet/ --pdf --workers 8
+
+Bemenet: CSV vagy JSONL, soronként egy kérés. Mezők:
+    coach, team, age_group, period_week,
+    fo_taktikai, taktikai, technikai, kondi,   (listák CSV-ben ";"-vel elválasztva)
+    date (YYYY-MM-DD), notes, match_override
+Az üres taktikai / technikai / kondi mezők a periodizációs hét céljait kapják,
+ugyanúgy, mint az app oldalsávjában.
+
+Kimenet: kérésenként <n>_<csapat>.json (és --pdf esetén .pdf) a kimeneti mappában;
+--booklet esetén az összes terv egyetlen füzetben (booklet.pdf), ahol az
+ismétlődő gyakorlatok képe csak egyszer ágyazódik be.
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
+
+from tbp.acwr import week_key_for
+from tbp.catalog import JSON_PATH, as_plain
+from tbp.compiled_catalog import open_catalog
+from tbp.drill_index import DrillIndex
+from tbp.periodization import AGE_GROUPS, get_period_targets
+from tbp.scoring import ScoringEngine
+from tbp.selection import generate_plan
+from tbp.workload import STAGES, compute_workload
+
+############################################################
+# BEMENET
+############################################################
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "igen", "yes", "y")
+
+
+def read_requests(path: str) -> List[Dict[str, Any]]:
+    """CSV vagy JSONL kérések beolvasása (kiterjesztés alapján)."""
+    rows: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            rows = [dict(r) for r in csv.DictReader(f)]
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    rows.append(json.loads(line))
+    return rows
+
+
+def normalize_request(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Alapértékek kitöltése a periodizációs hét alapján; hibás mezőre ValueError."""
+    period_week = int(raw.get("period_week") or 1)
+    if not 1 <= period_week <= 6:
+        raise ValueError(f"period_week 1–6 között legyen: {period_week}")
+    targets = get_period_targets(period_week)
+
+    age_group = raw.get("age_group") or AGE_GROUPS[0]
+    if age_group not in AGE_GROUPS:
+        raise ValueError(f"ismeretlen korosztály: {age_group}")
+
+    fo = raw.get("fo_taktikai") or targets["taktikai"]
+    req = {
+        "coach": raw.get("coach") or "",
+        "team": raw.get("team") or "",
+        "age_group": age_group,
+        "period_week": period_week,
+        "fo_taktikai": fo,
+        "taktikai": _as_list(raw.get("taktikai")) or [targets["taktikai"]],
+        "technikai": _as_list(raw.get("technikai")) or [targets["technikai"]],
+        "kondi": _as_list(raw.get("kondi")) or [targets["kondi"]],
+        "date": date.fromisoformat(raw["date"]) if raw.get("date") else date.today(),
+        "notes": raw.get("notes") or "",
+        "match_override": _as_bool(raw.get("match_override", False)),
+    }
+    return req
+
+
+############################################################
+# WORKER (processzenként egyszer tölti a DB-t)
+############################################################
+
+_DB = None
+_INDEX = None
+_ENGINE = None
+
+
+def _init_worker(json_path: str):
+    global _DB, _INDEX, _ENGINE
+    _DB = open_catalog(json_path)
+    _INDEX = DrillIndex(_DB)
+    _ENGINE = ScoringEngine(_DB)
+
+
+def _slug(text: str) -> str:
+    s = re.sub(r"[^0-9A-Za-z]+", "_", text).strip("_")
+    return s[:40] or "terv"
+
+
+def _run_one(job: Tuple[int, Dict[str, Any], str, bool, Optional[int]]) -> Dict[str, Any]:
+    n, raw, out_dir, with_pdf, seed = job
+    t0 = time.perf_counter()
+    try:
+        req = normalize_request(raw)
+        rng = random.Random(seed + n) if seed is not None else random.Random()
+
+        plan, _ = generate_plan(_DB, _INDEX, _ENGINE,
+                                req["fo_taktikai"], req["taktikai"], req["age_group"], rng,
+                                tech=req["technikai"], kondi=req["kondi"])
+        workload = compute_workload(req["period_week"], STAGES, req["technikai"], req["kondi"])
+
+        week_key = week_key_for(req["date"])
+
+        base = os.path.join(out_dir, f"{n:04d}_{_slug(req['team'])}")
+        result = {
+            "coach": req["coach"],
+            "team": req["team"],
+            "age_group": req["age_group"],
+            "date": req["date"].isoformat(),
+            "week_key": week_key,
+            "period_week": req["period_week"],
+            "fo_taktikai": req["fo_taktikai"],
+            "taktikai": req["taktikai"],
+            "technikai": req["technikai"],
+            "kondi": req["kondi"],
+            "notes": req["notes"],
+            "match_override": req["match_override"],
+            "workload": workload,
+            "plan": plan,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2, default=as_plain)
+
+        if with_pdf:
+            from tbp.pdf_export import create_pdf
+            pdf_bytes = create_pdf(plan, req["coach"], req["team"], req["age_group"],
+                                   req["date"], week_key, req["period_week"],
+                                   req["notes"], req["match_override"])
+            with open(base + ".pdf", "wb") as f:
+                f.write(pdf_bytes)
+
+        return {"n": n, "ok": True, "path": base + ".json",
+                "blocks": len(plan), "seconds": time.perf_counter() - t0}
+    except Exception as e:
+        return {"n": n, "ok": False, "error": f"{type(e).__name__}: {e}",
+                "seconds": time.perf_counter() - t0}
+
+
+############################################################
+# CLI
+############################################################
+
+def run_batch(requests: List[Dict[str, Any]],
+              out_dir: str,
+              with_pdf: bool = False,
+              workers: Optional[int] = None,
+              seed: Optional[int] = None,
+              json_path: str = JSON_PATH) -> List[Dict[str, Any]]:
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(n, raw, out_dir, with_pdf, seed) for n, raw in enumerate(requests)]
+
+    if workers == 1:
+        _init_worker(json_path)
+        return [_run_one(j) for j in jobs]
+
+    # a lefordított katalógus a szülőben frissül, a workerek csak mapelik
+    open_catalog(json_path)
+    if with_pdf:
+        from tbp.pdf_export import warm_font_cache
+        warm_font_cache()
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(json_path,)) as ex:
+        return list(ex.map(_run_one, jobs, chunksize=max(1, len(jobs) // 64)))
+
+
+def write_booklet(plan_paths: List[str], out_path: str):
+    from tbp.pdf_export import create_season_pdf
+
+    sessions = []
+    for p in plan_paths:
+        with open(p, "r", encoding="utf-8") as f:
+            d = json.load(f)
+        sessions.append({
+            "plan": d["plan"],
+            "coach_name": d["coach"],
+            "team_name": d["team"],
+            "age_group": d["age_group"],
+            "training_date": date.fromisoformat(d["date"]),
+            "week_key": d["week_key"],
+            "period_week": d["period_week"],
+            "coach_notes": d.get("notes", ""),
+            "match_override": d.get("match_override", False),
+        })
+    with open(out_path, "wb") as f:
+        f.write(create_season_pdf(sessions))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Training Blueprint – kötegelt edzésterv-generálás")
+    ap.add_argument("requests", help="CSV vagy JSONL kérésfájl")
+    ap.add_argument("-o", "--out", default="plans_out", help="kimeneti mappa")
+    ap.add_argument("--pdf", action="store_true", help="PDF is készüljön kérésenként")
+    ap.add_argument("--booklet", action="store_true", help="összes terv egy PDF füzetben")
+    ap.add_argument("-w", "--workers", type=int, default=None, help="worker processzek száma")
+    ap.add_argument("--seed", type=int, default=None, help="reprodukálható véletlen választás")
+    ap.add_argument("--db", default=JSON_PATH, help="gyakorlat-adatbázis JSON")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    results = run_batch(read_requests(args.requests), args.out,
+                        with_pdf=args.pdf, workers=args.workers,
+                        seed=args.seed, json_path=args.db)
+
+    failed = [r for r in results if not r["ok"]]
+    if args.booklet:
+        write_booklet([r["path"] for r in results if r["ok"]],
+                      os.path.join(args.out, "booklet.pdf"))
+    for r in failed:
+        print(f"#{r['n']}: HIBA – {r['error']}", file=sys.stderr)
+    print(f"{len(results) - len(failed)}/{len(results)} terv kész "
+          f"({time.perf_counter() - t0:.2f} s) → {args.out}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# tbp/catalog.py
+"""
+Gyakorlat-adatbázis betöltése és címke-normalizálása (tbp.vocab).
+
+A futó app a lefordított, mmap-elt katalógust használja (tbp.compiled_catalog);
+a load_frozen_catalog ugyanezt memóriában adja: megváltoztathatatlan, slotolt
+Drill rekordok internált címkékkel, tuple-ökben. A session-önkénti szerkesztés
+(leírás, szervezés, coaching pontok) egy DrillOverlay-be kerül, a közös rekord
+nem másolódik és nem módosul.
+"""
+
+import json
+import sys
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Any, Iterator, List, Tuple
+
+from tbp.vocab import VOCAB, normalize_tags
+
+JSON_PATH = "drill_metadata_with_u7u9.json"
+
+
+############################################################
+# CÍMKE-NORMALIZÁLÁS (ékezet- és alias-független: tbp.vocab)
+############################################################
+
+# mező -> szókincs-család
+TAG_FIELDS = {
+    "taktikai_cel_cimkek": "taktikai",
+    "technikai_cel_cimkek": "technikai",
+    "kondicionalis_cel_cimkek": "kondi",
+    "ajanlott_korosztalyok": "korosztaly",
+}
+
+
+def normalize_tactical(value) -> str:
+    return VOCAB.labels("taktikai", value)[0]
+
+
+def normalize_db(db: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Helyben normalizálja a fo_taktikai_cel mezőt és minden címkelistát (ismétlés nélkül)."""
+    for ex in db:
+        ex["fo_taktikai_cel"] = normalize_tactical(ex.get("fo_taktikai_cel", ""))
+        ex["taktikai_cel_cimkek"] = normalize_tags("taktikai", ex.get("taktikai_cel_cimkek", []))
+        for key, family in TAG_FIELDS.items():
+            if key in ex and key != "taktikai_cel_cimkek":
+                ex[key] = normalize_tags(family, ex[key])
+    return db
+
+
+def load_catalog(path: str = JSON_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        db = json.load(f)
+    return normalize_db(db)
+
+
+############################################################
+# MEGOSZTOTT, MEGVÁLTOZTATHATATLAN KATALÓGUS
+############################################################
+
+DRILL_FIELDS = (
+    "edzes_resze", "fo_taktikai_cel", "taktikai_cel_cimkek",
+    "technikai_cel_cimkek", "kondicionalis_cel_cimkek", "gyakorlat_kategoria",
+    "ajanlott_korosztalyok", "ido_perc", "megjegyzes_appon_beluli_szureshez",
+    "file_name",
+)
+
+# a tervben szerkeszthető mezők; hiányzó érték helyett "" (a korábbi setdefault)
+EDITABLE_FIELDS = ("description", "organisation", "coaching_points")
+
+_MISSING = object()
+
+
+class Drill(Mapping):
+    """
+    Egy gyakorlat, csak olvasható. Dict-szerűen olvasható (get, [], in, items),
+    így a selection / index / PDF export változatlanul használja; a listás
+    mezők tuple-ök. Az ismeretlen JSON-mezők az _extra-ba kerülnek.
+    """
+
+    __slots__ = DRILL_FIELDS + ("_extra",)
+
+    def __init__(self, values: Dict[str, Any]):
+        for key in DRILL_FIELDS:
+            object.__setattr__(self, key, values.get(key, _MISSING))
+        extra = {k: v for k, v in values.items() if k not in DRILL_FIELDS}
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("A Drill rekord nem módosítható (szerkesztés: DrillOverlay).")
+
+    __delattr__ = __setattr__
+
+    def __getitem__(self, key: str):
+        if key in DRILL_FIELDS:
+            value = getattr(self, key)
+            if value is not _MISSING:
+                return value
+        elif self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in DRILL_FIELDS:
+            if getattr(self, key) is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Drill({self.get('file_name')!r})"
+
+    def __reduce__(self):
+        return Drill, (dict(self),)
+
+
+class DrillOverlay(MutableMapping):
+    """
+    Session-önkénti nézet egy Drill fölött: az írás csak az edits dict-be
+    megy, az olvasás edits → közös rekord → "" (EDITABLE_FIELDS).
+    """
+
+    __slots__ = ("base", "edits")
+
+    def __init__(self, base: Mapping, edits: Dict[str, Any] = None):
+        self.base = base
+        self.edits = dict(edits or {})
+
+    def __getitem__(self, key: str):
+        if key in self.edits:
+            return self.edits[key]
+        if key in self.base:
+            return self.base[key]
+        if key in EDITABLE_FIELDS:
+            return ""
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        self.edits[key] = value
+
+    def __delitem__(self, key: str):
+        del self.edits[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.base
+        for key in EDITABLE_FIELDS:
+            if key not in self.base:
+                yield key
+        for key in self.edits:
+            if key not in self.base and key not in EDITABLE_FIELDS:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"DrillOverlay({self.base!r}, {self.edits!r})"
+
+
+def as_plain(obj):
+    """json.dumps default: Drill / DrillOverlay → dict, minden más → str."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+
+def freeze_catalog(db: List[Dict[str, Any]]) -> Tuple[Drill, ...]:
+    """Normalizált dict-lista → Drill tuple; stringek internálva, azonos címkelisták egy tuple-ön osztoznak."""
+    tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def freeze(value):
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            t = tuple(sys.intern(v) for v in value)
+            return tuples.setdefault(t, t)
+        return value
+
+    return tuple(Drill({k: freeze(v) for k, v in ex.items()}) for ex in db)
+
+
+def load_frozen_catalog(path: str = JSON_PATH) -> Tuple[Drill, ...]:
+    return freeze_catalog(load_catalog(path))
@@ -0,0 +1,84 @@
+# tbp/coldstart.py
+"""
+Hidegindítási költségvetés a maghoz.
+
+    python -m tbp.coldstart [--budget-ms 50] [--runs 5]
+
+Friss interpreterben importálja a mag modulokat, méri az import idejét,
+és ellenőrzi, hogy nehéz könyvtár (streamlit, matplotlib, pandas, fpdf,
+numpy) nem töltődött be. Túllépésnél / nehéz importnál 1-es kóddal lép ki.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import List, Optional
+
+CORE_MODULES = [
+    "tbp.vocab",
+    "tbp.catalog",
+    "tbp.compiled_catalog",
+    "tbp.live_catalog",
+    "tbp.search",
+    "tbp.periodization",
+    "tbp.workload",
+    "tbp.acwr",
+    "tbp.drill_index",
+    "tbp.selection",
+    "tbp.pdf_export",
+    "tbp.image_cache",
+    "tbp.acwr_chart",
+]
+
+HEAVY_MODULES = ["streamlit", "matplotlib", "pandas", "fpdf", "numpy"]
+
+DEFAULT_BUDGET_MS = 50.0
+
+_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+for m in {mods!r}:
+    __import__(m)
+dt = (time.perf_counter() - t0) * 1000
+heavy = [h for h in {heavy!r} if h in sys.modules]
+print(json.dumps({{"ms": dt, "heavy": heavy}}))
+"""
+
+
+def measure(runs: int = 5, modules: Optional[List[str]] = None) -> dict:
+    """A mag importidejének mediánja (ms) friss processzekben + a betöltött nehéz modulok."""
+    code = _PROBE.format(mods=modules or CORE_MODULES, heavy=HEAVY_MODULES)
+    times = []
+    heavy = set()
+    for _ in range(max(1, runs)):
+        out = subprocess.run([sys.executable, "-c", code],
+                             capture_output=True, text=True, check=True)
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        times.append(res["ms"])
+        heavy.update(res["heavy"])
+    times.sort()
+    return {"median_ms": times[len(times) // 2], "max_ms": times[-1], "heavy": sorted(heavy)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Training Blueprint mag – hidegindítási mérés")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    res = measure(args.runs)
+    print(f"mag import: medián {res['median_ms']:.1f} ms, max {res['max_ms']:.1f} ms "
+          f"(keret: {args.budget_ms:.0f} ms)")
+    ok = True
+    if res["heavy"]:
+        print(f"HIBA – nehéz modul importálódott: {', '.join(res['heavy'])}")
+        ok = False
+    if res["median_ms"] > args.budget_ms:
+        print("HIBA – a hidegindítási keret túllépve")
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,482 @@
+# tbp/compiled_catalog.py
+"""
+Lefordított, oszlopos bináris gyakorlat-katalógus, memory-mapelve.
+
+    python -m tbp.compiled_catalog build [--json drill_metadata_with_u7u9.json]
+    python -m tbp.compiled_catalog info
+
+A build lépés validálja a drill JSON-t, elvégzi a taktikai normalizálást
+(tbp.catalog), és minden gyakorlathoz rögzíti a kép feloldott útvonalát
+(tbp.image_store), méretét és tartalom-hash-ét. Kimenet:
+
+- drill_catalog.bin: oszlopok egymás után (8 bájtra igazítva), minden
+  szöveg egy közös string-táblában; a listás mezők CSR alakban
+  (offsets + string id-k);
+- drill_catalog.manifest.json: build id, forrás (méret, mtime, sha256 +
+  a hivatkozott képfájlok ujjlenyomata), oszlop-leírók (offset, típus,
+  darabszám), képstatisztika.
+
+A katalógus akkor is elavult, ha egy hivatkozott kép megjelent, eltűnt vagy
+változott (név + méret + mtime): a következő open_catalog újrafordít.
+
+Az app, a CLI workerek és a több szerver-replika ugyanazt a fájlt mapeli
+(mmap + memoryview, numpy nélkül), így az adat az OS page cache-ben egyszer
+van meg; processzenként csak a szókincs (címkék, edzésrészek) dekódolódik.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+import uuid
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Any, Iterable, Iterator, List, NamedTuple, Optional
+
+from tbp.catalog import DRILL_FIELDS, JSON_PATH, normalize_db
+
+CATALOG_BIN_PATH = "drill_catalog.bin"
+CATALOG_MANIFEST_PATH = "drill_catalog.manifest.json"
+
+FORMAT_VERSION = 2                  # 2: teljes címke-normalizálás (tbp.vocab)
+MAGIC = b"TBPCAT01"
+HEADER_SIZE = 32                    # MAGIC + 16 bájtos build id + 8 bájt tartalék
+NONE_ID = 0xFFFFFFFF                # hiányzó szöveg / mező
+
+STR_FIELDS = ("edzes_resze", "fo_taktikai_cel", "gyakorlat_kategoria",
+              "megjegyzes_appon_beluli_szureshez", "file_name")
+LIST_FIELDS = ("taktikai_cel_cimkek", "technikai_cel_cimkek",
+               "kondicionalis_cel_cimkek", "ajanlott_korosztalyok")
+INT_FIELDS = ("ido_perc",)
+NONE_INT = -(2 ** 31)
+
+# a szókincsbe kerülő (ismétlődő) szövegek; a többi soronként egyedi
+VOCAB_FIELDS = ("edzes_resze", "fo_taktikai_cel", "gyakorlat_kategoria") + LIST_FIELDS
+
+
+class ImageInfo(NamedTuple):
+    path: Optional[str]     # build-kori kanonikus útvonal (blob vagy eredeti); None: nincs kép
+    width: int
+    height: int
+    sha256: Optional[str]
+
+
+############################################################
+# VALIDÁLÁS
+############################################################
+
+def validate_db(db: Any) -> List[Dict[str, Any]]:
+    """A drill JSON szerkezetének ellenőrzése; hibánál ValueError (az első 10 hibával)."""
+    if not isinstance(db, list):
+        raise ValueError("A drill JSON gyökere lista legyen.")
+    errors = []
+    for pos, ex in enumerate(db):
+        if not isinstance(ex, dict):
+            errors.append(f"#{pos}: nem objektum")
+            continue
+        for key in STR_FIELDS:
+            if not isinstance(ex.get(key), str):
+                errors.append(f"#{pos}: {key} hiányzik vagy nem szöveg")
+        for key in LIST_FIELDS:
+            v = ex.get(key, [])
+            if not isinstance(v, list) or not all(isinstance(t, str) for t in v):
+                errors.append(f"#{pos}: {key} nem szöveglista")
+        for key in INT_FIELDS:
+            v = ex.get(key)
+            if v is not None and (not isinstance(v, int) or isinstance(v, bool)):
+                errors.append(f"#{pos}: {key} nem egész szám")
+    if errors:
+        more = f" (+{len(errors) - 10} további)" if len(errors) > 10 else ""
+        raise ValueError("Hibás drill JSON: " + "; ".join(errors[:10]) + more)
+    return db
+
+
+############################################################
+# BUILD
+############################################################
+
+def _source_info(path: str) -> Dict[str, Any]:
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def images_fingerprint(file_names: Iterable[Optional[str]]) -> str:
+    """A hivatkozott képfájlok (név, méret, mtime; hiányzó: None) hash-e – csak stat, olvasás nélkül."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted({n for n in file_names if n}):
+        try:
+            st = os.stat(name)
+            sig = [name, st.st_size, st.st_mtime_ns]
+        except OSError:
+            sig = [name, None, None]
+        h.update(json.dumps(sig).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _image_info(file_name: str, images) -> ImageInfo:
+    path = images.resolve(file_name)
+    if path is None:
+        return ImageInfo(None, 0, 0, None)
+    from PIL import Image
+
+    try:
+        with Image.open(path) as im:
+            width, height = im.size
+    except OSError:
+        return ImageInfo(None, 0, 0, None)
+    return ImageInfo(path, width, height, images.digest(file_name))
+
+
+class _Strings:
+    """String-tábla: előbb a szókincs, utána a soronként egyedi szövegek."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.items: List[str] = []
+
+    def add(self, s: Optional[str]) -> int:
+        if s is None:
+            return NONE_ID
+        i = self.ids.get(s)
+        if i is None:
+            i = self.ids[s] = len(self.items)
+            self.items.append(s)
+        return i
+
+
+def build_catalog(json_path: str = JSON_PATH,
+                  bin_path: str = CATALOG_BIN_PATH,
+                  manifest_path: str = CATALOG_MANIFEST_PATH,
+                  images=None) -> Dict[str, Any]:
+    """A bináris katalógus + manifest atomikus (újra)írása; visszaadja a manifestet."""
+    if images is None:
+        from tbp.image_store import ImageStore
+        images = ImageStore()
+
+    source = _source_info(json_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        db = normalize_db(validate_db(json.load(f)))
+    n = len(db)
+    # a képfeloldás előtt: ami közben változik, a következő open_catalog-nál újrafordít
+    source["images"] = images_fingerprint(ex.get("file_name") for ex in db)
+
+    strings = _Strings()
+    for key in VOCAB_FIELDS:
+        for ex in db:
+            v = ex.get(key)
+            for s in (v if isinstance(v, list) else [v]):
+                strings.add(s)
+    vocab_size = len(strings.items)
+
+    cols: Dict[str, array] = {}
+    for key in STR_FIELDS:
+        cols[key] = array("I", (strings.add(ex.get(key)) for ex in db))
+    for key in LIST_FIELDS:
+        offsets, values = array("I", [0]), array("I")
+        for ex in db:
+            values.extend(strings.add(s) for s in ex.get(key, []))
+            offsets.append(len(values))
+        cols[key + ".offsets"], cols[key + ".values"] = offsets, values
+    for key in INT_FIELDS:
+        cols[key] = array("i", (NONE_INT if ex.get(key) is None else ex[key] for ex in db))
+
+    # ismeretlen mezők (pl. diagram) JSON-szövegként
+    cols["_extra"] = array("I", (
+        strings.add(json.dumps({k: v for k, v in ex.items() if k not in DRILL_FIELDS},
+                               ensure_ascii=False, sort_keys=True))
+        if any(k not in DRILL_FIELDS for k in ex) else NONE_ID
+        for ex in db
+    ))
+
+    infos = [_image_info(ex["file_name"], images) for ex in db]
+    cols["image.path"] = array("I", (strings.add(i.path) for i in infos))
+    cols["image.width"] = array("I", (i.width for i in infos))
+    cols["image.height"] = array("I", (i.height for i in infos))
+    cols["image.sha256"] = array("B", b"".join(
+        bytes.fromhex(i.sha256) if i.sha256 else bytes(32) for i in infos))
+
+    encoded = [s.encode("utf-8") for s in strings.items]
+    str_offsets = array("I", [0])
+    for b in encoded:
+        str_offsets.append(str_offsets[-1] + len(b))
+    cols["strings.offsets"] = str_offsets
+    cols["strings.data"] = array("B", b"".join(encoded))
+
+    build_id = uuid.uuid4()
+    layout: Dict[str, List[Any]] = {}
+    chunks = [MAGIC + build_id.bytes + bytes(HEADER_SIZE - len(MAGIC) - 16)]
+    pos = HEADER_SIZE
+    for name, col in cols.items():
+        raw = col.tobytes()
+        layout[name] = [pos, col.typecode, len(col)]
+        pad = -len(raw) % 8
+        chunks.append(raw + bytes(pad))
+        pos += len(raw) + pad
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "build_id": build_id.hex,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "byteorder": sys.byteorder,
+        "count": n,
+        "vocab_size": vocab_size,
+        "string_count": len(strings.items),
+        "source": source,
+        "bin_size": pos,
+        "columns": layout,
+        "images": {
+            "found": sum(1 for i in infos if i.path),
+            "missing": sorted(ex["file_name"] for ex, i in zip(db, infos) if not i.path),
+        },
+    }
+
+    # előbb a bin, utána a manifest: az olvasó a build id-vel ellenőrzi, hogy egy pár
+    for path, data in ((bin_path, b"".join(chunks)),
+                       (manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return manifest
+
+
+############################################################
+# BETÖLTÉS (mmap)
+############################################################
+
+class CompiledDrill(Mapping):
+    """Egy sor a mapelt katalógusban; dict-szerűen olvasható, mint a tbp.catalog.Drill."""
+
+    __slots__ = ("_cat", "pos")
+
+    def __init__(self, cat: "CompiledCatalog", pos: int):
+        self._cat = cat
+        self.pos = pos
+
+    def __getitem__(self, key: str):
+        return self._cat.field(self.pos, key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key in DRILL_FIELDS:
+            if key not in INT_FIELDS or key in self:
+                yield key
+        extra = self._cat.extra(self.pos)
+        if extra:
+            yield from extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    @property
+    def image(self) -> ImageInfo:
+        return self._cat.image(self.pos)
+
+    def __repr__(self):
+        return f"CompiledDrill({self.get('file_name')!r})"
+
+    def __reduce__(self):
+        from tbp.catalog import Drill
+        return Drill, (dict(self),)
+
+
+class CompiledCatalog(Sequence):
+    """
+    A drill_catalog.bin read-only mmap-je. Sequence[CompiledDrill] (a DB
+    pozíciói azonosak a JSON sorrendjével), így a DrillIndex, a ScoringEngine
+    és a selection változatlanul használja.
+    """
+
+    def __init__(self, bin_path: str = CATALOG_BIN_PATH, manifest_path: str = CATALOG_MANIFEST_PATH):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        m = self.manifest
+        if m.get("format") != FORMAT_VERSION or m.get("byteorder") != sys.byteorder:
+            raise ValueError(f"A {bin_path} formátuma nem támogatott, újra kell fordítani.")
+
+        with open(bin_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if (len(self._mm) != m["bin_size"] or self._mm[:len(MAGIC)] != MAGIC
+                or self._mm[len(MAGIC):len(MAGIC) + 16].hex() != m["build_id"]):
+            self._mm.close()
+            raise ValueError(f"A {bin_path} és a {manifest_path} nem egy buildből származik.")
+
+        self._view = memoryview(self._mm)
+        self._cols: Dict[str, memoryview] = {}
+        for name, (offset, typecode, count) in m["columns"].items():
+            size = array(typecode).itemsize
+            self._cols[name] = self._view[offset:offset + count * size].cast(typecode)
+
+        self.size: int = m["count"]
+        self.vocab_size: int = m["vocab_size"]
+        self._vocab: Dict[int, str] = {}
+        self._str_off = self._cols["strings.offsets"]
+        self._str_data = self._cols["strings.data"]
+
+    def close(self):
+        """
+        A leképezés elengedése (pl. újrafordítás előtt: Windows-on nyitott
+        mmap mellett az os.replace nem sikerül). Utána a katalógus nem használható.
+        """
+        for col in self._cols.values():
+            col.release()
+        self._cols.clear()
+        self._view.release()
+        self._mm.close()
+
+    # ---- szövegek ----
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NONE_ID:
+            return None
+        s = self._vocab.get(i)
+        if s is not None:
+            return s
+        s = bytes(self._str_data[self._str_off[i]:self._str_off[i + 1]]).decode("utf-8")
+        if i < self.vocab_size:
+            # a szókincs (címkék, edzésrészek) processzenként egyszer, internálva
+            s = self._vocab[i] = sys.intern(s)
+        return s
+
+    # ---- mezők ----
+
+    def field(self, pos: int, key: str):
+        cols = self._cols
+        if key in STR_FIELDS:
+            return self.string(cols[key][pos])
+        if key in LIST_FIELDS:
+            off = cols[key + ".offsets"]
+            vals = cols[key + ".values"]
+            return tuple(self.string(vals[j]) for j in range(off[pos], off[pos + 1]))
+        if key in INT_FIELDS:
+            v = cols[key][pos]
+            if v == NONE_INT:
+                raise KeyError(key)
+            return v
+        extra = self.extra(pos)
+        if extra and key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def extra(self, pos: int) -> Optional[Dict[str, Any]]:
+        raw = self.string(self._cols["_extra"][pos])
+        return json.loads(raw) if raw else None
+
+    def image(self, pos: int) -> ImageInfo:
+        cols = self._cols
+        digest = bytes(cols["image.sha256"][pos * 32:(pos + 1) * 32])
+        return ImageInfo(
+            self.string(cols["image.path"][pos]),
+            cols["image.width"][pos],
+            cols["image.height"][pos],
+            digest.hex() if any(digest) else None,
+        )
+
+    # ---- Sequence ----
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, pos):
+        if isinstance(pos, slice):
+            return [CompiledDrill(self, i) for i in range(*pos.indices(self.size))]
+        if pos < 0:
+            pos += self.size
+        if not 0 <= pos < self.size:
+            raise IndexError(pos)
+        return CompiledDrill(self, pos)
+
+    def is_stale(self, json_path: Optional[str] = None) -> bool:
+        """
+        A forrás JSON (méret + mtime, eltérésnél sha256) vagy a hivatkozott
+        képfájlok (images_fingerprint) változtak-e a build óta.
+        """
+        src = self.manifest["source"]
+        try:
+            st = os.stat(json_path or src["path"])
+        except OSError:
+            return False
+        if ((st.st_size != src["size"] or st.st_mtime_ns != src["mtime_ns"])
+                and _source_info(json_path or src["path"])["sha256"] != src["sha256"]):
+            return True
+        names = (self.field(pos, "file_name") for pos in range(self.size))
+        return src.get("images") != images_fingerprint(names)
+
+
+def exercise_image(ex: Mapping, images) -> Optional[str]:
+    """
+    A gyakorlat képének kanonikus útvonala. Lefordított katalógus sorára
+    (közvetlenül vagy DrillOverlay alatt) a build-kori feloldás, ha a fájl
+    még megvan; egyébként images.resolve (tbp.image_store.ImageStore).
+    """
+    row = getattr(ex, "base", ex)
+    if isinstance(row, CompiledDrill):
+        path = row.image.path
+        if path and os.path.exists(path):
+            return path
+        # a build óta törölt / hozzáadott kép (a katalógus a következő megnyitáskor újrafordul)
+    return images.resolve(ex.get("file_name"))
+
+
+def open_catalog(json_path: str = JSON_PATH,
+                 bin_path: str = CATALOG_BIN_PATH,
+                 manifest_path: str = CATALOG_MANIFEST_PATH,
+                 build: bool = True) -> CompiledCatalog:
+    """
+    A lefordított katalógus megnyitása. build=True: ha hiányzik, sérült vagy
+    a forrás JSON azóta változott, előbb újrafordítja.
+    """
+    cat = None
+    try:
+        cat = CompiledCatalog(bin_path, manifest_path)
+        if not build or not cat.is_stale(json_path):
+            return cat
+    except (OSError, ValueError, KeyError):
+        if not build:
+            raise
+    if cat is not None:
+        cat.close()         # a build_catalog a fájlt cseréli alatta
+    build_catalog(json_path, bin_path, manifest_path)
+    return CompiledCatalog(bin_path, manifest_path)
+
+
+############################################################
+# CLI
+############################################################
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Bináris gyakorlat-katalógus")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="a katalógus (újra)fordítása")
+    b.add_argument("--json", default=JSON_PATH)
+    b.add_argument("--out", default=CATALOG_BIN_PATH)
+    b.add_argument("--manifest", default=CATALOG_MANIFEST_PATH)
+    i = sub.add_parser("info", help="a manifest összesítése")
+    i.add_argument("--manifest", default=CATALOG_MANIFEST_PATH)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build":
+        t0 = time.perf_counter()
+        try:
+            m = build_catalog(args.json, args.out, args.manifest)
+        except ValueError as e:
+            print(f"HIBA – {e}", file=sys.stderr)
+            return 1
+        print(f"{m['count']} gyakorlat, {m['string_count']} szöveg ({m['vocab_size']} szókincs), "
+              f"{m['bin_size'] / 1024:.1f} kB, {m['images']['found']} kép "
+              f"({len(m['images']['missing'])} hiányzik) – {time.perf_counter() - t0:.2f} s → {args.out}")
+        return 0
+
+    with open(args.manifest, "r", encoding="utf-8") as f:
+        m = json.load(f)
+    print(json.dumps({k: v for k, v in m.items() if k != "columns"}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
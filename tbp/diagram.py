@@ -0,0 +1,363 @@
+# tbp/diagram.py
+"""
+Gyakorlat-diagram fordítása a rajzoláshoz.
+
+A templates.TEMPLATES / JSON diagram dictből egyszeri menetben:
+  - játékos-koordináták tömbje (n × 2), csapat és felirat, csapatonkénti indexek
+  - id → index térkép
+  - passzok / futások feloldott végpontjai (k × 4: x0, y0, x1, y1)
+  - bóják, mini-kapuk, zóna, labda, feliratok
+
+A hibás hivatkozás (ismeretlen vagy duplikált játékos-id, hiányzó koordináta)
+itt, fordításkor ValueError-t ad, pontos hellyel (pl. "passes[3].to_id").
+A lefordított alak csak olvasható, így processzen belül megosztható és
+cache-elhető (compile_cached, diagram_key).
+
+Animáció (compile_animation): a diagram opcionális "keyframes" listája,
+időrendben; a kulcskockák közt a pozíciók lineárisan interpolálódnak:
+
+    "keyframes": [
+        {"t": 1.0, "players": {"R_F1": {"x": 72, "y": 55}}, "ball": {"owner_id": "R_F1"}},
+        {"t": 2.5, "ball": {"x": 80, "y": 50}},
+    ]
+
+A t=0 állapot maga a statikus diagram; a kulcskockában nem szereplő
+játékos az előző pozícióján marad (a következő említéséig lineárisan mozog).
+A labda egy játékosnál (owner_id) vagy koordinátán van; a birtoklás a
+következő labda-kulcsig érvényes, a labda addig a birtokossal mozog.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_TEAM = "home"
+
+TEAM_COLORS = {
+    "home": "#e11d48",     # piros
+    "away": "#2563eb",     # kék
+    "neutral": "#facc15",  # sárga
+    "keeper": "#22c55e",   # zöld
+}
+DEFAULT_PLAYER_COLOR = TEAM_COLORS["home"]
+MINI_GOAL_W = 4
+MINI_GOAL_H = 8
+
+# ---- pálya (közös a pitch_drawer.draw_pitch / _draw_pitch_fast és a tbp.pdf_vector számára) ----
+
+PITCH_FIGSIZE = (8, 5)                  # a pitch_drawer alapábrája (hüvelyk)
+PITCH_XLIM = (-5.0, 105.0)
+PITCH_YLIM = (0.0, 100.0)
+PITCH_GOAL_WIDTH = 14
+PITCH_GOAL_DEPTH = 3
+PITCH_STRIPES = ("#63a15f", "#5a9657")
+PITCH_LINE_COLOR = "#ffffff"
+PITCH_LINE_WIDTH = 2
+PITCH_GOAL_COLOR = "#111827"
+TIGHT_LAYOUT_PAD_PT = 1.08 * 10         # tight_layout(pad=1.08) × font.size (10 pt)
+
+
+class PitchShape(NamedTuple):
+    kind: str                           # "rect" | "circle" | "line" | "spot"
+    geom: Tuple[float, ...]             # rect: x, y, w, h; circle: cx, cy, r; line: x0, y0, x1, y1; spot: x, y, s (pt²)
+    face: Optional[str]
+    edge: Optional[str]
+    lw: float                           # pt
+    zorder: int
+
+
+def _pitch_shapes() -> Tuple[PitchShape, ...]:
+    shapes = [
+        PitchShape("rect", (0, i * (100 / 7), 100, 100 / 7), PITCH_STRIPES[i % 2], None, 0, 0)
+        for i in range(7)
+    ]
+    lines = [
+        ("rect", (0, 0, 100, 100)),                             # külső vonal
+        ("line", (50, 0, 50, 100)),                             # középvonal
+        ("circle", (50, 50, 10)),                               # középkör
+        ("rect", (0, 20, 18, 60)), ("rect", (82, 20, 18, 60)),  # 16-osok
+        ("rect", (0, 36, 6, 28)), ("rect", (94, 36, 6, 28)),    # 5-ösök
+        ("circle", (18, 50, 8)), ("circle", (82, 50, 8)),       # 16-os előtti félkörök
+    ]
+    shapes += [PitchShape(kind, geom, None, PITCH_LINE_COLOR, PITCH_LINE_WIDTH, 1) for kind, geom in lines]
+    # középpont, tizenegyes pontok
+    shapes += [PitchShape("spot", spot, PITCH_LINE_COLOR, None, 0, 2)
+               for spot in ((50, 50, 20), (12, 50, 18), (88, 50, 18))]
+    gw, gd = PITCH_GOAL_WIDTH, PITCH_GOAL_DEPTH
+    shapes += [PitchShape("rect", (gx, 50 - gw / 2, gd, gw), PITCH_GOAL_COLOR, PITCH_LINE_COLOR, PITCH_LINE_WIDTH, 2)
+               for gx in (-gd, 100)]
+    return tuple(shapes)
+
+
+# zorder szerint rendezve; a rajzolók ezt járják be
+PITCH_SHAPES = _pitch_shapes()
+
+
+def pitch_data_per_point(figsize: Tuple[float, float] = PITCH_FIGSIZE) -> float:
+    """
+    Adategység / pont a figsize méretű, tight_layout-olt pályaábrán (equal
+    aspect, tengely nélkül): a szűkebb irány határozza meg a méretarányt.
+    """
+    w_pt = figsize[0] * 72 - 2 * TIGHT_LAYOUT_PAD_PT
+    h_pt = figsize[1] * 72 - 2 * TIGHT_LAYOUT_PAD_PT
+    return max((PITCH_XLIM[1] - PITCH_XLIM[0]) / w_pt, (PITCH_YLIM[1] - PITCH_YLIM[0]) / h_pt)
+
+
+class CompiledDiagram(NamedTuple):
+    player_xy: np.ndarray               # (n, 2)
+    player_team: Tuple[str, ...]
+    player_label: Tuple[str, ...]
+    id_index: Dict[str, int]
+    teams: Dict[str, np.ndarray]        # csapat -> játékos-indexek
+    cones: np.ndarray                   # (m, 2)
+    passes: np.ndarray                  # (k, 4)
+    runs: np.ndarray                    # (r, 4)
+    mini_goals: np.ndarray              # (g, 4): x, y, w, h (középpont + méret)
+    area: Optional[Tuple[float, float, float, float]]
+    ball: Optional[Tuple[float, float]]
+    texts: Tuple[Tuple[float, float, str], ...]
+
+    def team_xy(self, team: str) -> np.ndarray:
+        """Egy csapat játékosainak koordinátái (üres csapatra 0 × 2)."""
+        idx = self.teams.get(team)
+        return self.player_xy[idx] if idx is not None else np.empty((0, 2))
+
+
+def _frozen(rows, width: int) -> np.ndarray:
+    a = np.array(rows, dtype=float).reshape(-1, width)
+    a.setflags(write=False)
+    return a
+
+
+def _frozen_index(ix: List[int]) -> np.ndarray:
+    a = np.array(ix, dtype=np.intp)
+    a.setflags(write=False)
+    return a
+
+
+def _xy(spec: Dict[str, Any], where: str) -> Tuple[float, float]:
+    missing = [k for k in ("x", "y") if k not in spec]
+    if missing:
+        raise ValueError(f"{where}: hiányzó koordináta ({', '.join(missing)})")
+    try:
+        return float(spec["x"]), float(spec["y"])
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: nem szám koordináta ({spec.get('x')!r}, {spec.get('y')!r})") from None
+
+
+def compile_diagram(diagram: Dict[str, Any]) -> CompiledDiagram:
+    players = diagram.get("players") or []
+
+    xy: List[Tuple[float, float]] = []
+    id_index: Dict[str, int] = {}
+    team_of: List[str] = []
+    labels: List[str] = []
+    for i, p in enumerate(players):
+        xy.append(_xy(p, f"players[{i}]"))
+        pid = p.get("id")
+        if pid is not None:
+            if pid in id_index:
+                raise ValueError(f"players[{i}]: duplikált játékos-id {pid!r} (első: players[{id_index[pid]}])")
+            id_index[pid] = i
+        team_of.append(p.get("team", DEFAULT_TEAM))
+        labels.append(p.get("label", ""))
+
+    def point(spec: Dict[str, Any], key: str, where: str) -> Tuple[float, float]:
+        # játékos-id az elsődleges, explicit koordináta a tartalék (mint a régi _get_point)
+        pid = spec.get(f"{key}_id")
+        if pid is not None and pid in id_index:
+            return xy[id_index[pid]]
+        pt = spec.get(key)
+        if isinstance(pt, dict) and "x" in pt and "y" in pt:
+            return _xy(pt, f"{where}.{key}")
+        if pid is not None:
+            raise ValueError(f"{where}.{key}_id: ismeretlen játékos {pid!r}")
+        raise ValueError(f"{where}: hiányzó végpont ({key}_id vagy {key}: {{x, y}})")
+
+    def arrows(kind: str) -> np.ndarray:
+        rows = []
+        for i, a in enumerate(diagram.get(kind) or []):
+            where = f"{kind}[{i}]"
+            rows.append(point(a, "from", where) + point(a, "to", where))
+        return _frozen(rows, 4)
+
+    ball = None
+    ball_spec = diagram.get("ball") or {}
+    owner = ball_spec.get("owner_id")
+    if owner:
+        if owner not in id_index:
+            raise ValueError(f"ball.owner_id: ismeretlen játékos {owner!r}")
+        ball = xy[id_index[owner]]
+    elif ball_spec.get("x") is not None and ball_spec.get("y") is not None:
+        ball = _xy(ball_spec, "ball")
+
+    area = diagram.get("area")
+    if area:
+        try:
+            area = (float(area["x"]), float(area["y"]), float(area["w"]), float(area["h"]))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"area: x, y, w, h szám kell ({area!r})") from None
+
+    goals = []
+    for i, g in enumerate(diagram.get("mini_goals") or []):
+        gx, gy = _xy(g, f"mini_goals[{i}]")
+        goals.append((gx, gy, float(g.get("w", MINI_GOAL_W)), float(g.get("h", MINI_GOAL_H))))
+
+    texts = []
+    for i, t in enumerate(diagram.get("text_labels") or []):
+        tx, ty = _xy(t, f"text_labels[{i}]")
+        texts.append((tx, ty, str(t.get("text", ""))))
+
+    teams: Dict[str, List[int]] = {}
+    for i, team in enumerate(team_of):
+        teams.setdefault(team, []).append(i)
+
+    return CompiledDiagram(
+        player_xy=_frozen(xy, 2),
+        player_team=tuple(team_of),
+        player_label=tuple(labels),
+        id_index=id_index,
+        teams={t: _frozen_index(ix) for t, ix in teams.items()},
+        cones=_frozen([_xy(c, f"cones[{i}]") for i, c in enumerate(diagram.get("cones") or [])], 2),
+        passes=arrows("passes"),
+        runs=arrows("runs"),
+        mini_goals=_frozen(goals, 4),
+        area=area,
+        ball=ball,
+        texts=tuple(texts),
+    )
+
+
+############################################################
+# CACHE
+############################################################
+
+def diagram_key(diagram: Dict[str, Any]) -> str:
+    raw = json.dumps(diagram, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+_CACHE: "OrderedDict[str, CompiledDiagram]" = OrderedDict()
+_CACHE_MAX = 512
+_CACHE_LOCK = threading.Lock()
+
+
+def compile_cached(diagram: Dict[str, Any], key: Optional[str] = None) -> CompiledDiagram:
+    """compile_diagram tartalom-hash szerinti LRU cache-sel (processzenként)."""
+    key = key or diagram_key(diagram)
+    with _CACHE_LOCK:
+        cd = _CACHE.get(key)
+        if cd is not None:
+            _CACHE.move_to_end(key)
+            return cd
+    cd = compile_diagram(diagram)
+    with _CACHE_LOCK:
+        _CACHE[key] = cd
+        while len(_CACHE) > _CACHE_MAX:
+            _CACHE.popitem(last=False)
+    return cd
+
+
+############################################################
+# ANIMÁCIÓ (KULCSKOCKÁK)
+############################################################
+
+class CompiledAnimation(NamedTuple):
+    base: CompiledDiagram               # statikus elemek + t=0 állapot
+    key_times: np.ndarray               # (K,) növekvő, key_times[0] == 0
+    player_keys: Tuple[np.ndarray, ...] # játékosonként (m_i, 3): t, x, y
+    ball_xy: np.ndarray                 # (K, 2), NaN = nincs labda
+    duration: float
+
+    def frame_times(self, fps: float) -> np.ndarray:
+        n = int(round(self.duration * fps)) + 1
+        return np.arange(n) / float(fps)
+
+    def players_at(self, times: np.ndarray) -> np.ndarray:
+        """Játékos-pozíciók (F, n, 2) a megadott időpontokban."""
+        out = np.empty((len(times), len(self.player_keys), 2))
+        for i, k in enumerate(self.player_keys):
+            out[:, i, 0] = np.interp(times, k[:, 0], k[:, 1])
+            out[:, i, 1] = np.interp(times, k[:, 0], k[:, 2])
+        return out
+
+    def ball_at(self, times: np.ndarray) -> np.ndarray:
+        """Labda-pozíciók (F, 2); NaN, ahol nincs labda."""
+        return np.stack([np.interp(times, self.key_times, self.ball_xy[:, 0]),
+                         np.interp(times, self.key_times, self.ball_xy[:, 1])], axis=1)
+
+
+def compile_animation(diagram: Dict[str, Any], duration: Optional[float] = None) -> CompiledAnimation:
+    base = compile_diagram(diagram)
+    n = len(base.player_label)
+
+    frames = diagram.get("keyframes") or []
+    times = [0.0]
+    last = 0.0
+    for i, kf in enumerate(frames):
+        try:
+            t = float(kf["t"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"keyframes[{i}].t: hiányzó vagy nem szám időpont") from None
+        if t < last or (t == last and i > 0) or t < 0:
+            raise ValueError(f"keyframes[{i}].t: az időpontoknak szigorúan növekvőnek kell lenniük ({t})")
+        last = t
+        if t > 0:
+            times.append(t)
+
+    # játékosonkénti (t, x, y) kulcsok
+    keys: List[List[Tuple[float, float, float]]] = [[(0.0, x, y)] for x, y in base.player_xy]
+    for i, kf in enumerate(frames):
+        t = float(kf["t"])
+        for pid, pos in (kf.get("players") or {}).items():
+            j = base.id_index.get(pid)
+            if j is None:
+                raise ValueError(f"keyframes[{i}].players: ismeretlen játékos {pid!r}")
+            x, y = _xy(pos, f"keyframes[{i}].players.{pid}")
+            if keys[j][-1][0] == t:
+                keys[j][-1] = (t, x, y)
+            else:
+                keys[j].append((t, x, y))
+    player_keys = tuple(_frozen(k, 3) for k in keys)
+
+    def player_pos(j: int, t: float) -> Tuple[float, float]:
+        k = player_keys[j]
+        return float(np.interp(t, k[:, 0], k[:, 1])), float(np.interp(t, k[:, 0], k[:, 2]))
+
+    # labda: a birtoklás / koordináta a következő labda-kulcsig érvényes
+    spec = diagram.get("ball") or {}
+    by_time = {0.0: spec}
+    for i, kf in enumerate(frames):
+        b = kf.get("ball")
+        if b is not None:
+            owner = b.get("owner_id")
+            if owner and owner not in base.id_index:
+                raise ValueError(f"keyframes[{i}].ball.owner_id: ismeretlen játékos {owner!r}")
+            if not owner:
+                _xy(b, f"keyframes[{i}].ball")
+            by_time[float(kf["t"])] = b
+
+    ball = []
+    for t in times:
+        spec = by_time.get(t, spec)
+        owner = spec.get("owner_id")
+        if owner and owner in base.id_index:
+            ball.append(player_pos(base.id_index[owner], t))
+        elif spec.get("x") is not None and spec.get("y") is not None:
+            ball.append(_xy(spec, "ball"))
+        else:
+            ball.append((np.nan, np.nan))
+
+    if duration is None:
+        duration = float(diagram.get("duration") or times[-1] or 1.0)
+    return CompiledAnimation(
+        base=base,
+        key_times=_frozen(times, 1).ravel(),
+        player_keys=player_keys,
+        ball_xy=_frozen(ball, 2),
+        duration=float(duration),
+    )
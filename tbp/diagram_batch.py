@@ -0,0 +1,257 @@
+# tbp/diagram_batch.py
+"""
+Gyakorlat-ábrák kötegelt renderelése lemezes cache-sel.
+
+    python -m tbp.diagram_batch abrak/ extra.jsonl -o kimenet/ --workers 8
+
+Bemenet: mappa (*.json, *.jsonl) vagy JSONL fájl; egy elem vagy maga a
+diagram (players, cones, ...), vagy {"id"/"name", "diagram": {...}} alakú,
+mint a templates.TEMPLATES bejegyzései. A TEMPLATES alapból bekerül
+(--no-templates kikapcsolja).
+
+A cache kulcsa a diagram + a renderelési beállítások (figsize, dpi, formátum)
++ a pitch_drawer.py és a tbp/diagram.py forrásának hash-e, így változatlan
+ábra nem renderelődik újra, a pályastílus, a csapatszínek vagy a fordítási
+szabályok módosítása viszont mindent érvénytelenít.
+A diagramok a szülő processzben fordulnak le (tbp.diagram: a hibás játékos-
+hivatkozás itt kiderül), a renderelés processz-poolon, a
+pitch_drawer.render_drill gyors módjával történik.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from tbp.diagram import CompiledDiagram, compile_diagram
+
+DIAGRAM_CACHE_DIR = ".diagram_cache"
+DEFAULT_FIGSIZE = (8.0, 5.0)
+DEFAULT_DPI = 150
+DEFAULT_FORMAT = "png"
+
+
+############################################################
+# BEMENET
+############################################################
+
+def _as_item(obj: Dict[str, Any], fallback_name: str) -> Tuple[str, Dict[str, Any]]:
+    name = str(obj.get("id") or obj.get("name") or fallback_name)
+    return name, obj["diagram"] if isinstance(obj.get("diagram"), dict) else obj
+
+
+def _read_jsonl(path: str) -> List[Tuple[str, Dict[str, Any]]]:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                items.append(_as_item(json.loads(line), f"{stem}_{n:04d}"))
+    return items
+
+
+def read_specs(paths: List[str], with_templates: bool = True) -> List[Tuple[str, Dict[str, Any]]]:
+    """(név, diagram) párok a megadott mappákból / fájlokból (+ TEMPLATES)."""
+    items: List[Tuple[str, Dict[str, Any]]] = []
+    if with_templates:
+        from templates import TEMPLATES
+        items.extend((key, tpl["diagram"]) for key, tpl in TEMPLATES.items())
+
+    files: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            files.extend(os.path.join(p, f) for f in sorted(os.listdir(p))
+                         if f.lower().endswith((".json", ".jsonl")))
+        else:
+            files.append(p)
+
+    for path in files:
+        if path.lower().endswith(".jsonl"):
+            items.extend(_read_jsonl(path))
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            stem = os.path.splitext(os.path.basename(path))[0]
+            if isinstance(data, list):
+                items.extend(_as_item(d, f"{stem}_{n:04d}") for n, d in enumerate(data, 1))
+            else:
+                items.append(_as_item(data, stem))
+    return items
+
+
+############################################################
+# CACHE KULCS
+############################################################
+
+STYLE_MODULES = ("pitch_drawer", "tbp.diagram")      # rajzolás + csapatszínek / fordítási szabályok
+
+
+def style_hash() -> str:
+    """A STYLE_MODULES forrásainak közös hash-e (stílus- vagy szabályváltozás → új kulcsok)."""
+    from importlib.util import find_spec
+
+    # a forrásfájlok importálás (matplotlib betöltése) nélkül
+    h = hashlib.sha256()
+    for name in STYLE_MODULES:
+        with open(find_spec(name).origin, "rb") as f:
+            h.update(name.encode("utf-8") + b"\0" + f.read())
+    return h.hexdigest()
+
+
+def render_key(diagram: Dict[str, Any], figsize, dpi: int, fmt: str, style: str) -> str:
+    payload = {
+        "diagram": diagram,
+        "figsize": [float(v) for v in figsize],
+        "dpi": int(dpi),
+        "format": fmt,
+        "style": style,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_path(root: str, key: str, fmt: str) -> str:
+    return os.path.join(root, key[:2], f"{key}.{fmt}")
+
+
+############################################################
+# WORKER
+############################################################
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def _render_one(job: Tuple[str, CompiledDiagram, str, Tuple[float, float], int, str]) -> Dict[str, Any]:
+    name, diagram, out, figsize, dpi, fmt = job
+    t0 = time.perf_counter()
+    try:
+        from pitch_drawer import render_drill
+
+        data = render_drill(diagram, figsize=figsize, dpi=dpi, fmt=fmt)
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        tmp = f"{out}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, out)
+        return {"name": name, "ok": True, "cached": False, "path": out,
+                "seconds": time.perf_counter() - t0}
+    except Exception as e:
+        return {"name": name, "ok": False, "error": f"{type(e).__name__}: {e}",
+                "seconds": time.perf_counter() - t0}
+
+
+def render_all(items: List[Tuple[str, Dict[str, Any]]],
+               cache_dir: str = DIAGRAM_CACHE_DIR,
+               figsize=DEFAULT_FIGSIZE,
+               dpi: int = DEFAULT_DPI,
+               fmt: str = DEFAULT_FORMAT,
+               workers: Optional[int] = None,
+               force: bool = False) -> List[Dict[str, Any]]:
+    """Minden elemhez egy eredmény-dict (name, ok, cached, path, seconds / error), bemeneti sorrendben."""
+    style = style_hash()
+    figsize = tuple(float(v) for v in figsize)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    jobs, job_pos = [], []
+    for i, (name, diagram) in enumerate(items):
+        try:
+            out = cache_path(cache_dir, render_key(diagram, figsize, dpi, fmt, style), fmt)
+            if not force and os.path.exists(out):
+                results[i] = {"name": name, "ok": True, "cached": True, "path": out, "seconds": 0.0}
+                continue
+            # hibás hivatkozás itt derül ki, a pool indítása előtt
+            compiled = compile_diagram(diagram)
+        except (TypeError, ValueError) as e:
+            results[i] = {"name": name, "ok": False, "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+            continue
+        jobs.append((name, compiled, out, figsize, int(dpi), fmt))
+        job_pos.append(i)
+
+    if jobs:
+        if workers == 1:
+            _init_worker()
+            done = [_render_one(j) for j in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+                done = list(ex.map(_render_one, jobs, chunksize=max(1, len(jobs) // 64)))
+        for i, r in zip(job_pos, done):
+            results[i] = r
+    return results
+
+
+def export_named(results: List[Dict[str, Any]], out_dir: str, fmt: str):
+    """A cache-fájlok <név>.<fmt> néven (hardlink, ha lehet)."""
+    os.makedirs(out_dir, exist_ok=True)
+    for r in results:
+        if not r["ok"]:
+            continue
+        dst = os.path.join(out_dir, f"{r['name']}.{fmt}")
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(r["path"], dst)
+        except OSError:
+            with open(r["path"], "rb") as src, open(dst, "wb") as f:
+                f.write(src.read())
+
+
+############################################################
+# CLI
+############################################################
+
+def _parse_figsize(text: str) -> Tuple[float, float]:
+    w, _, h = text.lower().partition("x")
+    return float(w), float(h)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Gyakorlat-ábrák kötegelt renderelése (cache-elve)")
+    ap.add_argument("inputs", nargs="*", help="mappák / JSON / JSONL fájlok")
+    ap.add_argument("-o", "--out", default=None, help="kimeneti mappa (<név>.<formátum>)")
+    ap.add_argument("--cache", default=DIAGRAM_CACHE_DIR, help="render cache mappa")
+    ap.add_argument("--figsize", type=_parse_figsize, default=DEFAULT_FIGSIZE, help="pl. 8x5 (hüvelyk)")
+    ap.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    ap.add_argument("--format", choices=["png", "jpg"], default=DEFAULT_FORMAT)
+    ap.add_argument("-w", "--workers", type=int, default=None, help="worker processzek száma")
+    ap.add_argument("--force", action="store_true", help="cache figyelmen kívül hagyása")
+    ap.add_argument("--no-templates", action="store_true", help="a TEMPLATES kihagyása")
+    ap.add_argument("--report", default=None, help="eredmények JSON-ba (időzítéssel)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="csak összesítés és hibák")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    items = read_specs(args.inputs, with_templates=not args.no_templates)
+    results = render_all(items, args.cache, args.figsize, args.dpi, args.format,
+                         workers=args.workers, force=args.force)
+    if args.out:
+        export_named(results, args.out, args.format)
+
+    failed = [r for r in results if not r["ok"]]
+    cached = sum(1 for r in results if r.get("cached"))
+    if not args.quiet:
+        for r in results:
+            if r["ok"]:
+                status = "cache" if r["cached"] else f"{r['seconds'] * 1000:7.1f} ms"
+                print(f"{r['name']:<40} {status}")
+    for r in failed:
+        print(f"{r['name']}: HIBA – {r['error']}", file=sys.stderr)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    rendered = len(results) - len(failed) - cached
+    print(f"{len(results)} ábra: {rendered} renderelve, {cached} a cache-ből, "
+          f"{len(failed)} hiba ({time.perf_counter() - t0:.2f} s) → {args.out or args.cache}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
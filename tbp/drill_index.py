@@ -0,0 +1,188 @@
+# tbp/drill_index.py
+"""
+Előre felépített invertált index a gyakorlat-adatbázishoz.
+
+A kulcs (edzésrész, korosztály-id); ezen belül posting listák a fő taktikai
+célra, a taktikai címkékre, valamint a technikai és kondicionális fókuszra,
+mind a tbp.vocab egész id-ivel. A legjobb pontszámú réteg így a posting
+listákból jön, nem kell minden hívásnál végigmenni a teljes EX_DB-n és
+rendezni a jelöltlistát.
+"""
+
+from bisect import insort
+from collections import defaultdict
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Set, Tuple
+
+from tbp.vocab import VOCAB
+
+# Ugyanazok a súlyok, mint a selection.score_exercise-ben
+MAIN_WEIGHT = 5
+TAG_WEIGHT = 2
+TECH_WEIGHT = 1
+KONDI_WEIGHT = 1
+AGE_WEIGHT = 1
+
+# posting lista -> szókincs-család
+_POSTINGS = (("by_main", "taktikai"), ("by_tag", "taktikai"),
+             ("by_tech", "technikai"), ("by_kondi", "kondi"))
+
+
+class _Bucket:
+    __slots__ = ("positions", "by_main", "by_tag", "by_tech", "by_kondi")
+
+    def __init__(self):
+        self.positions: List[int] = []                      # DB-sorrendben
+        self.by_main: Dict[int, List[int]] = defaultdict(list)
+        self.by_tag: Dict[int, List[int]] = defaultdict(list)
+        self.by_tech: Dict[int, List[int]] = defaultdict(list)
+        self.by_kondi: Dict[int, List[int]] = defaultdict(list)
+
+    def copy(self) -> "_Bucket":
+        b = _Bucket()
+        b.positions = list(self.positions)
+        for attr, _ in _POSTINGS:
+            setattr(b, attr, defaultdict(list, {k: list(v) for k, v in getattr(self, attr).items()}))
+        return b
+
+
+def _keys(ex: Mapping[str, Any]):
+    """(edzésrész, korosztály-id-k, {posting lista: id-k})."""
+    return (
+        ex.get("edzes_resze"),
+        VOCAB.many("korosztaly", ex.get("ajanlott_korosztalyok", [])),
+        {
+            "by_main": VOCAB.ids("taktikai", ex.get("fo_taktikai_cel", ""))[:1],
+            "by_tag": VOCAB.many("taktikai", ex.get("taktikai_cel_cimkek", [])),
+            "by_tech": VOCAB.many("technikai", ex.get("technikai_cel_cimkek", [])),
+            "by_kondi": VOCAB.many("kondi", ex.get("kondicionalis_cel_cimkek", [])),
+        },
+    )
+
+
+def _age_id(age_group: str) -> int:
+    ids = VOCAB.ids("korosztaly", age_group)
+    return ids[0] if ids else -1
+
+
+class DrillIndex:
+    """
+    (edzes_resze, korosztály) -> pozíciók + fő cél / címke / fókusz posting listák.
+
+    A pozíciók az indexelt lista indexei, így az index bármelyik, azonos
+    sorrendű DB-példánnyal használható. None elem: törölt pozíció (tbp.live_catalog).
+    """
+
+    def __init__(self, db: Sequence[Optional[Mapping[str, Any]]]):
+        self.size = len(db)
+        self.file_names: List[Optional[str]] = []
+        self._buckets: Dict[Tuple[str, int], _Bucket] = {}
+
+        for pos, ex in enumerate(db):
+            self.file_names.append(ex.get("file_name") if ex is not None else None)
+            if ex is None:
+                continue
+            stage, ages, postings = _keys(ex)
+
+            for age in ages:
+                b = self._buckets.get((stage, age))
+                if b is None:
+                    b = self._buckets[(stage, age)] = _Bucket()
+                b.positions.append(pos)
+                for attr, ids in postings.items():
+                    lists = getattr(b, attr)
+                    for i in ids:
+                        lists[i].append(pos)
+
+    def updated(self,
+                old_db: Sequence[Optional[Mapping[str, Any]]],
+                changes: Dict[int, Optional[Mapping[str, Any]]]) -> "DrillIndex":
+        """
+        Új index, amelyben a changes pozíciói (új pozíció: a végén; None: törlés)
+        cserélődnek. Csak az érintett vödrök másolódnak, a többin a két index
+        osztozik; a régi index változatlan marad (futó session-ök).
+        """
+        new = DrillIndex.__new__(DrillIndex)
+        new.size = max([self.size] + [pos + 1 for pos in changes])
+        new.file_names = self.file_names + [None] * (new.size - self.size)
+        new._buckets = dict(self._buckets)
+        copied: Set[Tuple[str, int]] = set()
+
+        def bucket(key) -> _Bucket:
+            if key not in copied:
+                old = new._buckets.get(key)
+                new._buckets[key] = old.copy() if old is not None else _Bucket()
+                copied.add(key)
+            return new._buckets[key]
+
+        for pos, ex in changes.items():
+            old = old_db[pos] if pos < len(old_db) else None
+            if old is not None:
+                stage, ages, postings = _keys(old)
+                for age in ages:
+                    b = bucket((stage, age))
+                    b.positions.remove(pos)
+                    for attr, ids in postings.items():
+                        lists = getattr(b, attr)
+                        for i in ids:
+                            lists[i].remove(pos)
+
+            new.file_names[pos] = ex.get("file_name") if ex is not None else None
+            if ex is None:
+                continue
+            stage, ages, postings = _keys(ex)
+            for age in ages:
+                b = bucket((stage, age))
+                insort(b.positions, pos)
+                for attr, ids in postings.items():
+                    lists = getattr(b, attr)
+                    for i in ids:
+                        insort(lists[i], pos)
+        return new
+
+    def best_candidates(self,
+                        stage: str,
+                        desired_fo: str,
+                        tact: List[str],
+                        used_ids: Set[str],
+                        age_group: str,
+                        tech: Sequence[str] = (),
+                        kondi: Sequence[str] = ()) -> List[int]:
+        """
+        A legjobb pontszámú, még nem használt gyakorlatok pozíciói DB-sorrendben
+        (ugyanaz a réteg, amit a score_exercise + teljes rendezés adna).
+        """
+        b = self._buckets.get((stage, _age_id(age_group)))
+        if b is None:
+            return []
+
+        names = self.file_names
+        scores: Dict[int, int] = defaultdict(int)
+        for m in VOCAB.ids("taktikai", desired_fo):
+            for pos in b.by_main.get(m, ()):
+                scores[pos] += MAIN_WEIGHT
+        # a kért listák ismétlődései is számítanak, mint a score_exercise-ben
+        for lists, family, weight, wanted in ((b.by_tag, "taktikai", TAG_WEIGHT, tact),
+                                              (b.by_tech, "technikai", TECH_WEIGHT, tech),
+                                              (b.by_kondi, "kondi", KONDI_WEIGHT, kondi)):
+            for t in wanted:
+                for i in VOCAB.ids(family, t):
+                    for pos in lists.get(i, ()):
+                        scores[pos] += weight
+
+        best_score = 0
+        best: List[int] = []
+        for pos, s in scores.items():
+            if names[pos] in used_ids:
+                continue
+            if s > best_score:
+                best_score = s
+                best = [pos]
+            elif s == best_score:
+                best.append(pos)
+
+        if best:
+            best.sort()
+            return best
+
+        # Nincs találat a posting listákban: mindenki csak a korosztály-pontot kapja
+        return [pos for pos in b.positions if names[pos] not in used_ids]
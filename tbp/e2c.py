@@ -0,0 +1,262 @@
+# tbp/e2c.py
+"""
+Easy2Coach Planner – gyakorlat-pontozás, a Streamlit-scripttől függetlenül.
+
+A feltöltött rekordok egyszer, feltöltéskor dolgozódnak fel (build_features):
+a kisbetűs szövegblob, a korosztály-szöveg, a képhivatkozás és a blobban
+előforduló kulcsszavak id-halmaza (int bitset). Egy KeywordSet fedi le az
+összes szótárat (taktikai, technikai, erőnléti, formátum, játékprofil és a
+pontozás rögzített szólistái), így a pontozás generáláskor csak bitművelet
+és összeadás; a blobot semmi nem építi és nem vizsgálja újra.
+
+Az illesztés a korábbi `kw in blob` szemantikája (részszöveg). Rekordonként
+egyszer fut, rövidebb kulcsszótól a hosszabb felé: ha egy kulcsszó nincs a
+blobban, az őt tartalmazó hosszabbak ("game" → "possession game") vizsgálat
+nélkül kiesnek.
+"""
+
+import random
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+############################################################
+# RÖGZÍTETT SZÓLISTÁK (a pontozásból)
+############################################################
+
+GAME_WORDS = [
+    "game", "match", "small-sided", "possession game",
+    "7vs7", "7 vs 7", "8vs8", "8 vs 8",
+    "9vs9", "9 vs 9", "10vs10", "10 vs 10",
+    "11vs11", "11 vs 11", "finishing game",
+]
+WARM_WORDS = ["warm-up", "warm up", "aufwärmen", "coordination"]
+MAIN_WORDS = ["finishing", "goal", "6vs6", "7vs7", "8vs8", "half-field", "game"]
+SMALL_FORMATS = ["1vs1", "1 vs 1", "2vs2", "2 vs 2", "3vs3", "3 vs 3", "4vs4", "4 vs 4"]
+LARGE_FORMATS = ["5vs5", "5 vs 5", "6vs6", "6 vs 6", "7vs7", "7 vs 7", "8vs8", "8 vs 8"]
+LARGE_PROFILE = ["build-up", "build up", "possession", "keeping the ball",
+                 "game systems", "team training", "organization", "organised"]
+LARGE_PENALTY = ["circuit", "course", "pure coordination"]
+MAIN_PENALTY = ["drill", "circuit", "course", "pattern only"]
+
+AGE_GAME_TOKENS = [
+    (["U7", "U8", "U9"], ["4vs4", "4 vs 4", "5vs5", "5 vs 5"]),
+    (["U10", "U11"], ["6vs6", "6 vs 6", "7vs7", "7 vs 7"]),
+    (["U12", "U13"], ["7vs7", "7 vs 7", "8vs8", "8 vs 8", "9vs9", "9 vs 9"]),
+    (["U14", "U15", "U16", "U17", "U18", "U19"], ["10vs10", "10 vs 10", "11vs11", "11 vs 11"]),
+    (["Men", "Women's", "Adult"], ["10vs10", "10 vs 10", "11vs11", "11 vs 11", "full pitch", "match"]),
+]
+
+FIXED_WORDS = (GAME_WORDS + WARM_WORDS + MAIN_WORDS + SMALL_FORMATS + LARGE_FORMATS
+               + LARGE_PROFILE + LARGE_PENALTY + MAIN_PENALTY
+               + [t for _, tokens in AGE_GAME_TOKENS for t in tokens])
+
+
+def age_based_game_tokens(age_tokens_list: List[str]) -> List[str]:
+    """Korosztály szerinti meccslétszám preferencia – fallback Cél3-hoz."""
+    for ages, tokens in AGE_GAME_TOKENS:
+        if any(a in ages for a in age_tokens_list):
+            return list(tokens)
+    return []
+
+
+############################################################
+# REKORD-SZINTŰ SEGÉDEK
+############################################################
+
+def get_image_url(ex: Dict[str, Any]):
+    if ex.get("image_url"):
+        return ex["image_url"]
+    if ex.get("image"):
+        return ex["image"]
+    if isinstance(ex.get("images"), list) and ex["images"]:
+        return ex["images"][0]
+    return None
+
+
+def exercise_text_blob(ex: Dict[str, Any]) -> str:
+    parts = [ex.get("title", "")]
+    for v in (ex.get("sections") or {}).values():
+        parts.append(v or "")
+    for v in (ex.get("meta") or {}).values():
+        parts.append(v or "")
+    return " ".join(str(p) for p in parts).lower()
+
+
+def exercise_age_text(ex: Dict[str, Any]) -> Optional[str]:
+    """A meta "age" kulcsainak szövege kisbetűvel; None, ha nincs (minden korosztálynak jó)."""
+    age_text = ""
+    for k, v in (ex.get("meta") or {}).items():
+        if "age" in k.lower():
+            age_text += " " + str(v)
+    return age_text.lower() or None
+
+
+############################################################
+# KULCSSZÓ-HALMAZ
+############################################################
+
+class KeywordSet:
+    """Kisbetűs kulcsszavak -> id; match(): egy szöveg találatai bitsetként."""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.ids: Dict[str, int] = {}
+        for kw in keywords:
+            kw = kw.lower()
+            if kw and kw not in self.ids:
+                self.ids[kw] = len(self.ids)
+        # rövidebbtől hosszabbig; minden szóhoz a benne foglalt rövidebb kulcsszavak
+        order = sorted(self.ids, key=len)
+        self._plan = [(kw, 1 << self.ids[kw], sum(1 << self.ids[p] for p in order[:i] if p in kw))
+                      for i, kw in enumerate(order)]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def match(self, text: str) -> int:
+        bits = 0
+        for kw, bit, parts in self._plan:
+            # ha egy benne foglalt rövidebb szó hiányzik, ez sem lehet a szövegben
+            if bits & parts == parts and kw in text:
+                bits |= bit
+        return bits
+
+    def mask(self, keywords: Iterable[str]) -> int:
+        """Ismert kulcsszavak bitmaszkja (ismeretlen: KeyError – a halmaz lefedi a szótárakat)."""
+        m = 0
+        for kw in keywords:
+            m |= 1 << self.ids[kw.lower()]
+        return m
+
+    def masks(self, keywords: Iterable[str]) -> List[int]:
+        """Kulcsszavanként egy maszk, ismétlésekkel (minden előfordulás külön pontot ér)."""
+        return [1 << self.ids[kw.lower()] for kw in keywords]
+
+
+class ExerciseFeatures(NamedTuple):
+    keywords: int               # a blobban előforduló kulcsszavak bitsetje
+    ages: int                   # a korosztály-szövegben előforduló korosztály-tokenek; -1: nincs korosztály-szöveg
+    url: Optional[str]
+    image: Optional[str]
+
+
+def build_features(db: Sequence[Dict[str, Any]], keywords: KeywordSet,
+                   age_tokens: KeywordSet) -> List[ExerciseFeatures]:
+    out = []
+    for ex in db:
+        age_text = exercise_age_text(ex)
+        out.append(ExerciseFeatures(
+            keywords.match(exercise_text_blob(ex)),
+            age_tokens.match(age_text) if age_text is not None else -1,
+            ex.get("url"),
+            get_image_url(ex),
+        ))
+    return out
+
+
+############################################################
+# PONTOZÁS + VÁLASZTÁS
+############################################################
+
+def _hits(bits: int, masks: List[int]) -> int:
+    return sum(1 for m in masks if bits & m)
+
+
+class StageQuery:
+    """Egy generálás kérése maszkokra fordítva (egyszer, nem rekordonként)."""
+
+    def __init__(self, keywords: KeywordSet, age_set: KeywordSet, age_tokens: List[str],
+                 tact_keywords: List[str], tech_keywords: List[str], phys_keywords: List[str],
+                 goal2_format_tokens: List[str], goal3_format_tokens: List[str],
+                 goal3_profile_keywords: List[str]):
+        self.age_mask = age_set.mask(age_tokens)
+        self.tact = keywords.masks(tact_keywords)
+        self.tech = keywords.masks(tech_keywords)
+        self.phys = keywords.masks(phys_keywords)
+        self.goal2 = keywords.masks(goal2_format_tokens)
+        self.goal3_format = keywords.masks(goal3_format_tokens)
+        self.goal3_profile = keywords.masks(goal3_profile_keywords)
+        fmt_age = age_based_game_tokens(age_tokens)
+        self.age_game = keywords.mask(fmt_age) if fmt_age else 0
+
+        self.game = keywords.mask(GAME_WORDS)
+        self.warm = keywords.mask(WARM_WORDS)
+        self.main = keywords.mask(MAIN_WORDS)
+        self.small = keywords.mask(SMALL_FORMATS)
+        self.large = keywords.mask(LARGE_FORMATS)
+        self.large_profile = keywords.mask(LARGE_PROFILE)
+        self.large_penalty = keywords.mask(LARGE_PENALTY)
+        self.main_penalty = keywords.mask(MAIN_PENALTY)
+
+    def matches_age(self, f: ExerciseFeatures) -> bool:
+        return not self.age_mask or f.ages < 0 or bool(f.ages & self.age_mask)
+
+
+def score_exercise_for_stage(f: ExerciseFeatures, stage: str, q: StageQuery,
+                             used_images: set, rng=random) -> float:
+    bits = f.keywords
+    score = 3.0 * _hits(bits, q.tact) + 2 * _hits(bits, q.tech) + 2 * _hits(bits, q.phys)
+
+    is_warm_like = bool(bits & q.warm)
+    is_main_like = bool(bits & q.main)
+
+    if stage == "warmup":
+        if is_warm_like:
+            score += 6
+        if is_main_like:
+            score -= 4
+
+    elif stage == "small":
+        if bits & q.small:
+            score += 5
+
+    elif stage == "large":
+        if bits & q.large:
+            score += 4
+        score += 4 * _hits(bits, q.goal2)
+        if bits & q.large_profile:
+            score += 4
+        if bits & q.large_penalty:
+            score -= 3
+        if is_warm_like:
+            score -= 3
+
+    elif stage == "main":
+        # Cél3 – mérkőzésjáték preferencia
+        score += 10 if bits & q.game else -8
+        score += 5 * _hits(bits, q.goal3_format)
+        score += 4 * _hits(bits, q.goal3_profile)
+        if bits & q.main_penalty:
+            score -= 4
+
+    if f.image and f.image in used_images:
+        score -= 50  # ugyanaz a kép erősen büntetve
+
+    score += rng.uniform(0, 1)
+    return score
+
+
+def pick_exercise_for_stage(db: Sequence[Dict[str, Any]],
+                            features: Sequence[ExerciseFeatures],
+                            stage: str,
+                            q: StageQuery,
+                            used_urls: Set,
+                            used_images: Set,
+                            rng=random) -> Optional[Dict[str, Any]]:
+    candidates = [i for i, f in enumerate(features) if q.matches_age(f) and f.url not in used_urls]
+    if not candidates:
+        return None
+
+    if stage == "main":
+        # először game-like szűrés; ha nincs, korosztály-alapú meccslétszám
+        game_candidates = [i for i in candidates if features[i].keywords & q.game]
+        if game_candidates:
+            candidates = game_candidates
+        elif q.age_game:
+            fmt_cands = [i for i in candidates if features[i].keywords & q.age_game]
+            if fmt_cands:
+                candidates = fmt_cands
+
+    scored = [(score_exercise_for_stage(features[i], stage, q, used_images, rng), i) for i in candidates]
+    best_score, best_i = max(scored, key=lambda x: x[0])
+    if best_score <= 0:
+        return db[candidates[0]]
+    return db[best_i]
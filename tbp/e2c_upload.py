@@ -0,0 +1,210 @@
+# tbp/e2c_upload.py
+"""
+Feltöltött Easy2Coach JSON beolvasása tartalom-hash szerint, folyamatos (streaming) parse-olással.
+
+- content_hash: a feltöltés blake2b hash-e (darabonként olvasva); ez a
+  gyorsítótár kulcsa, így ugyanaz a fájl processzenként egyszer dolgozódik fel,
+  akárhány session és rerun használja;
+- a feltöltés egyszer a .e2c_uploads/<hash>.json-be kerül, és innen
+  iter_json_array olvassa elemenként (1 MB-os darabokban, egyszerre egy
+  rekord van memóriában);
+- rekordonként csak a pontozás jellemzői (tbp.e2c.ExerciseFeatures) és a rekord
+  bájt-tartománya marad meg; a megjelenítéshez kellő mezők (cím, url, kép,
+  Organisation / Process / Tip) a kiválasztott gyakorlatnál töltődnek be a
+  fájlból. A memória így a rekordok számával nő, nem a feltöltés méretével.
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Dict, Any, BinaryIO, Iterator, List, Tuple
+
+from tbp.e2c import ExerciseFeatures, KeywordSet, build_features, get_image_url
+
+UPLOAD_DIR = ".e2c_uploads"
+MAX_SPOOLED = 4                     # ennyi feltöltés marad lemezen (a legrégebbi törlődik)
+CHUNK_SIZE = 1 << 20
+RECORD_CACHE = 64                   # betöltött megjelenítési rekordok
+
+DISPLAY_SECTIONS = ("Organisation", "Organization", "Process", "Tip")
+
+_WS = " \t\r\n"
+
+
+def content_hash(f: BinaryIO) -> str:
+    """A fájlszerű objektum teljes tartalmának hash-e; utána az elejére teker."""
+    h = hashlib.blake2b(digest_size=20)
+    f.seek(0)
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
+
+
+def iter_json_array(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, int, Any]]:
+    """
+    Egy JSON tömb elemei egyenként: (bájt-offset, bájt-hossz, érték).
+    Rossz szerkezetnél ValueError.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0                 # olvasási pozíció a buf-ban
+    offset = 0              # a buf[pos] bájt-offsetje a fájlban
+    eof = False
+
+    def fill() -> bool:
+        """Újabb darab a puffer végére (a feldolgozott eleje eldobva); False: nincs több adat."""
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        data = f.read(chunk_size)
+        eof = not data
+        buf = buf[pos:] + utf8.decode(data, final=eof)
+        pos = 0
+        return bool(data)
+
+    def advance(to: int):
+        nonlocal pos, offset
+        offset += len(buf[pos:to].encode("utf-8"))
+        pos = to
+
+    def skip_ws() -> bool:
+        """A következő nem-szóköz karakterig; False: fájlvég."""
+        while True:
+            i = pos
+            while i < len(buf) and buf[i] in _WS:
+                i += 1
+            advance(i)
+            if pos < len(buf):
+                return True
+            if not fill():
+                return False
+
+    fill()
+    if buf.startswith("\ufeff"):
+        advance(1)
+    if not skip_ws() or buf[pos] != "[":
+        raise ValueError("A feltöltött JSON gyökere lista legyen.")
+    advance(pos + 1)
+
+    first = True
+    while True:
+        if not skip_ws():
+            raise ValueError("Váratlan fájlvég a JSON tömbben.")
+        if buf[pos] == "]":
+            return
+        if not first:
+            if buf[pos] != ",":
+                raise ValueError(f"Hibás JSON a(z) {offset}. bájtnál: ',' hiányzik.")
+            advance(pos + 1)
+            if not skip_ws():
+                raise ValueError("Váratlan fájlvég a JSON tömbben.")
+        first = False
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if not fill():
+                    raise ValueError(f"Hibás JSON a(z) {offset}. bájt után: {e.msg}") from None
+                continue
+            # csonka szám / literál a puffer végén: csak lezáró karakter után biztos
+            if end >= len(buf) and fill():
+                continue
+            break
+
+        start = offset
+        advance(end)
+        yield start, offset - start, value
+
+
+def compact_record(ex: Dict[str, Any]) -> Dict[str, Any]:
+    """Csak a megjelenítéshez kellő mezők (cím, url, kép, szakaszok)."""
+    sections = ex.get("sections") or {}
+    return {
+        "title": ex.get("title", ""),
+        "url": ex.get("url"),
+        "image_url": get_image_url(ex),
+        "sections": {k: sections[k] for k in DISPLAY_SECTIONS if sections.get(k)},
+    }
+
+
+class E2CDatabase(Sequence):
+    """
+    Feldolgozott feltöltés. db[i] a megjelenítési rekord (lemezről, kis LRU-val);
+    a features a pontozás jellemzői (tbp.e2c.pick_exercise_for_stage).
+    """
+
+    def __init__(self, path: str, offsets: array, lengths: array, features: List[ExerciseFeatures]):
+        self.path = path
+        self.offsets = offsets
+        self.lengths = lengths
+        self.features = features
+        self._lock = threading.Lock()       # a példányon a session-ök osztoznak
+        self._cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        # nyitva tartva: a spool-fájl későbbi törlése (MAX_SPOOLED) nem érinti
+        self._file = open(path, "rb")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        with self._lock:
+            rec = self._cache.get(i)
+            if rec is not None:
+                self._cache.move_to_end(i)
+                return rec
+            self._file.seek(self.offsets[i])
+            raw = self._file.read(self.lengths[i])
+        rec = compact_record(json.loads(raw))
+        with self._lock:
+            self._cache[i] = rec
+            if len(self._cache) > RECORD_CACHE:
+                self._cache.popitem(last=False)
+        return rec
+
+
+def spool_upload(f: BinaryIO, digest: str, upload_dir: str = UPLOAD_DIR) -> str:
+    """A feltöltés lemezre írása (ha még nincs ott); a régiek közül MAX_SPOOLED marad."""
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, f"{digest}.json")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        f.seek(0)
+        with open(tmp, "wb") as out:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                out.write(chunk)
+        os.replace(tmp, path)
+        f.seek(0)
+    else:
+        os.utime(path)
+
+    spooled = sorted((os.path.join(upload_dir, n) for n in os.listdir(upload_dir) if n.endswith(".json")),
+                     key=os.path.getmtime)
+    for old in spooled[:-MAX_SPOOLED]:
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+def load_upload(path: str, keywords: KeywordSet, age_tokens: KeywordSet) -> E2CDatabase:
+    """Streaming parse: rekordonként a jellemzők és a bájt-tartomány; a rekord maga eldobódik."""
+    offsets, lengths = array("q"), array("q")
+    features: List[ExerciseFeatures] = []
+    with open(path, "rb") as f:
+        for off, length, ex in iter_json_array(f):
+            if not isinstance(ex, dict):
+                raise ValueError(f"A(z) {len(offsets)}. elem nem objektum.")
+            offsets.append(off)
+            lengths.append(length)
+            features.extend(build_features([ex], keywords, age_tokens))
+    return E2CDatabase(path, offsets, lengths, features)
@@ -0,0 +1,223 @@
+# tbp/image_cache.py
+"""
+Származtatott képek cache-e a gyakorlat-ábrákhoz (*_TBP.png).
+
+Minden forrásképhez, a tartalma SHA-256 hash-ével kulcsolva:
+  - web thumbnail (a UI st.image(width=300) hívásához, 2x felbontással)
+  - PDF-variáns: 150 mm szélességre, 150 DPI-re (képernyő, irodai nyomtatás)
+    méretezve, alfa nélkül, JPEG
+
+A JPEG-et az fpdf dekódolás és újratömörítés nélkül ágyazza be, a már
+feldolgozott képadatok (fpdf "info" dict) pedig dokumentumok között
+újrahasznosíthatók (lásd place_image).
+
+Kötegelt előállítás:
+    python -m tbp.image_cache [--workers 8]
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+DERIVED_DIR = ".image_cache"
+
+THUMB_WIDTH_PX = 600          # st.image(width=300) × 2 (HiDPI)
+PDF_WIDTH_MM = 150            # create_pdf: pdf.image(img, w=150)
+PDF_DPI = 150                 # nyomdai minőséghez: DerivedImageStore(pdf_dpi=300)
+JPEG_QUALITY = 85
+
+_MM_PER_INCH = 25.4
+
+
+def _hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DerivedImageStore:
+    """
+    Lemezen tárolt származtatott képek + memóriában tartott fpdf képinfók.
+    Szálbiztos; processzenként egy példány elég.
+    """
+
+    def __init__(self,
+                 root: str = DERIVED_DIR,
+                 thumb_width: int = THUMB_WIDTH_PX,
+                 pdf_dpi: int = PDF_DPI,
+                 quality: int = JPEG_QUALITY,
+                 images=None):
+        self.root = root
+        self.images = images                                  # opcionális tbp.image_store.ImageStore
+        self.thumb_width = thumb_width
+        self.pdf_dpi = pdf_dpi
+        self.quality = quality
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}   # path -> (size, mtime_ns, hash)
+        self._parsed: Dict[str, Dict[str, Any]] = {}         # derived path -> fpdf info
+        self._lock = threading.Lock()
+
+    # ---- kulcsok ----
+
+    def content_hash(self, src: str) -> Optional[str]:
+        """
+        A forrás tartalmának hash-e (méret+mtime alapján memoizálva). Ha a fájl
+        nincs meg (pl. --prune után), a képtár manifestje dönt; egyébként None.
+        """
+        try:
+            st = os.stat(src)
+        except OSError:
+            return self.images.manifest.get(src) if self.images is not None else None
+        memo = self._hashes.get(src)
+        if memo and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+            return memo[2]
+        digest = _hash_file(src)
+        self._hashes[src] = (st.st_size, st.st_mtime_ns, digest)
+        return digest
+
+    def pdf_width_px(self, width_mm: float = PDF_WIDTH_MM) -> int:
+        return int(round(width_mm / _MM_PER_INCH * self.pdf_dpi))
+
+    # ---- előállítás ----
+
+    def _derive(self, src: str, suffix: str, max_width: int) -> Optional[str]:
+        digest = self.content_hash(src)
+        if digest is None:
+            return None
+        out = os.path.join(self.root, digest[:2], f"{digest}_{suffix}.jpg")
+        if os.path.exists(out):
+            return out
+
+        from PIL import Image, UnidentifiedImageError
+
+        if self.images is not None:
+            src = self.images.resolve(src) or src
+        try:
+            with Image.open(src) as im:
+                im.load()
+                if im.mode in ("RGBA", "LA", "P"):
+                    # alfa lapítása fehér papírra (a PDF oldal is fehér)
+                    rgba = im.convert("RGBA")
+                    flat = Image.new("RGB", rgba.size, (255, 255, 255))
+                    flat.paste(rgba, mask=rgba.split()[-1])
+                    im = flat
+                elif im.mode != "RGB":
+                    im = im.convert("RGB")
+                if im.width > max_width:
+                    h = max(1, round(im.height * max_width / im.width))
+                    im = im.resize((max_width, h), Image.LANCZOS)
+
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                tmp = f"{out}.{os.getpid()}.{threading.get_ident()}.tmp"
+                im.save(tmp, "JPEG", quality=self.quality, optimize=True)
+                os.replace(tmp, out)
+        except (OSError, UnidentifiedImageError, ValueError):
+            return None
+        return out
+
+    def thumbnail(self, src: str) -> Optional[str]:
+        """A UI-hoz való kicsinyített kép útvonala (első használatkor készül)."""
+        return self._derive(src, f"thumb{self.thumb_width}", self.thumb_width)
+
+    def pdf_variant(self, src: str, width_mm: float = PDF_WIDTH_MM) -> Optional[str]:
+        """A width_mm szélességű PDF-beágyazáshoz méretezett, alfa nélküli JPEG."""
+        px = self.pdf_width_px(width_mm)
+        return self._derive(src, f"pdf{px}", px)
+
+    # ---- fpdf képinfó újrahasznosítás ----
+
+    def parsed_info(self, path: str) -> Dict[str, Any]:
+        """Az fpdf által feldolgozott képinfó (egyszer parse-olva, utána memóriából)."""
+        info = self._parsed.get(path)
+        if info is None:
+            with self._lock:
+                info = self._parsed.get(path)
+                if info is None:
+                    from tbp.pdf_export import tbpdf_class
+                    probe = tbpdf_class()()
+                    if path.lower().endswith((".jpg", ".jpeg")):
+                        info = probe._parsejpg(path)
+                    else:
+                        info = probe._parsepng(path)
+                    info.pop("i", None)
+                    self._parsed[path] = info
+        return info
+
+    # ---- kötegelt előállítás ----
+
+    def build_all(self, srcs: Iterable[str], workers: Optional[int] = None,
+                  widths_mm: Iterable[float] = (PDF_WIDTH_MM,)) -> Dict[str, int]:
+        from concurrent.futures import ThreadPoolExecutor
+
+        srcs = list(srcs)
+        widths_mm = list(widths_mm)
+
+        def one(src):
+            ok = self.thumbnail(src) is not None
+            for w in widths_mm:
+                ok = (self.pdf_variant(src, w) is not None) and ok
+            return ok
+
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(one, srcs))
+        return {"total": len(srcs), "ok": sum(results), "failed": len(srcs) - sum(results)}
+
+
+def place_image(pdf, store: Optional[DerivedImageStore], src: str,
+                x=None, y=None, w: float = 0, h: float = 0, variant: bool = True):
+    """
+    pdf.image() helyett: a PDF-variánst ágyazza be (ha variant=True), és a
+    store-ban tárolt képinfót másolja be a dokumentumba, így a kép nem
+    kerül újra feldolgozásra. Hiba esetén az eredeti fájlra esik vissza.
+    """
+    if store is None:
+        pdf.image(src, x=x, y=y, w=w, h=h)
+        return
+
+    path = src
+    if variant and w:
+        path = store.pdf_variant(src, w) or src
+    if path not in pdf.images:
+        from PIL import UnidentifiedImageError
+
+        try:
+            info = dict(store.parsed_info(path))   # _putimages dokumentumonként törli a 'data'-t
+        except (OSError, UnidentifiedImageError, ValueError):
+            pdf.image(src, x=x, y=y, w=w, h=h)
+            return
+        info["i"] = len(pdf.images) + 1
+        pdf.images[path] = info
+    pdf.image(path, x=x, y=y, w=w, h=h)
+
+
+def default_store() -> DerivedImageStore:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = DerivedImageStore()
+    return _DEFAULT
+
+_DEFAULT: Optional[DerivedImageStore] = None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import glob
+
+    ap = argparse.ArgumentParser(description="Gyakorlat-ábrák thumbnail + PDF-variánsainak előállítása")
+    ap.add_argument("paths", nargs="*", help="forrásképek (alapértelmezés: *_TBP.png)")
+    ap.add_argument("-w", "--workers", type=int, default=None)
+    ap.add_argument("--root", default=DERIVED_DIR, help="cache mappa")
+    args = ap.parse_args(argv)
+
+    srcs = args.paths or sorted(glob.glob("*_TBP.png"))
+    store = DerivedImageStore(root=args.root)
+    res = store.build_all(srcs, workers=args.workers)
+    print(f"{res['ok']}/{res['total']} kép kész → {args.root}")
+    return 0 if not res["failed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
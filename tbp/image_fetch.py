@@ -0,0 +1,253 @@
+# tbp/image_fetch.py
+"""
+Távoli gyakorlatképek (Planner: image_url / image / images[0]) helyi cache-e.
+
+    .image_fetch/ab/<sha256(url)>.img    – a letöltött kép
+    .image_fetch/ab/<sha256(url)>.json   – url, ETag, Last-Modified, letöltés ideje
+
+- egy requests.Session, a kapcsolatok hosztonként újrahasznosítva (pool);
+- prefetch(): egy terv összes képe párhuzamosan, együttesen legfeljebb
+  timeout másodpercig; ami addig nem jön meg, az eredeti URL-lel jelenik meg,
+  de a háttérben befejeződik és bekerül a cache-be; a sikertelen URL-ek
+  RETRY_AFTER_S-ig nem kérődnek újra;
+- MAX_AGE_S után feltételes újraellenőrzés (If-None-Match / If-Modified-Since);
+  304-nél csak a metaadat frissül, hálózati hibánál a régi példány marad;
+- képenként MAX_IMAGE_BYTES, összesen MAX_CACHE_BYTES; felette a legrégebben
+  használt képek törlődnek.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+FETCH_DIR = ".image_fetch"
+MAX_CACHE_BYTES = 256 << 20
+MAX_IMAGE_BYTES = 8 << 20
+MAX_AGE_S = 24 * 3600
+MAX_WORKERS = 8
+TIMEOUT_S = 8.0                 # prefetch: együttes várakozás
+REQUEST_TIMEOUT_S = 20.0        # egy kérés (kapcsolódás / olvasás)
+RETRY_AFTER_S = 300.0           # sikertelen URL ennyi ideig nem kérődik újra
+USER_AGENT = "chatbotfootball-training-planner"
+
+
+def url_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def is_remote(url: Optional[str]) -> bool:
+    return bool(url) and url.lower().startswith(("http://", "https://"))
+
+
+class ImageFetcher:
+    """
+    Processzenként egy (Planner: st.cache_resource); szálbiztos. A session
+    átadható (pl. saját adapterrel), egyébként pool-olt requests.Session készül.
+    """
+
+    def __init__(self,
+                 root: str = FETCH_DIR,
+                 max_bytes: int = MAX_CACHE_BYTES,
+                 max_image_bytes: int = MAX_IMAGE_BYTES,
+                 max_age: float = MAX_AGE_S,
+                 max_workers: int = MAX_WORKERS,
+                 timeout: float = TIMEOUT_S,
+                 request_timeout: float = REQUEST_TIMEOUT_S,
+                 session=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_image_bytes = max_image_bytes
+        self.max_age = max_age
+        self.timeout = timeout
+        self.request_timeout = request_timeout
+        self.session = session if session is not None else self._make_session(max_workers)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}                 # kulcs -> futó letöltés
+        self._failed: Dict[str, float] = {}                   # kulcs -> sikertelen próba ideje
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="image-fetch")
+        self._sizes: Dict[str, int] = {}                      # kulcs -> bájt
+        self._total = 0
+        self._scan()
+
+    @staticmethod
+    def _make_session(max_workers: int):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        s.headers["User-Agent"] = USER_AGENT
+        return s
+
+    # ---- lemez ----
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.root, key[:2], key)
+        return base + ".img", base + ".json"
+
+    def _scan(self):
+        """A már lemezen lévő képek mérete (a korlát és a kilakoltatás alapja)."""
+        if not os.path.isdir(self.root):
+            return
+        for sub in os.scandir(self.root):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith(".img"):
+                    size = e.stat().st_size
+                    self._sizes[e.name[:-4]] = size
+                    self._total += size
+
+    def _read_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        img, meta = self._paths(key)
+        if not os.path.exists(img):
+            return None
+        try:
+            with open(meta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, key: str, meta: Dict[str, Any]):
+        path = self._paths(key)[1]
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _touch(self, path: str):
+        """Használat jelölése (mtime) – a kilakoltatás a legrégebbit viszi."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _evict(self, keep: str):
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            by_age = []
+            for key in self._sizes:
+                if key == keep:
+                    continue
+                try:
+                    by_age.append((os.path.getmtime(self._paths(key)[0]), key))
+                except OSError:
+                    by_age.append((0.0, key))
+            by_age.sort()
+            for _, key in by_age:
+                if self._total <= self.max_bytes:
+                    break
+                for p in self._paths(key):
+                    try:
+                        os.remove(p)
+                    except OSError:
+                        pass
+                self._total -= self._sizes.pop(key)
+
+    # ---- letöltés ----
+
+    def _download(self, url: str, key: str, meta: Optional[Dict[str, Any]]) -> Optional[str]:
+        img = self._paths(key)[0]
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.request_timeout) as r:
+            if r.status_code == 304 and meta is not None:
+                meta["fetched"] = time.time()
+                self._write_meta(key, meta)
+                self._touch(img)
+                return img
+            r.raise_for_status()
+            ctype = r.headers.get("Content-Type", "")
+            if not ctype.startswith("image/"):
+                raise ValueError(f"Nem kép: {url} ({ctype or 'ismeretlen típus'})")
+            length = r.headers.get("Content-Length")
+            if length and length.isdigit() and int(length) > self.max_image_bytes:
+                raise ValueError(f"Túl nagy kép: {url} ({length} bájt)")
+
+            os.makedirs(os.path.dirname(img), exist_ok=True)
+            tmp = f"{img}.{os.getpid()}.{threading.get_ident()}.tmp"
+            size = 0
+            try:
+                with open(tmp, "wb") as f:
+                    for chunk in r.iter_content(64 << 10):
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise ValueError(f"Túl nagy kép: {url}")
+                        f.write(chunk)
+                os.replace(tmp, img)
+            finally:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+            self._write_meta(key, {
+                "url": url,
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+                "content_type": ctype,
+                "fetched": time.time(),
+            })
+
+        with self._lock:
+            self._total += size - self._sizes.get(key, 0)
+            self._sizes[key] = size
+        self._evict(keep=key)
+        return img
+
+    def _run(self, url: str, key: str) -> Optional[str]:
+        meta = self._read_meta(key)
+        try:
+            return self._download(url, key, meta)
+        except Exception:
+            # hálózati / HTTP / méret hiba: ha van régi példány, az marad
+            with self._lock:
+                self._failed[key] = time.time()
+            return self._paths(key)[0] if meta is not None else None
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    # ---- API ----
+
+    def prefetch(self, urls: Iterable[Optional[str]], timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        URL -> helyi fájl (None: nem sikerült / időkorlát; ilyenkor a hívó az
+        eredeti URL-t használja). Csak http(s) URL-ek; a többi kimarad.
+        """
+        out: Dict[str, Optional[str]] = {}
+        futures = {}
+        for url in dict.fromkeys(u for u in urls if is_remote(u)):
+            key = url_key(url)
+            img, meta = self._paths(key)[0], self._read_meta(key)
+            if meta is not None:
+                self._touch(img)
+                if time.time() - meta.get("fetched", 0) < self.max_age:
+                    out[url] = img
+                    continue
+            out[url] = img if meta is not None else None    # régi példány, amíg az újraellenőrzés tart
+            with self._lock:
+                if time.time() - self._failed.get(key, 0.0) < RETRY_AFTER_S:
+                    continue
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = self._pending[key] = self._pool.submit(self._run, url, key)
+            futures[fut] = url
+        if futures:
+            done, _ = wait(futures, timeout=self.timeout if timeout is None else timeout)
+            for fut in done:
+                out[futures[fut]] = fut.result()
+        return out
+
+    def get(self, url: str, timeout: Optional[float] = None) -> Optional[str]:
+        return self.prefetch([url], timeout).get(url)
@@ -0,0 +1,207 @@
+# tbp/image_store.py
+"""
+Tartalom-címzett képtár a gyakorlat-ábrákhoz.
+
+A manifest (image_manifest.json) a drill JSON file_name mezőjét a kép
+tartalmának SHA-256 hash-ére képezi le; minden egyedi tartalom egyszer
+kerül a blob tárba (.image_store/ab/<hash>.png). Az azonos bájtú,
+különböző nevű ábrák így egyetlen blobra mutatnak: a UI, a derivált
+cache és a PDF-exportáló is egyszer kezeli őket.
+
+A blob az eredeti másolata (a blob változatlan, az eredeti szerkeszthető).
+A manifest az eredeti méretét és mtime-ját is tárolja: ha az eredeti még
+megvan és azóta változott, a feloldás újra hash-el, így a szerkesztett kép
+nem a régi blobból jön.
+
+    python -m tbp.image_store build [--link] [--prune]
+
+--link: másolás helyett hardlink (helytakarékos); a blob – és vele az
+eredeti – csak olvasható lesz, az eredeti helyben szerkesztése így nem
+írhatja felül a blobot.
+--prune: a blob tárba került eredeti fájlokat törli (konténer-méret
+csökkentés); a feloldás ezután a manifesten keresztül történik.
+"""
+
+import hashlib
+import json
+import os
+import stat
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+IMAGE_MANIFEST_PATH = "image_manifest.json"
+BLOB_DIR = ".image_store"
+
+
+def hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ImageStore:
+    def __init__(self, manifest_path: str = IMAGE_MANIFEST_PATH, root: str = BLOB_DIR):
+        self.manifest_path = manifest_path
+        self.root = root
+        self.manifest: Dict[str, str] = {}                  # fájlnév -> sha256
+        self.stats: Dict[str, List[int]] = {}               # fájlnév -> [méret, mtime_ns] a hash-eléskor
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if "digests" in data:
+                self.manifest = data["digests"]
+                self.stats = data.get("stats", {})
+            else:
+                self.manifest = data                        # régi, lapos formátum: első használatkor újra hash-el
+
+    def blob_path(self, digest: str, ext: str = ".png") -> str:
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def digest(self, file_name: str) -> Optional[str]:
+        """
+        Tartalom-hash. Ha az eredeti megvan, a manifest csak akkor érvényes,
+        ha a méret és az mtime azóta nem változott (különben újra hash-el);
+        ha nincs meg (--prune), a manifest dönt.
+        """
+        d = self.manifest.get(file_name)
+        try:
+            st = os.stat(file_name)
+        except OSError:
+            return d
+        sig = [st.st_size, st.st_mtime_ns]
+        if d is not None and self.stats.get(file_name) == sig:
+            return d
+
+        new = hash_file(file_name)
+        if d is not None and new != d:
+            self._drop_linked_blob(file_name, d)
+        self.manifest[file_name] = new
+        self.stats[file_name] = sig
+        return new
+
+    def _drop_linked_blob(self, file_name: str, old_digest: str):
+        """Hardlinkelt blob az eredetivel együtt változott: már nem a hash-e tartalma, törlendő."""
+        blob = self.blob_path(old_digest, os.path.splitext(file_name)[1] or ".png")
+        try:
+            if os.path.samefile(blob, file_name):
+                os.remove(blob)
+        except OSError:
+            pass
+
+    def resolve(self, file_name: Optional[str]) -> Optional[str]:
+        """
+        Kanonikus útvonal: azonos tartalomra mindig ugyanaz (a blob),
+        ha a blob még nincs meg, az eredeti fájl; egyébként None.
+        """
+        if not file_name:
+            return None
+        d = self.digest(file_name)
+        if d is not None:
+            blob = self.blob_path(d, os.path.splitext(file_name)[1] or ".png")
+            if os.path.exists(blob):
+                return blob
+        return file_name if os.path.exists(file_name) else None
+
+    def duplicates(self) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = defaultdict(list)
+        for name, d in self.manifest.items():
+            groups[d].append(name)
+        return {d: sorted(ns) for d, ns in groups.items() if len(ns) > 1}
+
+    # ---- build ----
+
+    def build(self, file_names: Iterable[str], link: bool = False, prune: bool = False) -> Dict[str, int]:
+        """
+        A fájlok hash-elése, egyedi blobok tárolása, manifest írása.
+        link=True: hardlink, a blob (és az eredeti) csak olvasható lesz.
+        """
+        stats = {"files": 0, "unique": 0, "stored": 0, "pruned": 0, "missing": 0}
+        seen = set()
+        for name in file_names:
+            if not os.path.exists(name):
+                if name not in self.manifest:
+                    stats["missing"] += 1
+                continue
+            d = self.digest(name)
+            stats["files"] += 1
+
+            blob = self.blob_path(d, os.path.splitext(name)[1] or ".png")
+            if d not in seen:
+                seen.add(d)
+                stats["unique"] += 1
+                if not os.path.exists(blob):
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    tmp = blob + ".tmp"
+                    linked = False
+                    if link:
+                        try:
+                            os.link(name, tmp)
+                            os.chmod(tmp, stat.S_IMODE(os.stat(tmp).st_mode) & ~0o222)
+                            linked = True
+                        except OSError:
+                            pass
+                    if not linked:
+                        with open(name, "rb") as src, open(tmp, "wb") as dst:
+                            dst.write(src.read())
+                    os.replace(tmp, blob)
+                    stats["stored"] += 1
+            if prune and os.path.exists(blob):
+                os.remove(name)
+                stats["pruned"] += 1
+
+        self.save()
+        return stats
+
+    def save(self):
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"digests": dict(sorted(self.manifest.items())),
+                       "stats": dict(sorted(self.stats.items()))}, f, ensure_ascii=False, indent=0)
+        os.replace(tmp, self.manifest_path)
+
+
+_DEFAULT: Optional[ImageStore] = None
+
+def default_image_store() -> ImageStore:
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = ImageStore()
+    return _DEFAULT
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import glob
+
+    ap = argparse.ArgumentParser(description="Tartalom-címzett képtár (manifest + blobok)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="manifest + blob tár építése")
+    b.add_argument("paths", nargs="*", help="képek (alapértelmezés: a drill JSON file_name mezői + *_TBP.png)")
+    b.add_argument("--link", action="store_true", help="másolás helyett hardlink (a blob csak olvasható)")
+    b.add_argument("--prune", action="store_true", help="a tárolt eredeti fájlok törlése")
+    sub.add_parser("dups", help="azonos tartalmú fájlnevek listája")
+    args = ap.parse_args(argv)
+
+    store = ImageStore()
+    if args.cmd == "dups":
+        for d, names in store.duplicates().items():
+            print(d[:12], " ".join(names))
+        return 0
+
+    names = args.paths
+    if not names:
+        from tbp.catalog import JSON_PATH
+        with open(JSON_PATH, "r", encoding="utf-8") as f:
+            names = [ex["file_name"] for ex in json.load(f) if ex.get("file_name")]
+        names = sorted(set(names) | set(glob.glob("*_TBP.png")))
+    st = store.build(names, link=args.link, prune=args.prune)
+    print(f"{st['files']} fájl, {st['unique']} egyedi tartalom, {st['stored']} új blob, "
+          f"{st['pruned']} törölve, {st['missing']} hiányzik → {store.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# tbp/live_catalog.py
+"""
+A gyakorlat-adatbázis élő frissítése újraindítás nélkül.
+
+A LiveCatalog figyeli a drill JSON-t és a gyakorlatok képfájljait
+(méret + mtime, legfeljebb min_interval másodpercenként). Változásnál:
+
+- a JSON rekordjai file_name szerint, ujjlenyomattal hasonlítódnak össze
+  (hozzáadott / törölt / módosított); csak a változott rekordok
+  normalizálódnak és épülnek be;
+- a DrillIndex és a ScoringEngine updated() másolatot ad, amelyben csak az
+  érintett sorok / vödrök változnak (a változott pozíció helyben, az új a
+  végén, a törölt None);
+- az új CatalogVersion egyetlen referencia-cserével lép életbe. A futó
+  session-ök régi rekordjai, indexe és motorja érintetlen marad.
+
+Kép változásakor a sor élő feloldású Drill-re cserélődik (a lefordított
+katalógus build-kori képútvonala helyett), így az új kép azonnal látszik.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from tbp.catalog import JSON_PATH, Drill, freeze_catalog, normalize_db
+from tbp.compiled_catalog import open_catalog, validate_db
+from tbp.drill_index import DrillIndex
+
+MIN_INTERVAL_S = 2.0
+
+
+class CatalogVersion(NamedTuple):
+    version: int
+    db: Sequence[Optional[Drill]]     # pozíció -> rekord; None: törölt
+    index: DrillIndex
+    engine: "object"                  # tbp.scoring.ScoringEngine
+    loaded_at: float
+
+
+class CatalogDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+    images: List[str]                 # változott kép (a rekord maga nem)
+    seconds: float
+    error: Optional[str] = None
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.images or self.error)
+
+    def summary(self) -> str:
+        if self.error:
+            return f"a frissítés sikertelen: {self.error}"
+        return (f"+{len(self.added)} új, −{len(self.removed)} törölt, "
+                f"~{len(self.changed)} módosított gyakorlat, {len(self.images)} kép "
+                f"({self.seconds * 1000:.0f} ms)")
+
+
+def _fingerprint(rec: Dict[str, Any]) -> bytes:
+    raw = json.dumps(rec, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class LiveCatalog:
+    """Szálbiztos; processzenként egy példány (app: st.cache_resource)."""
+
+    def __init__(self, json_path: str = JSON_PATH, images=None,
+                 image_dir: Optional[str] = None, min_interval: float = MIN_INTERVAL_S):
+        from tbp.scoring import ScoringEngine
+
+        self.json_path = json_path
+        self.images = images                          # opcionális tbp.image_store.ImageStore
+        self.image_dir = image_dir if image_dir is not None else (os.path.dirname(json_path) or ".")
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+
+        self._json_stat = _stat(json_path)
+        with open(json_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        self._fps: Dict[str, bytes] = {rec["file_name"]: _fingerprint(rec) for rec in raw}
+
+        db = open_catalog(json_path)
+        rows: List[Optional[Drill]] = list(db)
+        self._pos: Dict[str, int] = {row["file_name"]: pos for pos, row in enumerate(rows)}
+        self._image_stats = self._scan_images()
+        self._current = CatalogVersion(0, rows, DrillIndex(rows), ScoringEngine(rows), time.time())
+
+    def current(self) -> CatalogVersion:
+        return self._current
+
+    def _scan_images(self) -> Dict[str, Tuple[int, int]]:
+        """A katalógusban hivatkozott képfájlok (méret, mtime) állapota."""
+        out: Dict[str, Tuple[int, int]] = {}
+        try:
+            with os.scandir(self.image_dir) as it:
+                for entry in it:
+                    if entry.name in self._pos:
+                        st = entry.stat()
+                        out[entry.name] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            pass
+        return out
+
+    # ---- frissítés ----
+
+    def refresh(self, force: bool = False) -> Optional[CatalogDiff]:
+        """
+        Ránéz a fájlokra (force nélkül legfeljebb min_interval-onként), és
+        változás esetén életbe lépteti az új verziót. Visszaad: CatalogDiff,
+        ha történt valami (hiba is), egyébként None. Párhuzamos hívásból
+        csak egy dolgozik, a többi azonnal visszatér.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked < self.min_interval:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked = now
+            t0 = time.perf_counter()
+            json_stat = _stat(self.json_path)
+            image_stats = self._scan_images()
+            if json_stat == self._json_stat and image_stats == self._image_stats:
+                return None
+
+            try:
+                added, removed, changed, records = self._diff_json() if json_stat != self._json_stat else ([], [], [], {})
+            except (OSError, ValueError, KeyError) as e:
+                # félig mentett / hibás JSON: a régi verzió marad; egyszer jelezzük,
+                # a következő mentés (új méret / mtime) újra próbálkozik
+                self._json_stat = json_stat
+                return CatalogDiff([], [], [], [], time.perf_counter() - t0, str(e))
+
+            touched = set(added) | set(removed) | set(changed)
+            images = sorted(
+                name for name in set(image_stats) | set(self._image_stats)
+                if image_stats.get(name) != self._image_stats.get(name) and name not in touched
+            )
+            self._apply(added, removed, changed, records, images, image_stats)
+            self._json_stat = json_stat
+            self._image_stats = self._scan_images() if added or removed else image_stats
+            return CatalogDiff(added, removed, changed, images, time.perf_counter() - t0)
+        finally:
+            self._lock.release()
+
+    def _diff_json(self):
+        with open(self.json_path, "r", encoding="utf-8") as f:
+            raw = validate_db(json.load(f))
+        fps = {rec["file_name"]: _fingerprint(rec) for rec in raw}
+        if len(fps) != len(raw):
+            raise ValueError("A file_name mezők nem egyediek.")
+
+        added = [name for name in fps if name not in self._fps]
+        removed = [name for name in self._fps if name not in fps]
+        changed = [name for name, fp in fps.items() if name in self._fps and self._fps[name] != fp]
+        wanted = set(added) | set(changed)
+        records = {rec["file_name"]: rec for rec in raw if rec["file_name"] in wanted}
+        self._fps = fps
+        return added, removed, changed, records
+
+    def _apply(self, added, removed, changed, records, images, image_stats):
+        cur = self._current
+        rows = list(cur.db)
+        changes: Dict[int, Optional[Drill]] = {}
+
+        names = added + changed
+        frozen = dict(zip(names, freeze_catalog(normalize_db([records[n] for n in names]))))
+
+        for name in removed:
+            pos = self._pos.pop(name)
+            changes[pos] = None
+        for name in changed:
+            changes[self._pos[name]] = frozen[name]
+        next_pos = len(rows)
+        for name in added:
+            self._pos[name] = next_pos
+            changes[next_pos] = frozen[name]
+            next_pos += 1
+        for name in images:
+            pos = self._pos.get(name)
+            if pos is None or pos in changes:
+                continue
+            if self.images is not None and name in image_stats and name in self._image_stats:
+                # tartalom-változás: a manifest régi blobja helyett az új fájl
+                self.images.manifest.pop(name, None)
+            # élő feloldású rekord (a build-kori képútvonal elavult)
+            changes[pos] = Drill(dict(rows[pos]))
+
+        old_db = cur.db
+        for pos, row in changes.items():
+            if pos < len(rows):
+                rows[pos] = row
+            else:
+                rows.append(row)
+
+        self._current = CatalogVersion(
+            cur.version + 1, rows,
+            cur.index.updated(old_db, changes),
+            cur.engine.updated(changes),
+            time.time(),
+        )
@@ -0,0 +1,118 @@
+# tbp/pdf_cache.py
+"""
+Tartalom-címzett PDF cache.
+
+A kulcs a PDF összes bemenetének (terv, edző/csapat/dátum, periodizációs hét,
+megjegyzés, mérkőzésjáték kapcsoló, a beágyazott képek tartalom-hash-e és a
+LiveCatalog verziója) SHA-256 hash-e, így az azonos tartalmú újragenerálás a
+cache-ből jön, a futás közben cserélt kép viszont új PDF-et ad. Méret- és
+darabszám-korlátos, LRU kilakoltatással; szálbiztos, így Streamlit session-ök
+között megosztható.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, Any, List, Optional
+
+from tbp.catalog import as_plain
+
+
+def pdf_cache_key(plan: List[Dict[str, Any]],
+                  coach_name: str,
+                  team_name: str,
+                  age_group: str,
+                  training_date: date,
+                  week_key: str,
+                  period_week: int,
+                  coach_notes: str = "",
+                  match_override: bool = False,
+                  image_store=None,
+                  images=None,
+                  catalog_version: Optional[int] = None) -> str:
+    """
+    image_store: tbp.image_cache.DerivedImageStore (content_hash), images:
+    tbp.image_store.ImageStore (a blokkok képének feloldása, mint a create_pdf-ben).
+    """
+    from tbp.image_cache import default_store
+    from tbp.image_store import default_image_store
+    from tbp.pdf_export import block_image
+
+    image_store = image_store or default_store()
+    images = images or default_image_store()
+    image_digests = []
+    for block in plan:
+        if "stage" not in block or "exercise" not in block:
+            continue
+        img = block_image(block, images, match_override)
+        image_digests.append(image_store.content_hash(img) if img else None)
+
+    payload = {
+        "plan": plan,
+        "coach": coach_name,
+        "team": team_name,
+        "age_group": age_group,
+        "date": training_date.isoformat(),
+        "week_key": week_key,
+        "period_week": int(period_week),
+        "notes": coach_notes or "",
+        "match_override": bool(match_override),
+        "images": image_digests,
+        "catalog_version": catalog_version,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=as_plain)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    def __init__(self, max_entries: int = 64, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._data
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            pdf = self._data.get(key)
+            if pdf is not None:
+                self._data.move_to_end(key)
+            return pdf
+
+    def put(self, key: str, pdf: bytes):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            if len(pdf) > self.max_bytes:
+                return
+            self._data[key] = pdf
+            self._bytes += len(pdf)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, ev = self._data.popitem(last=False)
+                self._bytes -= len(ev)
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        pdf = self.get(key)
+        if pdf is not None:
+            self.hits += 1
+            return pdf
+        self.misses += 1
+        pdf = build()
+        self.put(key, pdf)
+        return pdf
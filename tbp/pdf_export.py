@@ -0,0 +1,263 @@
+# tbp/pdf_export.py
+"""
+PDF EXPORT (periodizációs táblával) – Streamlit nélkül hívható.
+
+Az fpdf csak az első PDF készítésekor töltődik be.
+"""
+
+import os
+from datetime import date
+from typing import Dict, Any, List, Optional
+
+from tbp.compiled_catalog import exercise_image
+from tbp.image_cache import DerivedImageStore, default_store, place_image
+from tbp.image_store import ImageStore, default_image_store
+from tbp.periodization import get_period_row, get_period_table_rows
+from tbp.selection import stage_label
+
+LOGO_PATH = "TBP_pdfsafe.png"
+MATCH_IMAGE = "match_game.png"
+BACKGROUND = "pitch_background.png"
+
+DEJAVU_REG = "DejaVuSans.ttf"
+DEJAVU_BOLD = "DejaVuSans-Bold.ttf"
+
+
+def pdf_safe(text):
+    if not text:
+        return ""
+    return str(text).replace("…", "...").replace("’", "'")
+
+
+_TBPDF = None
+
+def tbpdf_class():
+    """A háttérképes/logós FPDF alosztály (első híváskor importálja az fpdf-et)."""
+    global _TBPDF
+    if _TBPDF is None:
+        from fpdf import FPDF
+
+        class TBPDF(FPDF):
+            image_store: Optional[DerivedImageStore] = None
+
+            def header(self):
+                try:
+                    place_image(self, self.image_store, BACKGROUND, x=0, y=0, w=210, h=297)
+                except:
+                    pass
+                try:
+                    place_image(self, self.image_store, LOGO_PATH, x=165, y=10, w=30)
+                except:
+                    pass
+                self.set_y(25)
+
+        _TBPDF = TBPDF
+    return _TBPDF
+
+def pdf_add_period_table(pdf, base_font: str, period_week: int):
+    """PDF-be: 1 soros (aktuális hét) + opcionálisan 6 soros mini-tábla."""
+    rows = get_period_table_rows()
+
+    pdf.set_font(base_font, "B", 12)
+    pdf.cell(0, 8, pdf_safe("Periodizáció (aktuális hét):"), ln=1)
+
+    # 1 soros tábla (aktuális hét)
+    row = get_period_row(period_week)
+    pdf.set_font(base_font, "", 11)
+    pdf.multi_cell(0, 6, pdf_safe(
+        f"Hét {row['Hét']} | "
+        f"Taktika: {row['Taktikai cél']} | "
+        f"Technika: {row['Technikai cél']} | "
+        f"Kondi: {row['Kondicionális cél']} | "
+        f"Szorzo: {row['Intenzitás szorzó']}"
+    ))
+
+    pdf.ln(2)
+    pdf.set_font(base_font, "B", 12)
+    pdf.cell(0, 8, pdf_safe("Teljes 6 hetes ciklus:"), ln=1)
+
+    # Egyszerű táblázat (6 sor)
+    col_widths = [12, 55, 45, 45, 25]  # Hét, takt, tech, kondi, szorzo
+    headers = ["Hét", "Taktikai", "Technikai", "Kondi", "Szorzó"]
+
+    pdf.set_font(base_font, "B", 10)
+    for w, h in zip(col_widths, headers):
+        pdf.cell(w, 7, pdf_safe(h), border=1)
+    pdf.ln()
+
+    pdf.set_font(base_font, "", 10)
+    for r in rows:
+        pdf.cell(col_widths[0], 7, pdf_safe(str(r["Hét"])), border=1)
+        pdf.cell(col_widths[1], 7, pdf_safe(str(r["Taktikai cél"])), border=1)
+        pdf.cell(col_widths[2], 7, pdf_safe(str(r["Technikai cél"])), border=1)
+        pdf.cell(col_widths[3], 7, pdf_safe(str(r["Kondicionális cél"])), border=1)
+        pdf.cell(col_widths[4], 7, pdf_safe(str(r["Intenzitás szorzó"])), border=1)
+        pdf.ln()
+
+    pdf.ln(2)
+
+def _new_document(image_store: Optional[DerivedImageStore]):
+    pdf = tbpdf_class()()
+    pdf.image_store = image_store or default_store()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    base = "Arial"
+    try:
+        pdf.add_font("DejaVu", "", DEJAVU_REG, uni=True)
+        pdf.add_font("DejaVu", "B", DEJAVU_BOLD, uni=True)
+        base = "DejaVu"
+    except:
+        pass
+    return pdf, base
+
+def _output(pdf) -> bytes:
+    raw = pdf.output(dest="S")
+    return raw if isinstance(raw, bytes) else raw.encode("latin-1", "ignore")
+
+def warm_font_cache():
+    """
+    Az fpdf 1.7 a TTF mellé írja a font-cache-t (DejaVuSans*.pkl – add_font,
+    *.cw127.pkl – output). Párhuzamos processzek előtt egyszer kell lefuttatni,
+    különben egymás félig írt pickle-jét olvassák (EOFError).
+    """
+    pdf, base = _new_document(None)
+    pdf.add_page()
+    for style in ("", "B"):
+        pdf.set_font(base, style, 10)
+        pdf.cell(0, 5, "Edzésterv – gyakorlatok")     # 127 feletti kód kell a cw127 cache-hez
+    _output(pdf)
+
+def block_image(block: Dict[str, Any], images: ImageStore,
+                match_override: bool = False, vector_diagrams: bool = True) -> Optional[str]:
+    """
+    A blokk PDF-be kerülő képe (None: nincs kép, vagy vektoros ábra rajzolódik).
+    Azonos tartalom -> azonos útvonal, így a kép dokumentumonként egyszer ágyazódik be.
+    """
+    if block["stage"] == "cel3" and match_override:
+        return images.resolve(MATCH_IMAGE)
+    ex = block["exercise"]
+    if vector_diagrams and ex.get("diagram"):
+        return None
+    return exercise_image(ex, images)
+
+def pdf_add_session(pdf,
+                    base: str,
+                    plan: List[Dict[str, Any]],
+                    coach_name: str,
+                    team_name: str,
+                    age_group: str,
+                    training_date: date,
+                    week_key: str,
+                    period_week: int,
+                    coach_notes: str = "",
+                    match_override: bool = False,
+                    images: Optional[ImageStore] = None,
+                    vector_diagrams: bool = True):
+    """
+    Egy edzés címlapja + gyakorlatlapjai a megnyitott dokumentumba.
+    vector_diagrams: a "diagram" mezővel (pitch_drawer séma) rendelkező
+    gyakorlat ábrája vektorosan, közvetlenül az oldalra rajzolódik
+    (tbp.pdf_vector); egyébként a gyakorlat képe kerül be.
+    """
+    images = images or default_image_store()
+
+    # Címlap
+    pdf.add_page()
+    pdf.set_font(base, "B", 16)
+    pdf.cell(0, 10, pdf_safe("Training Blueprint – Edzésterv"), ln=1)
+
+    pdf.set_font(base, "", 12)
+    pdf.multi_cell(0, 6, pdf_safe(f"Edző: {coach_name}"))
+    pdf.multi_cell(0, 6, pdf_safe(f"Csapat: {team_name}"))
+    pdf.multi_cell(0, 6, pdf_safe(f"Korosztály: {age_group}"))
+    pdf.multi_cell(0, 6, pdf_safe(f"Edzés dátuma: {training_date.isoformat()}"))
+    pdf.multi_cell(0, 6, pdf_safe(f"Naptári hét (ACWR): {week_key}"))
+    pdf.multi_cell(0, 6, pdf_safe(f"Periodizációs hét: {period_week}"))
+
+    pdf.ln(2)
+    pdf_add_period_table(pdf, base, period_week)
+
+    pdf.set_font(base, "B", 12)
+    pdf.cell(0, 8, pdf_safe("Edzői megjegyzés:"), ln=1)
+    pdf.set_font(base, "", 12)
+    pdf.multi_cell(0, 6, pdf_safe(coach_notes))
+
+    # Gyakorlatok
+    for block in plan:
+        if "stage" not in block or "exercise" not in block:
+            continue
+
+        pdf.add_page()
+        stage = block["stage"]
+        ex = block["exercise"]
+
+        pdf.set_font(base, "B", 14)
+        pdf.cell(0, 10, pdf_safe(stage_label(stage)), ln=1)
+        pdf.ln(3)
+
+        diagram = ex.get("diagram") if vector_diagrams and not (stage == "cel3" and match_override) else None
+        img = block_image(block, images, match_override, vector_diagrams)
+        if diagram:
+            try:
+                from tbp.diagram import CompiledDiagram, compile_cached
+                from tbp.pdf_vector import draw_diagram
+                cd = diagram if isinstance(diagram, CompiledDiagram) else compile_cached(diagram)
+                draw_diagram(pdf, cd, w=150, font=base)
+            except ValueError:
+                pdf.multi_cell(0, 6, pdf_safe("Ábra nem rajzolható."))
+        elif img:
+            try:
+                place_image(pdf, pdf.image_store, img, w=150)
+            except:
+                pdf.multi_cell(0, 6, pdf_safe("Kép nem tölthető be."))
+
+        pdf.ln(5)
+
+        pdf.set_font(base, "B", 12)
+        pdf.cell(0, 6, pdf_safe("Leírás:"), ln=1)
+        pdf.set_font(base, "", 12)
+        pdf.multi_cell(0, 6, pdf_safe(ex.get("description", "")))
+        pdf.ln(2)
+
+        pdf.set_font(base, "B", 12)
+        pdf.cell(0, 6, pdf_safe("Szervezés:"), ln=1)
+        pdf.set_font(base, "", 12)
+        pdf.multi_cell(0, 6, pdf_safe(ex.get("organisation", "")))
+        pdf.ln(2)
+
+        pdf.set_font(base, "B", 12)
+        pdf.cell(0, 6, pdf_safe("Coaching pontok:"), ln=1)
+        pdf.set_font(base, "", 12)
+        pdf.multi_cell(0, 6, pdf_safe(ex.get("coaching_points", "")))
+
+def create_pdf(plan: List[Dict[str, Any]],
+               coach_name: str,
+               team_name: str,
+               age_group: str,
+               training_date: date,
+               week_key: str,
+               period_week: int,
+               coach_notes: str = "",
+               match_override: bool = False,
+               image_store: Optional[DerivedImageStore] = None,
+               images: Optional[ImageStore] = None,
+               vector_diagrams: bool = True) -> bytes:
+    pdf, base = _new_document(image_store)
+    pdf_add_session(pdf, base, plan, coach_name, team_name, age_group,
+                    training_date, week_key, period_week,
+                    coach_notes, match_override, images, vector_diagrams)
+    return _output(pdf)
+
+def create_season_pdf(sessions: List[Dict[str, Any]],
+                      image_store: Optional[DerivedImageStore] = None,
+                      images: Optional[ImageStore] = None,
+                      vector_diagrams: bool = True) -> bytes:
+    """
+    Több edzés egy füzetben (pl. szezon). A sessions elemei a create_pdf
+    kulcsszavas argumentumai (plan, coach_name, ..., match_override).
+    Az ismétlődő gyakorlatok képe csak egyszer kerül a dokumentumba.
+    """
+    pdf, base = _new_document(image_store)
+    for sess in sessions:
+        pdf_add_session(pdf, base, images=images, vector_diagrams=vector_diagrams, **sess)
+    return _output(pdf)
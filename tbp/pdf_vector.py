@@ -0,0 +1,222 @@
+# tbp/pdf_vector.py
+"""
+Gyakorlat-diagram rajzolása közvetlenül a PDF oldalra, vektorosan.
+
+Az fpdf 1.7 nem tud SVG-t vagy PDF-et beágyazni, ezért a lefordított
+diagram (tbp.diagram.CompiledDiagram) elemei PDF rajzoló-operátorokként
+kerülnek az oldal tartalmába: téglalapok, vonalak, Bézier-körök, nyilak,
+szöveg. Nincs raszterizálás, nincs ideiglenes fájl; az ábra pár kB,
+bármekkora nagyításnál éles, és ugyanúgy néz ki, mint a pitch_drawer képe
+(ugyanazok a színek, zorder-sorrend és arányos vonalvastagságok).
+"""
+
+import math
+from typing import Optional, Tuple
+
+from tbp.diagram import (PITCH_SHAPES, PITCH_XLIM, PITCH_YLIM, TEAM_COLORS, DEFAULT_PLAYER_COLOR,
+                         CompiledDiagram, PitchShape, pitch_data_per_point)
+
+# a pitch_drawer alapábráján (PITCH_FIGSIZE) 1 pont ennyi adategység:
+# a vonalvastagságok, nyílhegyek és betűméretek ezzel arányosan skálázódnak
+REF_DATA_PER_PT = pitch_data_per_point()
+
+X_MIN, X_MAX = PITCH_XLIM
+Y_MIN, Y_MAX = PITCH_YLIM
+BEZIER_K = 0.5522847498
+
+
+def _rgb(hex_color: str) -> Tuple[int, int, int]:
+    h = hex_color.lstrip("#")
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+
+
+class _Page:
+    """Adatkoordináta → PDF pont átszámítás + nyers operátorok."""
+
+    def __init__(self, pdf, x: float, y: float, w: float):
+        self.pdf = pdf
+        self.k = pdf.k                          # pont / mm
+        self.page_h = pdf.h                     # mm
+        self.x, self.y = x, y
+        self.s = w / (X_MAX - X_MIN)            # mm / adategység
+        self.h = (Y_MAX - Y_MIN) * self.s
+
+    def pt(self, dx: float, dy: float) -> Tuple[float, float]:
+        mm_x = self.x + (dx - X_MIN) * self.s
+        mm_y = self.y + (Y_MAX - dy) * self.s
+        return mm_x * self.k, (self.page_h - mm_y) * self.k
+
+    def lw(self, points: float) -> float:
+        """matplotlib vonalvastagság (pt) → PDF pont ezen a méretarányon."""
+        return points * REF_DATA_PER_PT * self.s * self.k
+
+    def out(self, s: str):
+        self.pdf._out(s)
+
+    def fill(self, color: Optional[str]):
+        if color:
+            r, g, b = _rgb(color)
+            self.out(f"{r / 255:.3f} {g / 255:.3f} {b / 255:.3f} rg")
+
+    def stroke(self, color: Optional[str], width_pt: float = 1.0, dash: Optional[Tuple[float, float]] = None):
+        if color:
+            r, g, b = _rgb(color)
+            self.out(f"{r / 255:.3f} {g / 255:.3f} {b / 255:.3f} RG")
+        self.out(f"{self.lw(width_pt):.3f} w")
+        if dash:
+            self.out(f"[{self.lw(dash[0]):.2f} {self.lw(dash[1]):.2f}] 0 d")
+        else:
+            self.out("[] 0 d")
+
+    @staticmethod
+    def _op(face: Optional[str], edge: Optional[str]) -> str:
+        return "B" if face and edge else ("f" if face else "S")
+
+    def rect(self, dx, dy, w, h, face=None, edge=None, lw=1.0, dash=None):
+        self.fill(face)
+        if edge:
+            self.stroke(edge, lw, dash)
+        x0, y0 = self.pt(dx, dy)
+        self.out(f"{x0:.2f} {y0:.2f} {w * self.s * self.k:.2f} {h * self.s * self.k:.2f} re {self._op(face, edge)}")
+
+    def circle(self, cx, cy, r, face=None, edge=None, lw=1.0):
+        self.fill(face)
+        if edge:
+            self.stroke(edge, lw)
+        x, y = self.pt(cx, cy)
+        rr = r * self.s * self.k
+        c = rr * BEZIER_K
+        self.out(
+            f"{x + rr:.2f} {y:.2f} m "
+            f"{x + rr:.2f} {y + c:.2f} {x + c:.2f} {y + rr:.2f} {x:.2f} {y + rr:.2f} c "
+            f"{x - c:.2f} {y + rr:.2f} {x - rr:.2f} {y + c:.2f} {x - rr:.2f} {y:.2f} c "
+            f"{x - rr:.2f} {y - c:.2f} {x - c:.2f} {y - rr:.2f} {x:.2f} {y - rr:.2f} c "
+            f"{x + c:.2f} {y - rr:.2f} {x + rr:.2f} {y - c:.2f} {x + rr:.2f} {y:.2f} c "
+            f"h {self._op(face, edge)}"
+        )
+
+    def polyline(self, points, color, lw=1.0, dash=None):
+        self.stroke(color, lw, dash)
+        coords = [self.pt(px, py) for px, py in points]
+        ops = [f"{coords[0][0]:.2f} {coords[0][1]:.2f} m"]
+        ops += [f"{x:.2f} {y:.2f} l" for x, y in coords[1:]]
+        self.out(" ".join(ops) + " S")
+
+    def arrow(self, x0, y0, x1, y1, lw=2.0, dash=None):
+        """FancyArrowPatch(arrowstyle="->", mutation_scale=10, shrinkA=B=2) megfelelője."""
+        dx, dy = x1 - x0, y1 - y0
+        length = math.hypot(dx, dy)
+        if length == 0:
+            return
+        ux, uy = dx / length, dy / length
+        shrink = 2.0 * REF_DATA_PER_PT
+        if length > 2 * shrink:
+            x0, y0 = x0 + ux * shrink, y0 + uy * shrink
+            x1, y1 = x1 - ux * shrink, y1 - uy * shrink
+        head_len, head_w = 4.0 * REF_DATA_PER_PT, 2.0 * REF_DATA_PER_PT
+        self.polyline([(x0, y0), (x1, y1)], "#ffffff", lw, dash)
+        bx, by = x1 - ux * head_len, y1 - uy * head_len
+        self.polyline([(bx - uy * head_w, by + ux * head_w), (x1, y1),
+                       (bx + uy * head_w, by - ux * head_w)], "#ffffff", lw)
+
+    def shape(self, sh: PitchShape):
+        """tbp.diagram.PITCH_SHAPES elem (pontok: scatter s pt² → átmérő √s pt)."""
+        if sh.kind == "line":
+            x0, y0, x1, y1 = sh.geom
+            self.polyline([(x0, y0), (x1, y1)], sh.edge, sh.lw)
+        elif sh.kind == "spot":
+            cx, cy, size = sh.geom
+            self.circle(cx, cy, math.sqrt(size) / 2 * REF_DATA_PER_PT, face=sh.face)
+        elif sh.kind == "circle":
+            self.circle(*sh.geom, face=sh.face, edge=sh.edge, lw=sh.lw)
+        else:
+            self.rect(*sh.geom, face=sh.face, edge=sh.edge, lw=sh.lw)
+
+    def text(self, dx, dy, txt, size_pt, color, align="left"):
+        pdf = self.pdf
+        size = size_pt * REF_DATA_PER_PT * self.s * self.k
+        pdf.set_font_size(size)
+        r, g, b = _rgb(color)
+        pdf.set_text_color(r, g, b)
+        mm_x = self.x + (dx - X_MIN) * self.s
+        mm_y = self.y + (Y_MAX - dy) * self.s + size / self.k * 0.35   # függőleges közép
+        if align == "center":
+            mm_x -= pdf.get_string_width(txt) / 2
+        pdf.text(mm_x, mm_y, txt)
+
+
+def draw_diagram(pdf, cd: CompiledDiagram, w: float = 150,
+                 x: Optional[float] = None, y: Optional[float] = None,
+                 font: Optional[str] = None) -> float:
+    """
+    A diagram kirajzolása a (x, y) bal felső sarokba (mm; alapértelmezés az
+    aktuális pozíció), w mm szélességben. A kurzort az ábra alá viszi;
+    visszaadja az ábra magasságát (mm). A feliratok fontja font (normál),
+    ennek hiányában a hívó aktuális fontja; utána a font visszaáll.
+    """
+    x = pdf.l_margin if x is None else x
+    y = pdf.get_y() if y is None else y
+    page = _Page(pdf, x, y, w)
+    if y + page.h > pdf.page_break_trigger:
+        pdf.add_page()
+        y = pdf.get_y()
+        page = _Page(pdf, x, y, w)
+
+    saved_font = (pdf.font_family, pdf.font_style, pdf.font_size_pt)
+    saved_color = (pdf.text_color, pdf.color_flag)
+    if font:
+        pdf.set_font(font, "", saved_font[2])
+
+    # vágás a pálya tartományára (mint a matplotlib tengely)
+    px0, py0 = page.pt(X_MIN, Y_MIN)
+    page.out(f"q {px0:.2f} {py0:.2f} {w * page.k:.2f} {page.h * page.k:.2f} re W n")
+    page.out("1 J 1 j")
+
+    # pálya (zorder 0–1), zóna (1.5), pontok és kapuk (2)
+    for sh in PITCH_SHAPES:
+        if sh.zorder < 2:
+            page.shape(sh)
+    if cd.area:
+        ax_, ay, aw, ah = cd.area
+        page.rect(ax_, ay, aw, ah, edge="#ffffff", lw=1.8, dash=(6.66, 2.88))
+    for sh in PITCH_SHAPES:
+        if sh.zorder >= 2:
+            page.shape(sh)
+
+    # nyilak (futás: zorder 2, passz: zorder 3)
+    for x0, y0, x1, y1 in cd.runs:
+        page.arrow(x0, y0, x1, y1, dash=(7.4, 3.2))
+    for x0, y0, x1, y1 in cd.passes:
+        page.arrow(x0, y0, x1, y1)
+
+    # mini-kapuk, bóják (zorder 4)
+    for gx, gy, gw, gh in cd.mini_goals:
+        page.rect(gx - gw / 2, gy - gh / 2, gw, gh, face="#111827", edge="#ffffff", lw=2)
+    for cx, cy in cd.cones:
+        page.circle(cx, cy, 1.2, face="#f97316", edge="#000000", lw=1)
+
+    # játékosok (zorder 5–7)
+    for cx, cy in cd.player_xy:
+        page.circle(cx, cy, 3.4, face="#000000", edge="#000000", lw=0.5)
+    for (cx, cy), team in zip(cd.player_xy, cd.player_team):
+        page.circle(cx, cy, 2.8, face=TEAM_COLORS.get(team, DEFAULT_PLAYER_COLOR), edge="#ffffff", lw=1.4)
+    for (cx, cy), label in zip(cd.player_xy, cd.player_label):
+        if label:
+            page.text(cx, cy, label, 7, "#000000", align="center")
+
+    # labda (zorder 8–9)
+    if cd.ball is not None:
+        bx, by = cd.ball
+        page.circle(bx, by, 1.3, face="#ffffff", edge="#000000", lw=1.1)
+        page.circle(bx, by, 0.6, face="#000000", edge="#000000", lw=0.8)
+
+    page.out("Q")
+
+    # feliratok (zorder 10; a matplotlib sem vágja őket)
+    for tx, ty, txt in cd.texts:
+        page.text(tx, ty, txt, 8, "#ffffff")
+
+    pdf.set_font(*saved_font)
+    pdf.text_color, pdf.color_flag = saved_color
+    pdf.set_y(y + page.h)
+    return page.h
@@ -0,0 +1,78 @@
+# tbp/periodization.py
+"""
+6 hetes periodizáció (taktikai + technikai + kondi + szorzó) és a UI listák.
+
+A pandas csak a get_period_table_df() hívásakor töltődik be.
+"""
+
+from typing import Dict, Any, List
+
+
+############################################################
+# TECHNIKAI + KONDI LISTÁK
+############################################################
+
+TECHNIKAI_SIMPLE = [
+    "passz",
+    "átvétel",
+    "labdavezetés",
+    "lövések",
+    "fejelés",
+    "cselezés"
+]
+
+KONDIC_SIMPLE = [
+    "gyorsaság",
+    "állóképesség",
+    "erő",
+    "agilitás"
+]
+
+
+############################################################
+# 6 HETES PERIODIZÁCIÓ
+############################################################
+
+# Taktikai opciók – fix, duplikációmentes lista
+TACTICAL_OPTIONS = [
+    "labdakihozatal",
+    "játékszervezés",
+    "befejezés",
+    "átmenet védekezésbe",
+    "védekezés",
+    "átmenet támadásba",
+]
+
+AGE_GROUPS = ["U7-U9", "U10-U12", "U13-U15", "U16-U19", "felnott"]
+
+PERIOD_TABLE_6W = {
+    1: {"taktikai": "labdakihozatal",        "technikai": "passz",        "kondi": "állóképesség", "szorzo": 1.00},
+    2: {"taktikai": "játékszervezés",        "technikai": "labdavezetés", "kondi": "agilitás",      "szorzo": 1.05},
+    3: {"taktikai": "befejezés",             "technikai": "lövések",      "kondi": "erő",           "szorzo": 1.10},
+    4: {"taktikai": "átmenet védekezésbe",   "technikai": "átvétel",      "kondi": "gyorsaság",     "szorzo": 1.15},
+    5: {"taktikai": "védekezés",             "technikai": "fejelés",      "kondi": "állóképesség",  "szorzo": 1.20},
+    6: {"taktikai": "átmenet támadásba",     "technikai": "cselezés",     "kondi": "gyorsaság",     "szorzo": 1.25},
+}
+
+def get_period_targets(period_week: int) -> Dict[str, Any]:
+    return PERIOD_TABLE_6W.get(period_week, PERIOD_TABLE_6W[1])
+
+PERIOD_COLUMNS = ["Hét", "Taktikai cél", "Technikai cél", "Kondicionális cél", "Intenzitás szorzó"]
+
+def get_period_row(period_week: int) -> Dict[str, Any]:
+    """Egy hét sora a megjelenített oszlopnevekkel."""
+    r = get_period_targets(period_week)
+    return {
+        "Hét": period_week,
+        "Taktikai cél": r["taktikai"],
+        "Technikai cél": r["technikai"],
+        "Kondicionális cél": r["kondi"],
+        "Intenzitás szorzó": r["szorzo"],
+    }
+
+def get_period_table_rows() -> List[Dict[str, Any]]:
+    return [get_period_row(w) for w in range(1, 7)]
+
+def get_period_table_df():
+    import pandas as pd
+    return pd.DataFrame(get_period_table_rows(), columns=PERIOD_COLUMNS)
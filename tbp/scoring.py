@@ -0,0 +1,244 @@
+# tbp/scoring.py
+"""
+Vektorizált pontozó motor a score_exercise logikájához.
+
+A normalizált gyakorlat-DB-ből NumPy tömbök készülnek; az oszlopok a
+tbp.vocab egész id-i (a szókincs bővülésekor a mátrix csak szélesedik):
+  - fő taktikai cél one-hot mátrix  (gyakorlat × fő cél)
+  - taktikai címke incidencia mátrix (gyakorlat × címke)
+  - technikai / kondi incidencia     (gyakorlat × fókusz)
+  - korosztály maszk                 (gyakorlat × korosztály)
+  - edzésrész kód                    (gyakorlat)
+
+Sok kérés egyszerre pontozható mátrixszorzással:
+    pont = 5 * [fő cél] + 2 * (#egyező címke) + 1 * (#egyező technikai
+           és kondi fókusz) + 1 * [korosztály]
+"""
+
+from typing import Dict, Any, List, Mapping, NamedTuple, Optional, Sequence, Set
+
+import numpy as np
+
+from tbp.drill_index import MAIN_WEIGHT, TAG_WEIGHT, TECH_WEIGHT, KONDI_WEIGHT, AGE_WEIGHT
+from tbp.vocab import VOCAB
+
+
+class ScoreRequest(NamedTuple):
+    stage: str
+    desired_fo: str
+    tact: List[str]
+    age_group: str
+    tech: Sequence[str] = ()
+    kondi: Sequence[str] = ()
+
+
+REMOVED = -2        # törölt pozíció edzésrész-kódja (egy kérés sem -2)
+
+
+def _vocab(values, out: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    out = {} if out is None else out
+    for v in values:
+        if v not in out:
+            out[v] = len(out)
+    return out
+
+
+# mátrix -> szókincs-család (a "main" a taktikai id-ket használja)
+_MATRICES = (("main_onehot", "main"), ("tag_matrix", "taktikai"), ("tech_matrix", "technikai"),
+             ("kondi_matrix", "kondi"), ("age_mask", "korosztaly"))
+
+
+def _row_ids(ex: Mapping[str, Any]) -> Dict[str, List[int]]:
+    """Egy gyakorlat oszlop-id-i családonként (tbp.vocab)."""
+    return {
+        "main": list(VOCAB.ids("taktikai", ex.get("fo_taktikai_cel", ""))[:1]),
+        "taktikai": VOCAB.many("taktikai", ex.get("taktikai_cel_cimkek", [])),
+        "technikai": VOCAB.many("technikai", ex.get("technikai_cel_cimkek", [])),
+        "kondi": VOCAB.many("kondi", ex.get("kondicionalis_cel_cimkek", [])),
+        "korosztaly": VOCAB.many("korosztaly", ex.get("ajanlott_korosztalyok", [])),
+    }
+
+
+def _widths(rows) -> Dict[str, int]:
+    """Oszlopszám családonként: a legnagyobb előforduló id + 1."""
+    w = {family: 0 for _, family in _MATRICES}
+    for ids in rows:
+        for family, values in ids.items():
+            if values:
+                w[family] = max(w[family], max(values) + 1)
+    return w
+
+
+class ScoringEngine:
+    """
+    A teljes DB tömbösített alakja. A pozíciók az eredeti lista indexei,
+    így az eredmény bármelyik azonos sorrendű DB-példányra visszavezethető.
+    None elem: törölt pozíció (tbp.live_catalog), soha nem választható.
+    """
+
+    def __init__(self, db: Sequence[Optional[Mapping[str, Any]]], chunk_size: int = 256):
+        self.size = len(db)
+        self.chunk_size = chunk_size
+        self.file_names: List[Optional[str]] = [ex.get("file_name") if ex is not None else None for ex in db]
+
+        live = [ex for ex in db if ex is not None]
+        self.stage_vocab = _vocab(ex.get("edzes_resze") for ex in live)
+        rows = [(pos, ex, _row_ids(ex)) for pos, ex in enumerate(db) if ex is not None]
+        w = _widths(ids for _, _, ids in rows)
+
+        n = self.size
+        self.stage_code = np.full(n, REMOVED, dtype=np.int32)
+        self.main_onehot = np.zeros((n, w["main"]), dtype=np.int32)
+        self.tag_matrix = np.zeros((n, w["taktikai"]), dtype=np.int32)
+        self.tech_matrix = np.zeros((n, w["technikai"]), dtype=np.int32)
+        self.kondi_matrix = np.zeros((n, w["kondi"]), dtype=np.int32)
+        self.age_mask = np.zeros((n, w["korosztaly"]), dtype=bool)
+
+        for pos, ex, ids in rows:
+            self._fill(pos, ex, ids)
+
+    def _fill(self, pos: int, ex: Mapping[str, Any], ids: Dict[str, List[int]]):
+        self.stage_code[pos] = self.stage_vocab[ex.get("edzes_resze")]
+        self.main_onehot[pos, ids["main"]] = 1
+        self.tag_matrix[pos, ids["taktikai"]] = 1
+        self.tech_matrix[pos, ids["technikai"]] = 1
+        self.kondi_matrix[pos, ids["kondi"]] = 1
+        self.age_mask[pos, ids["korosztaly"]] = True
+
+    def updated(self, changes: Dict[int, Optional[Mapping[str, Any]]]) -> "ScoringEngine":
+        """
+        Új motor a changes pozícióinak cseréjével (új pozíció: a végén; None:
+        törlés). Python-szinten csak a változott sorok épülnek újra; a tömbök
+        másolata memcpy. A régi motor változatlan marad.
+        """
+        live = [ex for ex in changes.values() if ex is not None]
+        row_ids = {pos: _row_ids(ex) for pos, ex in changes.items() if ex is not None}
+        w = _widths(row_ids.values())
+        new = ScoringEngine.__new__(ScoringEngine)
+        new.chunk_size = self.chunk_size
+        new.size = max([self.size] + [pos + 1 for pos in changes])
+        new.stage_vocab = _vocab((ex.get("edzes_resze") for ex in live), dict(self.stage_vocab))
+
+        n, old_n = new.size, self.size
+        new.file_names = self.file_names + [None] * (n - old_n)
+        new.stage_code = np.full(n, REMOVED, dtype=np.int32)
+        new.stage_code[:old_n] = self.stage_code
+        for attr, family in _MATRICES:
+            old = getattr(self, attr)
+            m = np.zeros((n, max(old.shape[1], w[family])), dtype=old.dtype)
+            m[:old_n, :old.shape[1]] = old
+            m[list(changes)] = 0
+            setattr(new, attr, m)
+
+        for pos, ex in changes.items():
+            new.stage_code[pos] = REMOVED
+            new.file_names[pos] = ex.get("file_name") if ex is not None else None
+            if ex is not None:
+                new._fill(pos, ex, row_ids[pos])
+        return new
+
+    # ---- kérés -> vektorok ----
+
+    def _request_arrays(self, reqs: Sequence[ScoreRequest]):
+        r = len(reqs)
+        want_main = np.zeros((r, self.main_onehot.shape[1]), dtype=np.int32)
+        want_tags = np.zeros((r, self.tag_matrix.shape[1]), dtype=np.int32)
+        want_tech = np.zeros((r, self.tech_matrix.shape[1]), dtype=np.int32)
+        want_kondi = np.zeros((r, self.kondi_matrix.shape[1]), dtype=np.int32)
+        stage = np.full(r, -1, dtype=np.int32)
+        age = np.full(r, -1, dtype=np.int32)
+
+        for i, q in enumerate(reqs):
+            for m in VOCAB.ids("taktikai", q.desired_fo):
+                if m < want_main.shape[1]:
+                    want_main[i, m] = 1
+            # a kért listák ismétlődései is számítanak, mint a score_exercise-ben;
+            # egyetlen gyakorlatban sem szereplő id-nek nincs oszlopa
+            for want, family, values in ((want_tags, "taktikai", q.tact),
+                                         (want_tech, "technikai", q.tech),
+                                         (want_kondi, "kondi", q.kondi)):
+                for v in values:
+                    for j in VOCAB.ids(family, v):
+                        if j < want.shape[1]:
+                            want[i, j] += 1
+            stage[i] = self.stage_vocab.get(q.stage, -1)
+            a = VOCAB.ids("korosztaly", q.age_group)
+            age[i] = a[0] if a and a[0] < self.age_mask.shape[1] else -1
+
+        return want_main, want_tags, want_tech, want_kondi, stage, age
+
+    def score(self, reqs: Sequence[ScoreRequest]) -> np.ndarray:
+        """
+        Nyers pontszámok (kérés × gyakorlat), pontosan a score_exercise
+        értékei, szűrés nélkül.
+        """
+        want_main, want_tags, want_tech, want_kondi, _, age = self._request_arrays(reqs)
+        scores = MAIN_WEIGHT * (want_main @ self.main_onehot.T)
+        scores += TAG_WEIGHT * (want_tags @ self.tag_matrix.T)
+        scores += TECH_WEIGHT * (want_tech @ self.tech_matrix.T)
+        scores += KONDI_WEIGHT * (want_kondi @ self.kondi_matrix.T)
+        for i, a in enumerate(age):
+            if a >= 0:
+                scores[i] += AGE_WEIGHT * self.age_mask[:, a]
+        return scores
+
+    def _eligible_scores(self, reqs: Sequence[ScoreRequest],
+                         used_ids: Optional[Set[str]]) -> np.ndarray:
+        """Pontok, ahol a nem választható gyakorlat -1 (a pick_exercise szűrői)."""
+        *_, stage, age = self._request_arrays(reqs)
+        scores = self.score(reqs)
+
+        ok = self.stage_code[None, :] == stage[:, None]
+        has_age = age >= 0
+        ok[~has_age] = False
+        ok[has_age] &= self.age_mask[:, age[has_age]].T
+        if used_ids:
+            ok &= np.array([fn not in used_ids for fn in self.file_names], dtype=bool)[None, :]
+
+        scores[~ok] = -1
+        return scores
+
+    # ---- kiválasztás ----
+
+    def top_k(self, reqs: Sequence[ScoreRequest], k: int,
+              used_ids: Optional[Set[str]] = None) -> List[List[int]]:
+        """
+        Kérésenként a k legjobb választható gyakorlat pozíciója
+        (csökkenő pont, azonos pontnál DB-sorrend).
+        """
+        out: List[List[int]] = []
+        for start in range(0, len(reqs), self.chunk_size):
+            chunk = reqs[start:start + self.chunk_size]
+            scores = self._eligible_scores(chunk, used_ids)
+            kk = min(k, self.size)
+            if kk <= 0:
+                out.extend([] for _ in chunk)
+                continue
+            part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            for i in range(len(chunk)):
+                cand = part[i]
+                # a partíció határán lévő azonos pontúak közül a DB-sorrend dönt
+                thr = scores[i, cand].min()
+                cand = np.union1d(cand, np.flatnonzero(scores[i] == thr))
+                order = np.lexsort((cand, -scores[i, cand]))
+                cand = cand[order][:kk]
+                out.append([int(p) for p in cand if scores[i, p] >= 0])
+        return out
+
+    def best_tiers(self, reqs: Sequence[ScoreRequest],
+                   used_ids: Optional[Set[str]] = None) -> List[List[int]]:
+        """
+        Kérésenként a legjobb pontszámú réteg pozíciói DB-sorrendben –
+        ugyanaz, amiből a pick_exercise véletlenszerűen választ.
+        """
+        out: List[List[int]] = []
+        for start in range(0, len(reqs), self.chunk_size):
+            chunk = reqs[start:start + self.chunk_size]
+            scores = self._eligible_scores(chunk, used_ids)
+            best = scores.max(axis=1) if self.size else np.full(len(chunk), -1)
+            for i in range(len(chunk)):
+                if best[i] < 0:
+                    out.append([])
+                else:
+                    out.append(np.flatnonzero(scores[i] == best[i]).tolist())
+        return out
@@ -0,0 +1,473 @@
+# tbp/search.py
+"""
+Teljes szöveges keresés a training_database.json gyakorlatleírásaiban.
+
+    python -m tbp.search build
+    python -m tbp.search query "labdakihozatal 5v3"
+
+Invertált index BM25 rangsorolással. A szavak ékezet- és kisbetű-függetlenek
+(tbp.vocab.fold: "lövés" == "loves", "ő" == "o"); a mezők súlyozottan számítanak
+(cím 3, címkék és kódcímkék 2, leírás / szervezés / coaching pontok 1). A
+lekérdezés utolsó szava előtagként illeszkedik (gépelés közbeni keresés,
+toldalékos alakok: "passz" → "passzjatek", "passzok").
+
+Az index a training_search.index.json-be mentődik. Betöltéskor a forrás
+mérete / mtime-ja dönt; ha a JSON változott, a rekordok id szerint,
+ujjlenyomattal hasonlítódnak össze, és csak a változott rekordok posting
+bejegyzései cserélődnek (a törölt pozíció üres marad, sok törlés után
+teljes újraépítés tömörít).
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+
+from tbp.vocab import fold
+
+TRAINING_DB_PATH = "training_database.json"
+SEARCH_INDEX_PATH = "training_search.index.json"
+
+FORMAT_VERSION = 1
+MIN_INTERVAL_S = 2.0
+
+# mező -> súly (BM25F-szerű: a súlyozott előfordulásszám megy a BM25-be)
+FIELD_WEIGHTS = {
+    "title_hu": 3,
+    "tags": 2,
+    "tactical_label": 2,
+    "technical_label": 2,
+    "description_hu": 1,
+    "organisation_hu": 1,
+    "coaching_points_hu": 1,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PREFIX_TERMS = 64       # ennyi szóra bomlik ki legfeljebb a befejezetlen utolsó szó
+
+# fold-olt alakban; a leggyakoribb névelők, kötőszók, a(z)-féle töredékek
+STOPWORDS = frozenset("""
+a az egy es is hogy de vagy meg mar nem mint ha ki be le fel el at ra re ban ben
+val vel bol bol kor pedig minden mindig igy ugy azt ezt ez azon ezen kb z
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text) -> List[str]:
+    """Fold-olt szavak, stopszavak és egybetűs töredékek nélkül."""
+    return [w for w in _WORD.findall(fold(text)) if len(w) > 1 and w not in STOPWORDS]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def doc_terms(rec: Dict[str, Any]) -> Dict[str, int]:
+    """Egy rekord súlyozott szógyakoriságai."""
+    tf: Counter = Counter()
+    for field, weight in FIELD_WEIGHTS.items():
+        for w in tokenize(_field_text(rec.get(field))):
+            tf[w] += weight
+    return dict(tf)
+
+
+def _fingerprint(rec: Dict[str, Any]) -> str:
+    raw = json.dumps(rec, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _load_records(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        db = json.load(f)
+    if not isinstance(db, list) or not all(isinstance(r, dict) and isinstance(r.get("id"), str) for r in db):
+        raise ValueError("A training adatbázis gyökere lista legyen, minden elemnek szöveges id-vel.")
+    return db
+
+
+class SearchHit(NamedTuple):
+    id: str
+    score: float
+    record: Dict[str, Any]
+
+
+class SearchUpdate(NamedTuple):
+    added: int
+    removed: int
+    changed: int
+    seconds: float
+    error: Optional[str] = None
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed or self.error)
+
+
+############################################################
+# INDEX
+############################################################
+
+class SearchIndex:
+    """
+    pozíció -> (id, ujjlenyomat, hossz); szó -> {pozíció: súlyozott tf}.
+    A rekordok maguk nem kerülnek a fájlba (a forrás JSON-ból jönnek).
+    Az írást a TrainingSearch zárja; a keresés csak olvas.
+    """
+
+    def __init__(self):
+        self.ids: List[Optional[str]] = []
+        self.fps: List[Optional[str]] = []
+        self.lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.pos: Dict[str, int] = {}
+        self.total_len = 0
+        self._terms: Optional[List[str]] = None         # rendezett szólista (előtag-kereséshez)
+        self._doc_terms: Optional[Dict[int, List[str]]] = None
+        self._owned: Optional[set] = None               # copy() után: a már lemásolt posting listák
+        self._norm_cache: Optional[List[float]] = None
+
+    def copy(self) -> "SearchIndex":
+        """Írható másolat; a posting listák csak az első módosításkor másolódnak."""
+        new = SearchIndex()
+        new.ids, new.fps, new.lengths = list(self.ids), list(self.fps), list(self.lengths)
+        new.postings = dict(self.postings)
+        new.pos = dict(self.pos)
+        new.total_len = self.total_len
+        new._terms = self._terms
+        new._doc_terms = dict(self._terms_of_all())
+        new._owned = set()
+        return new
+
+    def _plist(self, term: str) -> Dict[int, int]:
+        plist = self.postings[term]
+        if self._owned is not None and term not in self._owned:
+            plist = self.postings[term] = dict(plist)
+            self._owned.add(term)
+        return plist
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.pos)
+
+    # ---- írás ----
+
+    def add(self, rec: Dict[str, Any]):
+        tf = doc_terms(rec)
+        p = len(self.ids)
+        self.ids.append(rec["id"])
+        self.fps.append(_fingerprint(rec))
+        self.lengths.append(sum(tf.values()))
+        self.pos[rec["id"]] = p
+        self.total_len += self.lengths[p]
+        self._norm_cache = None
+        for term, n in tf.items():
+            if term in self.postings:
+                plist = self._plist(term)
+            else:
+                plist = self.postings[term] = {}
+                if self._owned is not None:
+                    self._owned.add(term)
+                self._terms = None
+            plist[p] = n
+        if self._doc_terms is not None:
+            self._doc_terms[p] = list(tf)
+
+    def remove(self, doc_id: str):
+        p = self.pos.pop(doc_id)
+        for term in self._terms_of_all().get(p, []):
+            plist = self._plist(term)
+            del plist[p]
+            if not plist:
+                del self.postings[term]
+                self._terms = None
+        self._doc_terms.pop(p, None)
+        self.total_len -= self.lengths[p]
+        self._norm_cache = None
+        self.ids[p] = self.fps[p] = None
+        self.lengths[p] = 0
+
+    def _terms_of_all(self) -> Dict[int, List[str]]:
+        """pozíció -> szavai; csak az első inkrementális frissítéskor épül (a posting listák megfordítása)."""
+        if self._doc_terms is None:
+            inv: Dict[int, List[str]] = {}
+            for term, plist in self.postings.items():
+                for q in plist:
+                    inv.setdefault(q, []).append(term)
+            self._doc_terms = inv
+        return self._doc_terms
+
+    def _norms(self) -> List[float]:
+        """BM25 hossz-normalizáló tag pozíciónként (változásig gyorsítótárazva)."""
+        norms = self._norm_cache
+        if norms is None:
+            avg = self.total_len / self.n_docs if self.n_docs and self.total_len else 1.0
+            c0, c1 = BM25_K1 * (1 - BM25_B), BM25_K1 * BM25_B / avg
+            norms = self._norm_cache = [c0 + c1 * ln for ln in self.lengths]
+        return norms
+
+    def dead_ratio(self) -> float:
+        return 1 - self.n_docs / len(self.ids) if self.ids else 0.0
+
+    # ---- keresés ----
+
+    def _expand(self, prefix: str) -> List[str]:
+        if self._terms is None:
+            self._terms = sorted(self.postings)
+        terms = self._terms
+        out = []
+        i = bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix) and len(out) < MAX_PREFIX_TERMS:
+            out.append(terms[i])
+            i += 1
+        return out
+
+    def search(self, query: str, k: int = 10, prefix: bool = True) -> List[Tuple[str, float]]:
+        """(id, BM25 pont) párok csökkenő pont szerint; prefix: az utolsó szó előtag."""
+        words = tokenize(query)
+        if not words or not self.pos:
+            return []
+        n = self.n_docs
+        norms = self._norms()
+        scores: Dict[int, float] = {}
+
+        groups = [[w] for w in words[:-1]]
+        last = words[-1]
+        # szóközre végződő lekérdezésnél az utolsó szó is kész
+        groups.append(self._expand(last) if prefix and query == query.rstrip() else [last])
+        for group in groups:
+            # egy befejezetlen szó kibontásai közül dokumentumonként a legjobb számít
+            acc: Dict[int, float] = scores if len(group) == 1 else {}
+            for term in group:
+                plist = self.postings.get(term)
+                if not plist:
+                    continue
+                w = (BM25_K1 + 1) * math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+                get = acc.get
+                if acc is scores:
+                    for p, tf in plist.items():
+                        acc[p] = get(p, 0.0) + w * tf / (tf + norms[p])
+                else:
+                    for p, tf in plist.items():
+                        s = w * tf / (tf + norms[p])
+                        if s > get(p, 0.0):
+                            acc[p] = s
+            if acc is not scores:
+                for p, s in acc.items():
+                    scores[p] = scores.get(p, 0.0) + s
+
+        top = heapq.nlargest(k, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+        return [(self.ids[p], s) for p, s in top]
+
+    # ---- mentés / betöltés ----
+
+    def to_json(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "version": FORMAT_VERSION,
+            "source": source,
+            "docs": [[i, fp, ln] if i is not None else None
+                     for i, fp, ln in zip(self.ids, self.fps, self.lengths)],
+            # szó -> [pozíció, tf, pozíció, tf, ...]
+            "postings": {t: [x for item in plist.items() for x in item] for t, plist in self.postings.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SearchIndex":
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Ismeretlen keresőindex-verzió: {data.get('version')}")
+        idx = cls()
+        for p, doc in enumerate(data["docs"]):
+            if doc is None:
+                idx.ids.append(None)
+                idx.fps.append(None)
+                idx.lengths.append(0)
+                continue
+            doc_id, fp, ln = doc
+            idx.ids.append(doc_id)
+            idx.fps.append(fp)
+            idx.lengths.append(ln)
+            idx.pos[doc_id] = p
+            idx.total_len += ln
+        idx.postings = {t: dict(zip(flat[::2], flat[1::2])) for t, flat in data["postings"].items()}
+        return idx
+
+
+def build_index(records: List[Dict[str, Any]]) -> SearchIndex:
+    idx = SearchIndex()
+    for rec in records:
+        if rec["id"] in idx.pos:
+            raise ValueError(f"Ismétlődő id a training adatbázisban: {rec['id']}")
+        idx.add(rec)
+    return idx
+
+
+############################################################
+# ÉLŐ KERESŐ (forrás + index + mentés)
+############################################################
+
+class TrainingSearch:
+    """
+    Processzenként egy (app: st.cache_resource). A refresh() legfeljebb
+    min_interval-onként ránéz a forrásra, és inkrementálisan frissít.
+    """
+
+    def __init__(self, json_path: str = TRAINING_DB_PATH, index_path: Optional[str] = SEARCH_INDEX_PATH,
+                 min_interval: float = MIN_INTERVAL_S):
+        self.json_path = json_path
+        self.index_path = index_path
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._stat = _stat(json_path)
+        self.records: Dict[str, Dict[str, Any]] = {r["id"]: r for r in _load_records(json_path)}
+        self.index = self._open_index()
+
+    def _source(self) -> Dict[str, Any]:
+        size, mtime = self._stat or (None, None)
+        return {"path": os.path.basename(self.json_path), "size": size, "mtime_ns": mtime}
+
+    def _open_index(self) -> SearchIndex:
+        idx = None
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                idx = SearchIndex.from_json(data)
+                if data.get("source") == self._source():
+                    return idx
+            except (OSError, ValueError, KeyError, TypeError):
+                idx = None      # sérült / régi fájl: teljes újraépítés
+        if idx is None:
+            idx = build_index(list(self.records.values()))
+        else:
+            self._apply(idx, list(self.records.values()))
+        self._save(idx)
+        return idx
+
+    def _apply(self, idx: SearchIndex, records: List[Dict[str, Any]]) -> Tuple[int, int, int]:
+        """Inkrementális frissítés ujjlenyomat alapján: (új, törölt, módosított)."""
+        by_id = {r["id"]: r for r in records}
+        if len(by_id) != len(records):
+            raise ValueError("Az id mezők nem egyediek a training adatbázisban.")
+        removed = [i for i in idx.pos if i not in by_id]
+        added = changed = 0
+        for i in removed:
+            idx.remove(i)
+        for doc_id, rec in by_id.items():
+            p = idx.pos.get(doc_id)
+            if p is None:
+                idx.add(rec)
+                added += 1
+            elif idx.fps[p] != _fingerprint(rec):
+                idx.remove(doc_id)
+                idx.add(rec)
+                changed += 1
+        return added, len(removed), changed
+
+    def _save(self, idx: SearchIndex):
+        if not self.index_path:
+            return
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            # json.dumps: a C enkóder (a json.dump fájlba tisztán Pythonban iterál)
+            raw = json.dumps(idx.to_json(self._source()), ensure_ascii=False, separators=(",", ":"))
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(raw)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            # csak gyorsítótár: írásvédett könyvtárban memóriában marad
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def refresh(self, force: bool = False) -> Optional[SearchUpdate]:
+        """Változáskor frissít és ment; visszaad: SearchUpdate vagy None."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.min_interval:
+            return None
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked = now
+            st = _stat(self.json_path)
+            if st == self._stat:
+                return None
+            t0 = time.perf_counter()
+            self._stat = st
+            try:
+                records = _load_records(self.json_path)
+                # másolaton dolgozunk: a futó keresések a régi indexet látják
+                idx = self.index.copy()
+                counts = self._apply(idx, records)
+            except (OSError, ValueError) as e:
+                return SearchUpdate(0, 0, 0, time.perf_counter() - t0, str(e))
+            if not any(counts):
+                return None     # csak az mtime változott
+            if idx.dead_ratio() > 0.5:
+                idx = build_index(records)
+            self.records = {r["id"]: r for r in records}
+            self.index = idx
+            self._save(idx)
+            return SearchUpdate(*counts, time.perf_counter() - t0)
+        finally:
+            self._lock.release()
+
+    def search(self, query: str, k: int = 10) -> List[SearchHit]:
+        idx, records = self.index, self.records
+        return [SearchHit(i, s, records[i]) for i, s in idx.search(query, k) if i in records]
+
+
+############################################################
+# CLI
+############################################################
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m tbp.search",
+                                 description="Keresőindex a training adatbázishoz.")
+    ap.add_argument("--json", default=TRAINING_DB_PATH)
+    ap.add_argument("--index", default=SEARCH_INDEX_PATH)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="index teljes újraépítése")
+    q = sub.add_parser("query", help="keresés")
+    q.add_argument("text")
+    q.add_argument("-k", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "build" and os.path.exists(args.index):
+        os.remove(args.index)
+    t0 = time.perf_counter()
+    ts = TrainingSearch(args.json, args.index)
+    t1 = time.perf_counter()
+    if args.cmd == "build":
+        print(f"{ts.index.n_docs} gyakorlat, {len(ts.index.postings)} szó ({t1 - t0:.2f} s) → {args.index}")
+        return 0
+    hits = ts.search(args.text, args.k)
+    dt = (time.perf_counter() - t1) * 1000
+    for h in hits:
+        print(f"{h.score:6.2f}  {h.id}  {h.record.get('title_hu', '')}")
+    print(f"{len(hits)} találat ({dt:.1f} ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+# tbp/selection.py
+"""
+GYAKORLAT VÁLASZTÁS – a Streamlit apptól független változat.
+
+A DB, az index és a pontozó motor paraméterként érkezik, így az app,
+a parancssoros kötegelt generálás és a tesztek ugyanazt a logikát használják.
+"""
+
+import random
+from typing import Dict, Any, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
+
+from tbp.catalog import DrillOverlay
+from tbp.drill_index import DrillIndex, MAIN_WEIGHT, TAG_WEIGHT, TECH_WEIGHT, KONDI_WEIGHT, AGE_WEIGHT
+from tbp.vocab import VOCAB, record_tags
+from tbp.workload import STAGES
+
+if TYPE_CHECKING:  # a numpy-s motor csak generáláskor töltődik be
+    from tbp.scoring import ScoringEngine
+
+
+def stage_label(s: str) -> str:
+    return {
+        "bemelegites": "Bemelegítés",
+        "cel1": "Cél 1",
+        "cel2": "Cél 2",
+        "cel3": "Cél 3"
+    }.get(s, s)
+
+def _hits(bits: int, family: str, values) -> int:
+    """Hány kért címke-id van a bitsetben (a kért lista ismétlődései is számítanak)."""
+    return sum(bits >> i & 1 for v in values for i in VOCAB.ids(family, v))
+
+def score_exercise(ex, stage: str, desired_fo: str, tact: List[str], age_group: str,
+                   tech: Sequence[str] = (), kondi: Sequence[str] = ()) -> int:
+    tags = record_tags(ex)
+    score = 0
+    if tags.main >= 0 and tags.main in VOCAB.ids("taktikai", desired_fo):
+        score += MAIN_WEIGHT
+    score += TAG_WEIGHT * _hits(tags.taktikai, "taktikai", tact)
+    score += TECH_WEIGHT * _hits(tags.technikai, "technikai", tech)
+    score += KONDI_WEIGHT * _hits(tags.kondi, "kondi", kondi)
+    age = VOCAB.ids("korosztaly", age_group)
+    if age and tags.korosztaly >> age[0] & 1:
+        score += AGE_WEIGHT
+    return score
+
+def pick_exercise(db: Sequence[Dict[str, Any]],
+                  index: DrillIndex,
+                  stage: str,
+                  desired_fo: str,
+                  tact: List[str],
+                  used_ids: Set[str],
+                  age_group: str,
+                  rng=random,
+                  tech: Sequence[str] = (),
+                  kondi: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+    # A legjobb pontszámú réteg közvetlenül az indexből (score_exercise-szel azonos)
+    best = index.best_candidates(stage, desired_fo, tact, used_ids, age_group, tech, kondi)
+    if not best:
+        return None
+    return db[rng.choice(best)]
+
+def generate_plan(db: Sequence[Dict[str, Any]],
+                  index: DrillIndex,
+                  engine: "ScoringEngine",
+                  fo_taktikai: str,
+                  tact_list: List[str],
+                  age_group: str,
+                  rng=random,
+                  tech: Sequence[str] = (),
+                  kondi: Sequence[str] = ()) -> Tuple[List[Dict[str, Any]], Set[str]]:
+    """
+    Visszaadja a (plan, used_ids) párt; a plan blokkjai {"stage", "exercise"},
+    az exercise a DB-rekord fölötti DrillOverlay (a rekord nem módosul).
+    A tech / kondi a kért technikai és kondicionális fókusz (+1 találatonként).
+    """
+    from tbp.scoring import ScoreRequest
+
+    plan = []
+    used = set()
+
+    # A 4 edzésrész egy kötegben pontozva. Egy gyakorlat egyetlen edzésrészhez
+    # tartozik, így a korábbi választás csak fájlnév-ütközésnél számít.
+    reqs = [ScoreRequest(stg, fo_taktikai, tact_list, age_group, tech, kondi) for stg in STAGES]
+    tiers = engine.best_tiers(reqs)
+
+    for stg, best in zip(STAGES, tiers):
+        best = [p for p in best if engine.file_names[p] not in used]
+        if best:
+            ex = db[rng.choice(best)]
+        else:
+            ex = pick_exercise(db, index, stg, fo_taktikai, tact_list, used, age_group, rng, tech, kondi)
+        if ex:
+            used.add(ex["file_name"])
+            plan.append({"stage": stg, "exercise": DrillOverlay(ex)})
+
+    return plan, used
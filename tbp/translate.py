@@ -0,0 +1,208 @@
+# tbp/translate.py
+"""
+Gépi fordítás (EN -> HU) perzisztens gyorsítótárral.
+
+    TranslationBackend      – interfész: translate(text) -> str
+    GoogleBackend           – deep_translator.GoogleTranslator (opcionális függőség)
+    TranslationCache        – SQLite (WAL); kulcs: blake2b(forrás-, célnyelv, szöveg)
+    TranslationService      – gyorsítótár + párhuzamos, időkorlátos kötegelt fordítás
+
+A Planner egy terv összes hiányzó szakaszát egy translate_many hívással kéri:
+a gyorsítótárban lévők hálózat nélkül jönnek, a többi legfeljebb max_workers
+szálon, együttesen legfeljebb timeout másodpercig fut. Ami addig nem készül
+el, None (az app fordítás nélkül jelenít meg); a késve beérkező eredmény
+ettől még bekerül a gyorsítótárba, így a következő rerun már látja. A
+sikertelen szöveg RETRY_AFTER_S-ig nem kérődik újra (rate limit, nincs hálózat).
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+TRANSLATION_DB_PATH = "translation_cache.db"
+MAX_WORKERS = 4
+TIMEOUT_S = 8.0
+RETRY_AFTER_S = 300.0           # sikertelen szöveg ennyi ideig nem kérődik újra
+
+
+class TranslationBackend(ABC):
+    name = "backend"
+    source = "en"
+    target = "hu"
+
+    @abstractmethod
+    def translate(self, text: str) -> str:
+        """Egy szöveg fordítása; hibánál kivétel (a szolgáltatás None-ra fordítja)."""
+
+
+class GoogleBackend(TranslationBackend):
+    name = "google"
+
+    def __init__(self, source: str = "en", target: str = "hu"):
+        # opcionális függőség: hiányában ImportError, a hívó fordítás nélkül megy tovább
+        from deep_translator import GoogleTranslator
+
+        self.source, self.target = source, target
+        self._cls = GoogleTranslator
+        self._local = threading.local()
+
+    def translate(self, text: str) -> str:
+        # a GoogleTranslator a kérés paramétereit a példányon tárolja: szálanként saját példány
+        tr = getattr(self._local, "translator", None)
+        if tr is None:
+            tr = self._local.translator = self._cls(source=self.source, target=self.target)
+        return tr.translate(text)
+
+
+############################################################
+# PERZISZTENS GYORSÍTÓTÁR (SQLITE)
+############################################################
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translation (
+    key      TEXT PRIMARY KEY,
+    backend  TEXT NOT NULL,
+    text     TEXT NOT NULL,
+    created  REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def cache_key(text: str, source: str, target: str) -> str:
+    raw = f"{source}>{target}\0{text}".encode("utf-8")
+    return hashlib.blake2b(raw, digest_size=20).hexdigest()
+
+
+class TranslationCache:
+    """Szálanként saját kapcsolat, WAL napló (mint a tbp.workload_store)."""
+
+    def __init__(self, path: str = TRANSLATION_DB_PATH, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        keys = list(keys)
+        out: Dict[str, str] = {}
+        conn = self._conn()
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ",".join("?" * len(part))
+            out.update(conn.execute(f"SELECT key, text FROM translation WHERE key IN ({marks})", part).fetchall())
+        return out
+
+    def put(self, key: str, backend: str, text: str):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO translation (key, backend, text, created) VALUES (?, ?, ?, ?)",
+            (key, backend, text, time.time()),
+        )
+
+
+############################################################
+# SZOLGÁLTATÁS
+############################################################
+
+class TranslationService:
+    """
+    Processzenként egy (Planner: st.cache_resource). A szálkészlet a példánnyal
+    él, így az időkorlátot túllépő fordítások a háttérben befejeződnek.
+    """
+
+    def __init__(self, backend: Optional[TranslationBackend], cache: Optional[TranslationCache] = None,
+                 max_workers: int = MAX_WORKERS, timeout: float = TIMEOUT_S):
+        self.backend = backend
+        self.cache = cache
+        self.timeout = timeout
+        self._memo: Dict[str, str] = {}
+        self._pending: Dict[str, Future] = {}           # kulcs -> futó fordítás
+        self._failed: Dict[str, float] = {}             # kulcs -> sikertelen próba ideje
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate") if backend else None
+
+    def _key(self, text: str) -> str:
+        b = self.backend
+        return cache_key(text, b.source, b.target) if b else cache_key(text, "en", "hu")
+
+    def _run(self, key: str, text: str) -> Optional[str]:
+        try:
+            out = self.backend.translate(text)
+        except Exception:
+            out = None      # hálózati / backend hiba: ezt a szöveget most fordítás nélkül mutatjuk
+        with self._lock:
+            self._pending.pop(key, None)
+            if out:
+                self._memo[key] = out
+                self._failed.pop(key, None)
+            else:
+                self._failed[key] = time.time()
+        if out and self.cache is not None:
+            try:
+                self.cache.put(key, self.backend.name, out)
+            except sqlite3.Error:
+                pass
+        return out or None
+
+    def cached(self, texts: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Csak a gyorsítótárból (hálózat nélkül); hiányzó: None."""
+        texts = list(dict.fromkeys(t for t in texts if t and isinstance(t, str)))
+        keys = {t: self._key(t) for t in texts}
+        with self._lock:
+            out = {t: self._memo.get(k) for t, k in keys.items()}
+        missing = [keys[t] for t, v in out.items() if v is None]
+        if missing and self.cache is not None:
+            try:
+                found = self.cache.get_many(missing)
+            except sqlite3.Error:
+                found = {}
+            if found:
+                with self._lock:
+                    self._memo.update(found)
+                out = {t: out[t] or found.get(keys[t]) for t in texts}
+        return out
+
+    def translate_many(self, texts: Iterable[str], timeout: Optional[float] = None) -> Dict[str, Optional[str]]:
+        """
+        Szöveg -> fordítás (None: nem sikerült / időkorlát). A hiányzók
+        párhuzamosan, együttesen legfeljebb timeout másodpercig.
+        """
+        out = self.cached(texts)
+        missing = [t for t, v in out.items() if v is None]
+        if not missing or self._pool is None:
+            return out
+
+        futures = {}
+        with self._lock:
+            for t in missing:
+                key = self._key(t)
+                if key in self._memo:           # közben elkészült
+                    out[t] = self._memo[key]
+                    continue
+                if time.time() - self._failed.get(key, 0.0) < RETRY_AFTER_S:
+                    continue
+                fut = self._pending.get(key)
+                if fut is None:
+                    fut = self._pending[key] = self._pool.submit(self._run, key, t)
+                futures[fut] = t
+        done, _ = wait(futures, timeout=self.timeout if timeout is None else timeout)
+        for fut in done:
+            out[futures[fut]] = fut.result()
+        return out
+
+    def translate(self, text: str) -> Optional[str]:
+        return self.translate_many([text]).get(text) if text else None
@@ -0,0 +1,258 @@
+# tbp/vocab.py
+"""
+Egységes címke-szókincs mindkét gyakorlat-adatbázishoz.
+
+Családok: taktikai, technikai, kondi, korosztaly. Egy nyers címke útja:
+
+1. fold: kisbetű, ékezet nélkül, "_" / "-" / szóköz egységesen
+   ("Mozgás_labda_nélkül" == "mozgas labda nelkul");
+2. alias-tábla vagy szótő-szabály → a UI kanonikus kategóriái
+   (TACTICAL_OPTIONS, TECHNIKAI_SIMPLE, KONDIC_SIMPLE, AGE_GROUPS); egy címke
+   több kategóriát is jelenthet ("átadás-átvétel" → passz + átvétel);
+3. ismeretlen címke: saját bejegyzés (az első előfordulás kisbetűs alakjával).
+
+Minden bejegyzés családonként kis egész id-t kap (a kanonikus kategóriák az
+elsők), a gyakorlatok címkehalmaza pedig int bitset (record_tags). Az
+illesztés így id- és bitművelet; a feloldás nyers szövegenként egyszer fut.
+A training_database.json kódjai (tactical_code, technical_code,
+age_group_code, tags) ugyanebbe a szókincsbe képeződnek.
+"""
+
+import re
+import threading
+import unicodedata
+from typing import Dict, Any, Iterable, List, Mapping, NamedTuple, Tuple
+
+from tbp.periodization import AGE_GROUPS, KONDIC_SIMPLE, TACTICAL_OPTIONS, TECHNIKAI_SIMPLE
+
+FAMILIES = ("taktikai", "technikai", "kondi", "korosztaly")
+
+CANONICAL: Dict[str, List[str]] = {
+    "taktikai": TACTICAL_OPTIONS,
+    "technikai": TECHNIKAI_SIMPLE,
+    "kondi": KONDIC_SIMPLE,
+    "korosztaly": AGE_GROUPS,
+}
+
+_SEP = re.compile(r"[\s_\-–—/]+")
+_COMBINING = re.compile("[\u0300-\u036f]+")     # NFKD után az ékezetek (hosszú szövegen is C-sebességgel)
+
+
+def fold(text) -> str:
+    """Kisbetű, ékezet- és elválasztó-független kulcs."""
+    s = str(text).lower()
+    if not s.isascii():
+        s = _COMBINING.sub("", unicodedata.normalize("NFKD", s))
+    return _SEP.sub(" ", s).strip()
+
+
+############################################################
+# ALIASOK (fold-olt kulcs -> kanonikus kategóriák)
+############################################################
+
+_ALIASES: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "taktikai": {
+        "jatek szervezes": ("játékszervezés",),
+        "jateksszervezes": ("játékszervezés",),
+        "labdabirtoklas": ("játékszervezés",),
+        "possession": ("játékszervezés",),
+        "labda kihozatal": ("labdakihozatal",),
+        "build up": ("labdakihozatal",),
+        "finishing": ("befejezés",),
+        "vedekezes labdaszerzes": ("védekezés",),
+        "labdaszerzes": ("védekezés",),
+        "pressing": ("védekezés",),
+        "presszing": ("védekezés",),
+        "transition": ("átmenet támadásba", "átmenet védekezésbe"),
+    },
+    "technikai": {
+        "atadas atvetel": ("passz", "átvétel"),
+        "elso erintes": ("átvétel",),
+        "ball control": ("átvétel",),
+        "short passing": ("passz",),
+        "long passing": ("passz",),
+        "kombinacio": ("passz",),
+        "finishing tech": ("lövések", "fejelés"),
+        "celloves": ("lövések",),
+        "befejezorugas": ("lövések",),
+        "lovet": ("lövések",),
+    },
+    "kondi": {
+        "eronlet": ("állóképesség",),
+        "agility": ("agilitás",),
+        "agitacio": ("agilitás",),
+        "agyorsasag": ("gyorsaság",),
+    },
+    "korosztaly": {
+        "u10 u11": ("U10-U12",),
+        "u12 u13": ("U10-U12", "U13-U15"),
+        "u14 u15": ("U13-U15",),
+        "adult": ("felnott",),
+        "felnott": ("felnott",),
+    },
+}
+
+# szótő-szabályok: ha a címke bármely szava így kezdődik
+_STEMS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "taktikai": (),
+    "technikai": (
+        ("passz", "passz"), ("pasz", "passz"), ("atadas", "passz"), ("hosszupassz", "passz"),
+        ("lobpassz", "passz"),
+        ("atvetel", "átvétel"), ("labdaatvetel", "átvétel"), ("fogadas", "átvétel"),
+        ("labdakezel", "átvétel"),
+        ("labdavezet", "labdavezetés"), ("vezetes", "labdavezetés"),
+        ("loves", "lövések"), ("lovestechnika", "lövések"),
+        ("fejel", "fejelés"), ("fejes", "fejelés"),
+        ("csel", "cselezés"), ("1v1", "cselezés"),
+    ),
+    "kondi": (
+        ("gyors", "gyorsaság"), ("sprint", "gyorsaság"), ("reakc", "gyorsaság"),
+        ("robbanekony", "erő"),
+        ("allokep", "állóképesség"), ("kitart", "állóképesség"),
+        ("ero", "erő"), ("ugranyero", "erő"),
+        ("agilit", "agilitás"), ("iranyvalt", "agilitás"), ("mozgekony", "agilitás"),
+        ("koordin", "agilitás"), ("ugyesseg", "agilitás"),
+    ),
+    "korosztaly": (),
+}
+
+
+_CANON_KEYS = {f: {fold(c): c for c in labels} for f, labels in CANONICAL.items()}
+
+
+def _targets(family: str, raw) -> Tuple[Tuple[str, ...], bool]:
+    """(kanonikus címkék, ismert-e); ismeretlennél a nyers címke maga."""
+    key = fold(raw)
+    canon = _CANON_KEYS[family].get(key)
+    if canon:
+        return (canon,), True
+    alias = _ALIASES[family].get(key)
+    if alias:
+        return alias, True
+    cats: List[str] = []
+    for word in key.split():
+        for stem, cat in _STEMS[family]:
+            if word.startswith(stem) and cat not in cats:
+                cats.append(cat)
+    if cats:
+        return tuple(cats), True
+    return (str(raw).strip().lower(),), False
+
+
+############################################################
+# SZÓKINCS
+############################################################
+
+class TagVocab:
+    """Processzenként egy (VOCAB). Szálbiztos; az id-k csak hozzáadódnak, sosem változnak."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, Dict[str, int]] = {f: {} for f in FAMILIES}     # fold(címke) -> id
+        self._names: Dict[str, List[str]] = {f: [] for f in FAMILIES}
+        self._resolved: Dict[Tuple[str, str], Tuple[Tuple[int, ...], bool]] = {}
+        for family, labels in CANONICAL.items():
+            for label in labels:
+                self._intern(family, label)
+
+    def _intern(self, family: str, label: str) -> int:
+        key = fold(label)
+        ids = self._ids[family]
+        i = ids.get(key)
+        if i is None:
+            with self._lock:
+                i = ids.get(key)
+                if i is None:
+                    names = self._names[family]
+                    i = len(names)
+                    names.append(label)
+                    ids[key] = i
+        return i
+
+    def ids(self, family: str, raw, known_only: bool = False) -> Tuple[int, ...]:
+        """Egy nyers címke id-i; known_only: ismeretlen címkére üres (nem vesz fel új id-t)."""
+        k = (family, raw)
+        r = self._resolved.get(k)
+        if r is None:
+            labels, known = _targets(family, raw)
+            if known_only and not known:
+                return ()
+            r = self._resolved[k] = (tuple(self._intern(family, lb) for lb in labels), known)
+        return r[0] if r[1] or not known_only else ()
+
+    def many(self, family: str, values: Iterable, known_only: bool = False) -> List[int]:
+        """Címkelista id-i, ismétlés nélkül, első előfordulás sorrendjében."""
+        out: List[int] = []
+        for v in values:
+            for i in self.ids(family, v, known_only):
+                if i not in out:
+                    out.append(i)
+        return out
+
+    def bits(self, family: str, values: Iterable, known_only: bool = False) -> int:
+        b = 0
+        for v in values:
+            for i in self.ids(family, v, known_only):
+                b |= 1 << i
+        return b
+
+    def labels(self, family: str, raw) -> Tuple[str, ...]:
+        """Normalizált (megjelenített) címkék."""
+        names = self._names[family]
+        return tuple(names[i] for i in self.ids(family, raw))
+
+    def name(self, family: str, i: int) -> str:
+        return self._names[family][i]
+
+    def names(self, family: str, bits: int) -> List[str]:
+        names = self._names[family]
+        return [names[i] for i in range(bits.bit_length()) if bits >> i & 1]
+
+    def size(self, family: str) -> int:
+        return len(self._names[family])
+
+
+VOCAB = TagVocab()
+
+
+############################################################
+# GYAKORLATONKÉNTI BITSETEK (mindkét séma)
+############################################################
+
+class DrillTags(NamedTuple):
+    main: int           # fő taktikai cél id-je (-1: nincs)
+    taktikai: int       # bitsetek
+    technikai: int
+    kondi: int
+    korosztaly: int
+
+
+def record_tags(ex: Mapping[str, Any], vocab: TagVocab = VOCAB) -> DrillTags:
+    """
+    Egy gyakorlat címkéi bitsetként. Drill séma (fo_taktikai_cel, ..._cimkek,
+    ajanlott_korosztalyok) vagy training_database.json séma (tactical_code,
+    technical_code, age_group_code, tags; a tags-ből csak az ismert címkék).
+    """
+    if "tactical_code" in ex:
+        tags = ex.get("tags", [])
+        main = vocab.ids("taktikai", ex.get("tactical_code", ""))
+        return DrillTags(
+            main[0] if main else -1,
+            vocab.bits("taktikai", [ex.get("tactical_code", "")]) | vocab.bits("taktikai", tags, True),
+            vocab.bits("technikai", [ex.get("technical_code", "")]) | vocab.bits("technikai", tags, True),
+            vocab.bits("kondi", tags, True),
+            vocab.bits("korosztaly", [ex.get("age_group_code", "")]),
+        )
+    main = vocab.ids("taktikai", ex.get("fo_taktikai_cel", ""))
+    return DrillTags(
+        main[0] if main else -1,
+        vocab.bits("taktikai", ex.get("taktikai_cel_cimkek", [])),
+        vocab.bits("technikai", ex.get("technikai_cel_cimkek", [])),
+        vocab.bits("kondi", ex.get("kondicionalis_cel_cimkek", [])),
+        vocab.bits("korosztaly", ex.get("ajanlott_korosztalyok", [])),
+    )
+
+
+def normalize_tags(family: str, values: Iterable) -> List[str]:
+    """Címkelista normalizált alakja (ismétlés nélkül)."""
+    return [VOCAB.name(family, i) for i in VOCAB.many(family, values)]
@@ -0,0 +1,46 @@
+# tbp/workload.py
+"""
+WORKLOAD (Model 1, periodizációs szorzóval)
+"""
+
+from typing import List
+
+from tbp.periodization import get_period_targets
+
+BASE_LOAD = {
+    "bemelegites": 100,
+    "cel1": 250,
+    "cel2": 250,
+    "cel3": 300
+}
+
+TECH_BONUS = {
+    "passz": 20,
+    "átvétel": 20,
+    "labdavezetés": 25,
+    "lövések": 30,
+    "fejelés": 20,
+    "cselezés": 40
+}
+
+KONDI_BONUS = {
+    "gyorsaság": 30,
+    "állóképesség": 50,
+    "erő": 40,
+    "agilitás": 35
+}
+
+STAGES = ["bemelegites", "cel1", "cel2", "cel3"]
+
+def compute_workload(period_week: int,
+                     stages: List[str],
+                     tech: List[str],
+                     kondi: List[str]) -> float:
+    period = get_period_targets(period_week)
+    mult = float(period["szorzo"])
+
+    base = sum(BASE_LOAD.get(s, 0) for s in stages)
+    tech_bonus = sum(TECH_BONUS.get(t, 0) for t in tech)
+    kond_bonus = sum(KONDI_BONUS.get(k, 0) for k in kondi)
+
+    return (base + tech_bonus + kond_bonus) * mult
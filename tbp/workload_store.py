@@ -0,0 +1,266 @@
+# tbp/workload_store.py
+"""
+Heti terhelés (ACWR history) tárolása.
+
+    WorkloadStore           – interfész
+    SqliteWorkloadStore     – alapértelmezett: SQLite WAL, finalize = egy kis tranzakció
+    JsonWorkloadStore       – a régi acwr_history.json formátum (atomikus írással)
+
+A tároló kiválasztása: open_workload_store("sqlite:acwr_history.db") vagy
+open_workload_store("json:acwr_history.json"); alapértelmezés a
+TBP_WORKLOAD_STORE környezeti változó, ennek hiányában DEFAULT_STORE_URL.
+Az SQLite tároló első megnyitáskor automatikusan importálja a meglévő
+acwr_history.json-t.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from tbp.acwr import ACWR_HISTORY_PATH, load_acwr_history
+
+WORKLOAD_DB_PATH = "acwr_history.db"
+DEFAULT_STORE_URL = f"sqlite:{WORKLOAD_DB_PATH}"
+
+History = Dict[str, Dict[str, Dict[str, float]]]   # coach -> team -> week -> load
+Row = Tuple[str, str, str, float]                   # (coach_id, team_id, week_key, load)
+
+
+class WorkloadStore(ABC):
+    @abstractmethod
+    def add_workload(self, coach_id: str, team_id: str, week_key: str, workload: float) -> float:
+        """A heti terheléshez hozzáadja a workloadot; visszaadja az új heti összeget."""
+
+    @abstractmethod
+    def team_weeks(self, coach_id: str, team_id: str) -> Dict[str, float]:
+        """{"YYYY-Www": terhelés} egy csapatra."""
+
+    @abstractmethod
+    def all_histories(self) -> History:
+        """Az összes history {coach: {team: {hét: terhelés}}} alakban."""
+
+    @abstractmethod
+    def all_rows(self) -> List[Row]:
+        """Az összes heti terhelés (coach_id, team_id, week_key) szerint rendezve."""
+
+    @abstractmethod
+    def version(self) -> int:
+        """Minden finalize után változó szám (cache-kulcsnak)."""
+
+    @abstractmethod
+    def team_version(self, coach_id: str, team_id: str) -> int:
+        """Mint a version(), de csak az adott csapat finalize-aira változik."""
+
+
+############################################################
+# SQLITE (WAL)
+############################################################
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS weekly_load (
+    coach_id TEXT NOT NULL,
+    team_id  TEXT NOT NULL,
+    week_key TEXT NOT NULL,
+    load     REAL NOT NULL,
+    PRIMARY KEY (coach_id, team_id, week_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS team_version (
+    coach_id TEXT NOT NULL,
+    team_id  TEXT NOT NULL,
+    version  INTEGER NOT NULL,
+    PRIMARY KEY (coach_id, team_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS store_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteWorkloadStore(WorkloadStore):
+    """
+    Szálanként saját kapcsolat, WAL napló, busy_timeout. A hozzáadás egy rövid
+    tranzakció: UPSERT (load = load + új érték) + verziószámláló, így
+    párhuzamos finalize-oknál sincs elveszett frissítés. Az olvasás a
+    (coach_id, team_id) elsődleges kulcs prefixén indexelt.
+    """
+
+    def __init__(self, path: str = WORKLOAD_DB_PATH,
+                 import_json: Optional[str] = ACWR_HISTORY_PATH,
+                 timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        if import_json:
+            self._import_json(import_json)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _import_json(self, json_path: str):
+        """Egyszeri import a régi JSON historyból (hibás JSON-nál kivétel, nem néma törlés)."""
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM store_meta WHERE key = 'json_imported'").fetchone():
+            return
+        if not os.path.exists(json_path):
+            return
+
+        data = load_acwr_history(json_path)
+        rows = [
+            (coach, team, week, float(load))
+            for coach, teams in data.items()
+            for team, weeks in teams.items()
+            for week, load in weeks.items()
+        ]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM store_meta WHERE key = 'json_imported'").fetchone():
+                conn.execute("ROLLBACK")
+                return
+            conn.executemany(
+                "INSERT INTO weekly_load (coach_id, team_id, week_key, load) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (coach_id, team_id, week_key) DO UPDATE SET load = load + excluded.load",
+                rows,
+            )
+            conn.execute("INSERT INTO store_meta (key, value) VALUES ('json_imported', ?)",
+                         (os.path.abspath(json_path),))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add_workload(self, coach_id: str, team_id: str, week_key: str, workload: float) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "INSERT INTO weekly_load (coach_id, team_id, week_key, load) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (coach_id, team_id, week_key) DO UPDATE SET load = load + excluded.load "
+                "RETURNING load",
+                (coach_id, team_id, week_key, float(workload)),
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('version', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+            conn.execute(
+                "INSERT INTO team_version (coach_id, team_id, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (coach_id, team_id) DO UPDATE SET version = version + 1",
+                (coach_id, team_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row[0]
+
+    def team_weeks(self, coach_id: str, team_id: str) -> Dict[str, float]:
+        cur = self._conn().execute(
+            "SELECT week_key, load FROM weekly_load WHERE coach_id = ? AND team_id = ? ORDER BY week_key",
+            (coach_id, team_id),
+        )
+        return dict(cur.fetchall())
+
+    def all_histories(self) -> History:
+        out: History = {}
+        cur = self._conn().execute("SELECT coach_id, team_id, week_key, load FROM weekly_load")
+        for coach, team, week, load in cur:
+            out.setdefault(coach, {}).setdefault(team, {})[week] = load
+        return out
+
+    def all_rows(self) -> List[Row]:
+        # az elsődleges kulcs sorrendje, külön rendezés nélkül
+        return self._conn().execute(
+            "SELECT coach_id, team_id, week_key, load FROM weekly_load "
+            "ORDER BY coach_id, team_id, week_key"
+        ).fetchall()
+
+    def version(self) -> int:
+        row = self._conn().execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def team_version(self, coach_id: str, team_id: str) -> int:
+        row = self._conn().execute(
+            "SELECT version FROM team_version WHERE coach_id = ? AND team_id = ?",
+            (coach_id, team_id),
+        ).fetchone()
+        return row[0] if row else 0
+
+
+############################################################
+# JSON (régi formátum)
+############################################################
+
+class JsonWorkloadStore(WorkloadStore):
+    """
+    Az eredeti acwr_history.json tároló: processzen belül zárolt, atomikus
+    (tmp + os.replace) írással. Több processz párhuzamos írására nem alkalmas.
+    """
+
+    def __init__(self, path: str = ACWR_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._version = 0
+        self._team_versions: Dict[Tuple[str, str], int] = {}
+        self._data: History = load_acwr_history(path)
+
+    def add_workload(self, coach_id: str, team_id: str, week_key: str, workload: float) -> float:
+        with self._lock:
+            weeks = self._data.setdefault(coach_id, {}).setdefault(team_id, {})
+            weeks[week_key] = weeks.get(week_key, 0.0) + float(workload)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self._version += 1
+            key = (coach_id, team_id)
+            self._team_versions[key] = self._team_versions.get(key, 0) + 1
+            return weeks[week_key]
+
+    def team_weeks(self, coach_id: str, team_id: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._data.get(coach_id, {}).get(team_id, {}))
+
+    def all_histories(self) -> History:
+        with self._lock:
+            return {c: {t: dict(w) for t, w in teams.items()} for c, teams in self._data.items()}
+
+    def all_rows(self) -> List[Row]:
+        with self._lock:
+            return sorted(
+                (c, t, w, float(load))
+                for c, teams in self._data.items()
+                for t, weeks in teams.items()
+                for w, load in weeks.items()
+            )
+
+    def version(self) -> int:
+        return self._version
+
+    def team_version(self, coach_id: str, team_id: str) -> int:
+        return self._team_versions.get((coach_id, team_id), 0)
+
+
+def open_workload_store(url: Optional[str] = None) -> WorkloadStore:
+    """"sqlite:<útvonal>" vagy "json:<útvonal>"."""
+    url = url or os.environ.get("TBP_WORKLOAD_STORE") or DEFAULT_STORE_URL
+    kind, _, path = url.partition(":")
+    if kind == "sqlite":
+        return SqliteWorkloadStore(path or WORKLOAD_DB_PATH)
+    if kind == "json":
+        return JsonWorkloadStore(path or ACWR_HISTORY_PATH)
+    raise ValueError(f"Ismeretlen workload tároló: {url}")
@@ -70,6 +70,18 @@ TEMPLATES = {
             "text_labels": [
                 {"x": 5, "y": 95, "text": "1–2–3–1 felállás – U12–U15 sablon"},
             ],
+
+            # Animáció (pitch_drawer.animate_drill): a labda végigmegy a passzokon,
+            # majd a csatár és a 8-as végrehajtja a futásokat
+            "keyframes": [
+                {"t": 0.0, "ball": {"owner_id": "R_D1"}},
+                {"t": 1.0, "ball": {"owner_id": "R_M1"}},
+                {"t": 2.0, "ball": {"owner_id": "R_M2"}},
+                {"t": 3.0, "ball": {"owner_id": "R_F1"},
+                 "players": {"R_F1": {"x": 65, "y": 50}, "R_M3": {"x": 45, "y": 70}}},
+                {"t": 5.0, "players": {"R_F1": {"x": 72, "y": 55},
+                                       "R_M3": {"x": 55, "y": 75}}},
+            ],
         },
     },
 }
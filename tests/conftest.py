@@ -0,0 +1,16 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def repo_root(monkeypatch):
+    """A csomag relatív útvonalakkal dolgozik (DB, fontok, képek): a repó gyökeréből fut."""
+    monkeypatch.chdir(ROOT)
+    return ROOT
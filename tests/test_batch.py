@@ -0,0 +1,28 @@
+# tests/test_batch.py
+import glob
+import os
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+from tbp.batch import run_batch
+from tbp.pdf_export import DEJAVU_BOLD, DEJAVU_REG
+
+REQUESTS = [{"team": f"Csapat {i}", "age_group": "U10-U12", "period_week": i % 6 + 1}
+            for i in range(8)]
+
+
+def _clear_font_cache():
+    for ttf in (DEJAVU_REG, DEJAVU_BOLD):
+        for p in glob.glob(os.path.splitext(ttf)[0] + "*.pkl"):
+            os.remove(p)
+
+
+@pytest.mark.parametrize("attempt", range(5))
+def test_parallel_pdf_with_cold_font_cache(repo_root, tmp_path, attempt):
+    # a workerek korábban egymás félig írt DejaVuSans*.pkl-jét olvasták (EOFError)
+    _clear_font_cache()
+    results = run_batch(REQUESTS, str(tmp_path), with_pdf=True, workers=4, seed=attempt)
+    assert [r.get("error") for r in results if not r["ok"]] == []
+    assert len(glob.glob(str(tmp_path / "*.pdf"))) == len(REQUESTS)
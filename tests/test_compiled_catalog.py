@@ -0,0 +1,70 @@
+# tests/test_compiled_catalog.py
+import json
+import os
+import shutil
+
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+from tbp.catalog import JSON_PATH
+from tbp.compiled_catalog import exercise_image, open_catalog
+from tbp.image_store import ImageStore
+
+
+@pytest.fixture
+def workdir(repo_root, tmp_path, monkeypatch):
+    with open(os.path.join(repo_root, JSON_PATH), "r", encoding="utf-8") as f:
+        drills = json.load(f)[:3]
+    for i, ex in enumerate(drills):
+        ex["file_name"] = f"drill{i}_TBP.png"
+    monkeypatch.chdir(tmp_path)
+    with open("db.json", "w", encoding="utf-8") as f:
+        json.dump(drills, f, ensure_ascii=False)
+    for i in (0, 1):                            # a drill2-nek nincs képe
+        Image.new("RGB", (40, 20), (i, 0, 0)).save(f"drill{i}_TBP.png")
+    return tmp_path
+
+
+def _open():
+    return open_catalog("db.json", "cat.bin", "cat.manifest.json")
+
+
+def test_added_image_triggers_rebuild(workdir):
+    cat = _open()
+    assert exercise_image(cat[2], ImageStore()) is None
+    assert not cat.is_stale("db.json")
+
+    shutil.copy("drill0_TBP.png", "drill2_TBP.png")
+    assert cat.is_stale("db.json")
+    cat.close()
+
+    cat = _open()                               # "újraindítás"
+    assert cat[2].image.path == "drill2_TBP.png"
+    assert exercise_image(cat[2], ImageStore()) == "drill2_TBP.png"
+    cat.close()
+
+
+def test_deleted_image_is_not_served(workdir):
+    cat = _open()
+    assert exercise_image(cat[1], ImageStore()) == "drill1_TBP.png"
+
+    os.remove("drill1_TBP.png")
+    # a rögzített útvonal már nem létezik: nincs kép (nem hibás útvonal az st.image-nek)
+    assert exercise_image(cat[1], ImageStore()) is None
+    assert cat.is_stale("db.json")
+    cat.close()
+
+    cat = _open()
+    assert cat[1].image.path is None
+    cat.close()
+
+
+def test_unchanged_images_keep_catalog(workdir):
+    cat = _open()
+    build_id = cat.manifest["build_id"]
+    cat.close()
+    cat = _open()
+    assert cat.manifest["build_id"] == build_id
+    cat.close()
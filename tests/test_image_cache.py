@@ -0,0 +1,26 @@
+# tests/test_image_cache.py
+import pytest
+
+pytest.importorskip("PIL")
+from PIL import Image
+
+from tbp.image_cache import PDF_DPI, PDF_WIDTH_MM, DerivedImageStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return DerivedImageStore(root=str(tmp_path / "derived"))
+
+
+def test_pdf_variant_width_follows_dpi(store):
+    Image.new("RGBA", (2000, 1000), (0, 0, 0, 0)).save("big.png")
+    with Image.open(store.pdf_variant("big.png")) as im:
+        assert im.width == round(PDF_WIDTH_MM / 25.4 * PDF_DPI) and im.mode == "RGB"
+
+
+def test_unreadable_source_yields_no_variant(store):
+    with open("broken.png", "wb") as f:
+        f.write(b"nem kep")
+    assert store.pdf_variant("broken.png") is None
+    assert store.thumbnail("missing.png") is None
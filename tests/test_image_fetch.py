@@ -0,0 +1,163 @@
+# tests/test_image_fetch.py
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+import tbp.image_fetch as image_fetch
+from tbp.image_fetch import ImageFetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """/<név>: kép (ETag: "v1"); /slow/<név>: késleltetett kép; /html: nem kép."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        srv = self.server
+        with srv.lock:
+            srv.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.path.startswith("/slow/"):
+            time.sleep(srv.delay)
+        if self.path == "/html":
+            self._send(200, b"<html></html>", "text/html")
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self._send(304, b"", None)
+        else:
+            self._send(200, self.path.encode() * srv.repeat, "image/png")
+
+    def _send(self, code, body, ctype):
+        self.send_response(code)
+        if ctype:
+            self.send_header("Content-Type", ctype)
+            self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.lock = threading.Lock()
+    srv.hits = []
+    srv.delay = 0.0
+    srv.repeat = 1000
+    srv.base = f"http://127.0.0.1:{srv.server_port}"
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def make_fetcher(tmp_path):
+    sessions = []
+
+    def make(**kw):
+        s = requests.Session()
+        sessions.append(s)
+        kw.setdefault("request_timeout", 5.0)
+        return ImageFetcher(root=str(tmp_path / "cache"), session=s, **kw)
+
+    yield make
+    for s in sessions:
+        s.close()
+
+
+def test_prefetch_serves_local_copy_without_refetch(server, make_fetcher):
+    f = make_fetcher()
+    urls = [f"{server.base}/a.png", f"{server.base}/b.png", None, "local.png"]
+    out = f.prefetch(urls)
+    assert set(out) == set(urls[:2])            # csak http(s) URL-ek
+    with open(out[urls[0]], "rb") as fh:
+        assert fh.read() == b"/a.png" * 1000
+
+    n = len(server.hits)
+    assert f.prefetch(urls) == out
+    assert len(server.hits) == n                # friss cache: nincs kérés
+
+
+def test_timeout_bounds_prefetch_and_late_result_lands(server, make_fetcher):
+    server.delay = 1.0
+    f = make_fetcher(timeout=0.2)
+    url = f"{server.base}/slow/x.png"
+    t0 = time.perf_counter()
+    assert f.prefetch([url]) == {url: None}
+    assert time.perf_counter() - t0 < 0.8
+
+    time.sleep(1.5)
+    n = len(server.hits)
+    local = f.prefetch([url])[url]
+    assert local is not None and os.path.exists(local)
+    assert len(server.hits) == n
+
+
+def test_revalidation_304_refreshes_only_metadata(server, make_fetcher):
+    url = f"{server.base}/c.png"
+    local = make_fetcher().prefetch([url])[url]
+    meta_path = local[:-4] + ".json"
+    with open(meta_path) as fh:
+        before = json.load(fh)
+    mtime_ns = os.stat(local).st_mtime_ns
+    ino = os.stat(local).st_ino
+
+    time.sleep(0.05)
+    assert make_fetcher(max_age=0).prefetch([url]) == {url: local}
+    assert server.hits[-1] == ("/c.png", '"v1"')
+    with open(meta_path) as fh:
+        after = json.load(fh)
+    assert after["fetched"] > before["fetched"]
+    assert {k: v for k, v in after.items() if k != "fetched"} == \
+        {k: v for k, v in before.items() if k != "fetched"}
+    assert os.stat(local).st_ino == ino          # a kép nem íródott újra
+    with open(local, "rb") as fh:
+        assert fh.read() == b"/c.png" * 1000
+    assert os.stat(local).st_mtime_ns >= mtime_ns
+
+
+def test_non_image_rejected_and_not_retried(server, make_fetcher, monkeypatch):
+    f = make_fetcher()
+    url = f"{server.base}/html"
+    assert f.prefetch([url]) == {url: None}
+    assert f.prefetch([url]) == {url: None}
+    assert [p for p, _ in server.hits].count("/html") == 1
+
+    monkeypatch.setattr(image_fetch, "RETRY_AFTER_S", 0.0)
+    f.prefetch([url])
+    assert [p for p, _ in server.hits].count("/html") == 2
+
+
+def test_eviction_keeps_cache_under_max_bytes(server, make_fetcher):
+    # "/i0.png" * 1000 = 7 kB képenként: a 20 kB-os korlátba kettő fér
+    f = make_fetcher(max_bytes=20_000)
+    urls = [f"{server.base}/i{i}.png" for i in range(5)]
+    for u in urls:
+        f.prefetch([u])
+        time.sleep(0.02)                         # eltérő mtime: LRU sorrend
+    assert f._total <= 20_000
+    kept = [u for u in urls if os.path.exists(f._paths(image_fetch.url_key(u))[0])]
+    assert kept == urls[-len(kept):] and urls[-1] in kept
+
+    # újraindítás: a lemezen lévő méretek visszaolvasódnak
+    assert make_fetcher(max_bytes=20_000)._total == f._total
+
+
+def test_stale_copy_served_when_server_down(server, make_fetcher):
+    url = f"{server.base}/d.png"
+    local = make_fetcher().prefetch([url])[url]
+    server.shutdown()
+    server.server_close()
+
+    f = make_fetcher(max_age=0, timeout=2.0)
+    assert f.prefetch([url]) == {url: local}
+    with open(local, "rb") as fh:
+        assert fh.read() == b"/d.png" * 1000
@@ -0,0 +1,69 @@
+# tests/test_image_store.py
+import os
+
+import pytest
+
+from tbp.image_store import ImageStore, hash_file
+
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.png", "b.png"):
+        with open(name, "wb") as f:
+            f.write(b"PNG-eredeti")
+    return tmp_path
+
+
+def _rewrite(name: str, data: bytes):
+    st = os.stat(name)
+    with open(name, "wb") as f:                 # helyben, ugyanaz az inode
+        f.write(data)
+    os.utime(name, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_editing_original_does_not_touch_shared_blob(store_dir):
+    store = ImageStore()
+    store.build(["a.png", "b.png"])
+    blob = store.resolve("b.png")
+    assert blob == store.resolve("a.png") and blob.startswith(store.root)
+
+    _rewrite("a.png", b"PNG-szerkesztett")
+    assert _read(store.resolve("b.png")) == b"PNG-eredeti"
+    assert hash_file(blob) == store.manifest["b.png"]
+    assert _read(store.resolve("a.png")) == b"PNG-szerkesztett"
+
+
+def test_resolve_revalidates_after_restart(store_dir):
+    ImageStore().build(["a.png", "b.png"])
+    _rewrite("a.png", b"PNG-csere")
+
+    store = ImageStore()                        # új processz: a manifest a régi hash-t tartja
+    assert _read(store.resolve("a.png")) == b"PNG-csere"
+    assert store.digest("a.png") == hash_file("a.png")
+
+
+def test_pruned_original_resolves_through_manifest(store_dir):
+    ImageStore().build(["a.png"], prune=True)
+    assert not os.path.exists("a.png")
+    assert _read(ImageStore().resolve("a.png")) == b"PNG-eredeti"
+
+
+@pytest.mark.skipif(not hasattr(os, "link"), reason="nincs hardlink")
+def test_linked_blob_is_read_only_and_dropped_when_original_changes(store_dir):
+    store = ImageStore()
+    store.build(["a.png", "b.png"], link=True)
+    blob = store.resolve("a.png")
+    assert os.path.samefile(blob, "a.png")
+    assert not os.access(blob, os.W_OK) or os.geteuid() == 0
+
+    os.chmod("a.png", 0o644)                    # a szerkesztő szándékosan felülírja
+    _rewrite("a.png", b"PNG-szerkesztett")
+    assert _read(store.resolve("a.png")) == b"PNG-szerkesztett"
+    assert not os.path.exists(blob)             # a blob már nem a hash-e tartalma
+    assert _read(store.resolve("b.png")) == b"PNG-eredeti"
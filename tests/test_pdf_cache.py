@@ -0,0 +1,43 @@
+# tests/test_pdf_cache.py
+import os
+from datetime import date
+
+import pytest
+
+from tbp.image_cache import DerivedImageStore
+from tbp.image_store import ImageStore
+from tbp.pdf_cache import pdf_cache_key
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with open("drill0_TBP.png", "wb") as f:
+        f.write(b"PNG-eredeti")
+    return tmp_path
+
+
+PLAN = [{"stage": "cel1", "exercise": {"id": "d0", "file_name": "drill0_TBP.png"}}]
+
+
+def _key(**kw):
+    images = ImageStore()
+    kw.setdefault("image_store", DerivedImageStore(images=images))
+    return pdf_cache_key(PLAN, "Edző", "Csapat", "U10-U12", date(2026, 3, 2), "2026-W10", 1,
+                         images=images, **kw)
+
+
+def test_replaced_image_changes_key(workdir):
+    store = DerivedImageStore(images=ImageStore())
+    before = _key(image_store=store)
+    assert _key(image_store=store) == before
+
+    st = os.stat("drill0_TBP.png")
+    with open("drill0_TBP.png", "wb") as f:
+        f.write(b"PNG-csere")
+    os.utime("drill0_TBP.png", ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert _key(image_store=store) != before
+
+
+def test_catalog_version_changes_key(workdir):
+    assert _key(catalog_version=1) != _key(catalog_version=2)
@@ -0,0 +1,34 @@
+# tests/test_pitch.py
+import pytest
+
+pytest.importorskip("matplotlib")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from pitch_drawer import _data_per_point, _draw_pitch_fast, draw_pitch
+from tbp.diagram import PITCH_FIGSIZE, PITCH_GOAL_DEPTH, PITCH_GOAL_WIDTH, PITCH_SHAPES, pitch_data_per_point
+
+
+def _axes(figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig.add_subplot(111)
+
+
+@pytest.mark.parametrize("figsize", [PITCH_FIGSIZE, (6, 6), (10, 4)])
+def test_data_per_point_matches_matplotlib(figsize):
+    ax = _axes(figsize)
+    draw_pitch(ax)
+    ax.figure.tight_layout()
+    assert pitch_data_per_point(figsize) == pytest.approx(_data_per_point(ax), rel=1e-3)
+
+
+def test_goals_come_from_shared_dimensions():
+    goals = [sh.geom for sh in PITCH_SHAPES if sh.kind == "rect" and sh.zorder == 2]
+    assert goals == [(-PITCH_GOAL_DEPTH, 50 - PITCH_GOAL_WIDTH / 2, PITCH_GOAL_DEPTH, PITCH_GOAL_WIDTH),
+                     (100, 50 - PITCH_GOAL_WIDTH / 2, PITCH_GOAL_DEPTH, PITCH_GOAL_WIDTH)]
+
+
+def test_fast_pitch_returns_top_artists():
+    top = _draw_pitch_fast(_axes(PITCH_FIGSIZE))
+    assert [a.get_zorder() for a in top] == [2, 2]
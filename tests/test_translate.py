@@ -0,0 +1,99 @@
+# tests/test_translate.py
+import threading
+import time
+
+import pytest
+
+import tbp.translate as translate
+from tbp.translate import TranslationBackend, TranslationCache, TranslationService
+
+
+class FakeBackend(TranslationBackend):
+    """Helyi fordító: "HU:" + szöveg; késleltetés és hiba szövegenként állítható."""
+    name = "fake"
+
+    def __init__(self, delays=None, fail=()):
+        self.delays = delays or {}
+        self.fail = set(fail)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def translate(self, text: str) -> str:
+        with self._lock:
+            self.calls.append(text)
+        time.sleep(self.delays.get(text, 0.0))
+        if text in self.fail:
+            raise RuntimeError("backend hiba")
+        return "HU:" + text
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "translation_cache.db")
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        TranslationBackend()
+
+
+def test_cache_hit_makes_no_backend_calls(db_path):
+    texts = ["Organisation", "Process", "Tip"]
+    first = FakeBackend()
+    assert TranslationService(first, TranslationCache(db_path)).translate_many(texts) == \
+        {t: "HU:" + t for t in texts}
+    assert sorted(first.calls) == sorted(texts)
+
+    # új szolgáltatás (új processz), ugyanaz az SQLite: nincs hívás
+    second = FakeBackend()
+    svc = TranslationService(second, TranslationCache(db_path))
+    assert svc.translate_many(texts) == {t: "HU:" + t for t in texts}
+    assert svc.translate_many(texts) == {t: "HU:" + t for t in texts}
+    assert second.calls == []
+
+
+def test_timeout_bounds_translate_many(db_path):
+    backend = FakeBackend(delays={"slow": 2.0})
+    svc = TranslationService(backend, TranslationCache(db_path), timeout=0.3)
+    t0 = time.perf_counter()
+    out = svc.translate_many(["fast", "slow"])
+    assert time.perf_counter() - t0 < 1.0
+    assert out == {"fast": "HU:fast", "slow": None}
+
+
+def test_late_result_is_persisted(db_path):
+    svc = TranslationService(FakeBackend(delays={"slow": 0.5}), TranslationCache(db_path), timeout=0.05)
+    assert svc.translate_many(["slow"]) == {"slow": None}
+    time.sleep(1.0)
+
+    fresh = FakeBackend()
+    out = TranslationService(fresh, TranslationCache(db_path)).translate_many(["slow"])
+    assert out == {"slow": "HU:slow"}
+    assert fresh.calls == []
+
+
+def test_backend_exception_maps_to_none(db_path):
+    svc = TranslationService(FakeBackend(fail={"boom"}), TranslationCache(db_path))
+    assert svc.translate_many(["ok", "boom"]) == {"ok": "HU:ok", "boom": None}
+    assert svc.translate("boom") is None
+
+
+def test_failed_text_is_not_retried_within_backoff(db_path, monkeypatch):
+    backend = FakeBackend(fail={"boom"})
+    svc = TranslationService(backend, TranslationCache(db_path))
+    svc.translate_many(["boom"])
+    t0 = time.perf_counter()
+    assert svc.translate_many(["boom"]) == {"boom": None}
+    assert time.perf_counter() - t0 < 0.1
+    assert backend.calls == ["boom"]
+
+    monkeypatch.setattr(translate, "RETRY_AFTER_S", 0.0)
+    svc.translate_many(["boom"])
+    assert backend.calls == ["boom", "boom"]
+
+
+def test_without_backend_serves_cache_only(db_path):
+    TranslationService(FakeBackend(), TranslationCache(db_path)).translate_many(["Process"])
+
+    offline = TranslationService(None, TranslationCache(db_path))
+    assert offline.translate_many(["Process", "Tip", None, ""]) == {"Process": "HU:Process", "Tip": None}